@@ -0,0 +1,85 @@
+import logging
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, Request, Response, status
+from typing import Optional
+
+from app.core.config import settings
+from app.core.limits import RATE_LIMIT_RESPONSES, check_upload_size, rate_limit
+from app.models.jobs import JobStatusResponse
+from app.models.posture import PostureAnalysisResponse
+from app.services.job_queue import JobQueueFullError, get_job_queue
+from app.services.job_store import JOB_FAILED, JOB_SUCCEEDED
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.post(
+    "",
+    response_model=JobStatusResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(rate_limit)],
+    responses={
+        **RATE_LIMIT_RESPONSES,
+        503: {"description": "Job queue is full; retry after Retry-After seconds"}
+    },
+    summary="Submit an analysis job",
+    description="Queues an uploaded image for background analysis and returns immediately. "
+                "Poll the job status and fetch the result once it has succeeded."
+)
+async def submit_job(
+    request: Request,
+    response: Response,
+    file: UploadFile = File(...),
+    tier: Optional[str] = Query(None, description="Model latency tier (defaults to the upload tier)")
+) -> JobStatusResponse:
+    """Queue an uploaded image for background analysis."""
+    contents = await file.read()
+    if not contents:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Uploaded file is empty")
+    check_upload_size(contents)
+
+    try:
+        job = await get_job_queue().submit(contents, {"tier": tier or settings.UPLOAD_MODEL_TIER})
+    except JobQueueFullError as e:
+        logger.warning("Rejected job: %s", e.detail)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=e.detail,
+            headers={"Retry-After": str(settings.JOB_QUEUE_RETRY_AFTER)}
+        )
+    response.headers["Location"] = str(request.url_for("get_job", job_id=job["id"]))
+    return JobStatusResponse(**job)
+
+@router.get(
+    "/{job_id}",
+    response_model=JobStatusResponse,
+    summary="Get job status",
+    description="Returns the current state of an analysis job."
+)
+async def get_job(job_id: str) -> JobStatusResponse:
+    """Get the status of an analysis job."""
+    job = await get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job '{job_id}' not found")
+    return JobStatusResponse(**job)
+
+@router.get(
+    "/{job_id}/result",
+    response_model=PostureAnalysisResponse,
+    summary="Get job result",
+    description="Returns the analysis result of a finished job. Responds with 409 while the job "
+                "is still pending or running, and with the original error status if it failed."
+)
+async def get_job_result(job_id: str) -> Response:
+    """Get the result of a finished analysis job."""
+    queue = get_job_queue()
+    job = await queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job '{job_id}' not found")
+    if job["status"] == JOB_FAILED:
+        raise HTTPException(status_code=job["status_code"] or 500, detail=job["error"])
+    if job["status"] != JOB_SUCCEEDED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job '{job_id}' is {job['status']}")
+
+    # Results are stored JSON-encoded; relay them without re-serializing
+    result = await queue.get_result(job_id)
+    return Response(content=result, media_type="application/json")
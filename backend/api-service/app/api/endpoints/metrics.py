@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+
+from app.core.config import settings
+from app.core.limits import get_rate_limiter
+from app.models.metrics import MetricsResponse
+from app.services.inference_scheduler import get_inference_scheduler
+
+router = APIRouter()
+
+@router.get(
+    "",
+    response_model=MetricsResponse,
+    summary="Get service metrics",
+    description="Returns rate limit counters, including pseudonymous labels of the clients that hit the limit most, "
+                "and the inference scheduler's slot usage and queue depth."
+)
+async def get_metrics() -> MetricsResponse:
+    """Get rate limiter and scheduler metrics."""
+    return MetricsResponse(
+        rate_limit={
+            "enabled": settings.RATE_LIMIT_RATE > 0,
+            "rate": settings.RATE_LIMIT_RATE,
+            "burst": settings.RATE_LIMIT_BURST,
+            **get_rate_limiter().stats()
+        },
+        scheduler=get_inference_scheduler().stats()
+    )
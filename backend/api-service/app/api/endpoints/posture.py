@@ -1,80 +1,210 @@
-import base64
 import logging
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
-from typing import Dict, Any
+from fastapi import APIRouter, UploadFile, File, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Dict, Any, Optional, Union
 
+from app.core.config import settings
+from app.core.limits import RATE_LIMIT_RESPONSES, check_upload_size, rate_limit
+from app.core.tracing import span
 from app.models.posture import PostureAnalysisRequest, PostureAnalysisResponse
-from app.services.inference_client import InferenceClient
+from app.services.inference_client import InferenceClient, InferenceServiceError, TRANSPORT_RPC
+from app.services.inference_scheduler import get_inference_scheduler, PRIORITY_INTERACTIVE
+from app.services.keypoint_codec import (
+    FORMAT_FULL, FORMAT_PATTERN, COMPACT_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, MEDIA_TYPES,
+    negotiate_format, encode_payload
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+FORMAT_DESCRIPTION = (
+    "Keypoints can be returned as a flat 17x3 array (`format=compact` or "
+    f"`Accept: {COMPACT_MEDIA_TYPE}`) or as MessagePack with packed float32 "
+    f"keypoints and raw PNG overlay bytes (`format=msgpack` or `Accept: {MSGPACK_MEDIA_TYPE}`)."
+)
+IMAGE_DESCRIPTION = (
+    "Clients that only need posture alerts can pass `include_image=false` to skip the "
+    "overlay image and subscribe to the session's events instead of polling."
+)
+FORMAT_RESPONSES = {
+    200: {"content": {COMPACT_MEDIA_TYPE: {}, MSGPACK_MEDIA_TYPE: {}}},
+    **RATE_LIMIT_RESPONSES
+}
+
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+# Keep proxies from buffering or caching the event stream
+EVENT_STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
 # Dependency to get inference client
 def get_inference_client():
     return InferenceClient()
 
+async def relay_analysis(
+    inference_client: InferenceClient,
+    image_data: Union[str, bytes],
+    response_format: str,
+    tier: Optional[str],
+    session_id: Optional[str],
+    include_image: bool = True
+) -> Response:
+    """Relay the inference service response body to the client without parsing it."""
+    if inference_client.transport == TRANSPORT_RPC:
+        # RPC replies arrive whole, so the body is relayed in one piece
+        content, media_type = await inference_client.fetch_analysis(
+            image_data, response_format, tier, session_id, include_image
+        )
+        return Response(content=content, media_type=media_type)
+
+    response = await inference_client.open_analysis_stream(
+        image_data, response_format, tier, session_id, include_image
+    )
+    return StreamingResponse(
+        response.aiter_bytes(),
+        status_code=response.status_code,
+        media_type=response.headers.get("content-type", MEDIA_TYPES[response_format]),
+        background=BackgroundTask(response.aclose)
+    )
+
+async def run_analysis(
+    inference_client: InferenceClient,
+    image_data: Union[str, bytes],
+    response_format: str,
+    tier: Optional[str],
+    session_id: Optional[str] = None,
+    include_image: bool = True,
+    client: str = ""
+) -> Union[Dict[str, Any], Response]:
+    """Run analysis through the inference service and shape the response."""
+    # Interactive calls take inference slots ahead of queued bulk jobs, in turns across clients
+    async with get_inference_scheduler().slot(PRIORITY_INTERACTIVE, client):
+        # Relay the inference response untouched when no transformation is needed
+        if settings.RESPONSE_PASSTHROUGH:
+            return await relay_analysis(
+                inference_client, image_data, response_format, tier, session_id, include_image
+            )
+
+        # Send image to inference service
+        result = await inference_client.analyze_image(
+            image_data, response_format, tier, session_id, include_image=include_image
+        )
+
+    # Return analysis results
+    payload = {
+        "isGoodPosture": result.get("isGoodPosture", False),
+        "confidence": result.get("confidence", 0),
+        "feedback": result.get("feedback", ["Unable to analyze posture"]),
+        "keypoints": result.get("keypoints"),
+        "img_with_pose": result.get("img_with_pose")
+    }
+    if response_format == FORMAT_FULL:
+        return payload
+    with span("encode"):
+        content = encode_payload(payload, response_format)
+    return Response(content=content, media_type=MEDIA_TYPES[response_format])
+
 @router.post(
-    "/analyze", 
+    "/analyze",
     response_model=PostureAnalysisResponse,
     summary="Analyze posture from base64 image",
-    description="Analyzes sitting posture from a base64-encoded image"
+    description=f"Analyzes sitting posture from a base64-encoded image. {FORMAT_DESCRIPTION} {IMAGE_DESCRIPTION}",
+    responses=FORMAT_RESPONSES
 )
 async def analyze_posture(
     request: PostureAnalysisRequest,
+    format: Optional[str] = Query(None, pattern=FORMAT_PATTERN, description="Response format"),
+    tier: Optional[str] = Query(None, description="Model latency tier (defaults to the live tier)"),
+    include_image: bool = Query(True, description="Return the pose overlay image"),
+    accept: Optional[str] = Header(None),
+    x_session_id: Optional[str] = Header(None, description="Live session ID enabling keyframe tracking"),
+    client: str = Depends(rate_limit),
     inference_client: InferenceClient = Depends(get_inference_client)
-) -> Dict[str, Any]:
+) -> Union[Dict[str, Any], Response]:
     """Analyze posture from base64 image data."""
+    response_format = negotiate_format(format, accept)
+    tier = tier or settings.LIVE_MODEL_TIER
     try:
-        # Send image to inference service
-        result = await inference_client.analyze_image(request.image)
-        
-        # Return analysis results
-        return {
-            "isGoodPosture": result.get("isGoodPosture", False),
-            "confidence": result.get("confidence", 0),
-            "feedback": result.get("feedback", ["Unable to analyze posture"]),
-            "keypoints": result.get("keypoints"),
-            "img_with_pose": result.get("img_with_pose")
-        }
+        return await run_analysis(
+            inference_client, request.image, response_format, tier, x_session_id, include_image, client
+        )
+    except InferenceServiceError as e:
+        # Surface inference service errors (e.g. 400, 413, 503) with their status
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
-        logger.error(f"Error analyzing posture: {str(e)}", exc_info=True)
+        logger.error("Error analyzing posture: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error analyzing posture: {str(e)}"
         )
 
 @router.post(
-    "/analyze/upload", 
+    "/analyze/upload",
     response_model=PostureAnalysisResponse,
     summary="Analyze posture from uploaded image",
-    description="Analyzes sitting posture from an uploaded image file"
+    description=f"Analyzes sitting posture from an uploaded image file. {FORMAT_DESCRIPTION} {IMAGE_DESCRIPTION}",
+    responses=FORMAT_RESPONSES
 )
 async def analyze_uploaded_image(
     file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern=FORMAT_PATTERN, description="Response format"),
+    tier: Optional[str] = Query(None, description="Model latency tier (defaults to the upload tier)"),
+    include_image: bool = Query(True, description="Return the pose overlay image"),
+    accept: Optional[str] = Header(None),
+    client: str = Depends(rate_limit),
     inference_client: InferenceClient = Depends(get_inference_client)
-) -> Dict[str, Any]:
+) -> Union[Dict[str, Any], Response]:
     """Analyze posture from an uploaded image file."""
+    response_format = negotiate_format(format, accept)
+    tier = tier or settings.UPLOAD_MODEL_TIER
+    # Read uploaded file
+    contents = await file.read()
+    check_upload_size(contents)
     try:
-        # Read uploaded file
-        contents = await file.read()
-        
-        # Convert to base64
-        base64_image = base64.b64encode(contents).decode("utf-8")
-        
-        # Send to inference service
-        result = await inference_client.analyze_image(base64_image)
-        
-        # Return analysis results
-        return {
-            "isGoodPosture": result.get("isGoodPosture", False),
-            "confidence": result.get("confidence", 0),
-            "feedback": result.get("feedback", ["Unable to analyze posture"]),
-            "keypoints": result.get("keypoints"),
-            "img_with_pose": result.get("img_with_pose")
-        }
+        # Send to inference service (base64 encoded only if the transport needs it)
+        return await run_analysis(
+            inference_client, contents, response_format, tier, include_image=include_image, client=client
+        )
+    except InferenceServiceError as e:
+        # Surface inference service errors (e.g. 400, 413, 503) with their status
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
-        logger.error(f"Error analyzing uploaded image: {str(e)}", exc_info=True)
+        logger.error("Error analyzing uploaded image: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error analyzing uploaded image: {str(e)}"
         )
+
+@router.get(
+    "/sessions/{session_id}/events",
+    summary="Stream posture state events",
+    description=(
+        "Server-Sent Events stream of a live session's debounced posture state, relayed from the "
+        "inference service. A `state` event carries the current state on connect and every "
+        "transition between `good`, `bad` and `away`; a `summary` event covers the frames analyzed "
+        "in each summary interval. Frames count towards the session when sent to `/analyze` with "
+        "its `X-Session-ID` header; sessions with no recent frames cannot be subscribed to."
+    ),
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {EVENT_STREAM_MEDIA_TYPE: {}}},
+        404: {"description": "No recent frames for the session"},
+        **RATE_LIMIT_RESPONSES
+    }
+)
+async def stream_posture_events(
+    session_id: str,
+    client: str = Depends(rate_limit),
+    inference_client: InferenceClient = Depends(get_inference_client)
+) -> StreamingResponse:
+    """Relay a live session's posture state events."""
+    # Subscribing runs no inference, so it takes no scheduler slot
+    try:
+        response = await inference_client.open_event_stream(session_id)
+    except InferenceServiceError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return StreamingResponse(
+        response.aiter_raw(),
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        headers=EVENT_STREAM_HEADERS,
+        background=BackgroundTask(response.aclose)
+    )
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import posture
+from app.api.endpoints import jobs, metrics, posture
 from app.core.config import settings
 
 # Create the main router
@@ -8,3 +8,5 @@ router = APIRouter(prefix=settings.API_PREFIX)
 
 # Include individual endpoint routers
 router.include_router(posture.router, prefix="/posture", tags=["Posture Analysis"])
+router.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
+router.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
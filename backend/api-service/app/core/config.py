@@ -13,15 +13,71 @@ class Settings(BaseSettings):
     API_PREFIX: str = "/api"
     DEBUG: bool = os.getenv("DEBUG", "False").lower() in ("true", "1", "t")
     
+    # Logging Settings (repeated per-frame warnings are summarized once per interval)
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_AGGREGATE_INTERVAL: float = float(os.getenv("LOG_AGGREGATE_INTERVAL", "60"))
+    
     # CORS Settings
     CORS_ORIGINS: List[str] = ["*"]  # For development - should be restricted in production
     CORS_ALLOW_CREDENTIALS: bool = True
     CORS_ALLOW_METHODS: List[str] = ["*"]
     CORS_ALLOW_HEADERS: List[str] = ["*"]
+    CORS_EXPOSE_HEADERS: List[str] = ["X-Request-ID", "Server-Timing", "Retry-After"]
+    
+    # Request Limits (the inference service applies the same limit to its requests, so
+    # uploads must fit once base64-encoded, about 3/4 of it)
+    MAX_REQUEST_BYTES: int = int(os.getenv("MAX_REQUEST_BYTES", str(16 * 1024 * 1024)))
+    
+    # Rate Limiting (token bucket per client on analysis and job submission; a rate of 0 disables it)
+    # Requests per second a client may sustain, and how many it may send in a burst
+    RATE_LIMIT_RATE: float = float(os.getenv("RATE_LIMIT_RATE", "5"))
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", "10"))
+    # Bucket key: "client" (address) or "session" (X-Session-ID, falling back to the address)
+    RATE_LIMIT_KEY: str = os.getenv("RATE_LIMIT_KEY", "client")
+    # Clients tracked at once; the least recently seen start over with a full bucket
+    RATE_LIMIT_MAX_CLIENTS: int = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
     
-    # Inference Service Settings
+    # Inference Service Settings (unix:///path/to/socket connects through a Unix domain socket)
     INFERENCE_SERVICE_URL: str = os.getenv("INFERENCE_SERVICE_URL", "http://inference_service:8001")
     INFERENCE_TIMEOUT: int = int(os.getenv("INFERENCE_TIMEOUT", "30"))
+    # Model tiers requested for live frames and uploads (empty uses the inference default)
+    LIVE_MODEL_TIER: str = os.getenv("LIVE_MODEL_TIER", "")
+    UPLOAD_MODEL_TIER: str = os.getenv("UPLOAD_MODEL_TIER", "")
+    # Maximum concurrent calls to the inference service (interactive calls are served
+    # first, and queued calls of the same priority take turns across clients)
+    INFERENCE_CONCURRENCY: int = int(os.getenv("INFERENCE_CONCURRENCY", "4"))
+    # Transport to the inference service: "http" (JSON/HTTP API) or "rpc" (binary
+    # MessagePack calls multiplexed on a persistent connection to INFERENCE_RPC_URL,
+    # tcp://host:port or unix:///path/to/socket; the inference service only accepts RPC
+    # over TCP from other hosts when its RPC_HOST is set to listen on them)
+    INFERENCE_TRANSPORT: str = os.getenv("INFERENCE_TRANSPORT", "http")
+    INFERENCE_RPC_URL: str = os.getenv("INFERENCE_RPC_URL", "tcp://inference_service:8002")
+    INFERENCE_RPC_MAX_FRAME_BYTES: int = int(os.getenv("INFERENCE_RPC_MAX_FRAME_BYTES", str(64 * 1024 * 1024)))
+    # Analysis calls the inference service turned away with 503 because it was starting or
+    # shutting down, or that could not connect, are retried every INFERENCE_RETRY_DELAY seconds
+    # (0 disables retries) for up to INFERENCE_RESTART_TIMEOUT seconds, enough for a restart
+    # to reload the models, so restarts delay calls instead of failing them
+    INFERENCE_RETRY_DELAY: float = float(os.getenv("INFERENCE_RETRY_DELAY", "0.5"))
+    INFERENCE_RESTART_TIMEOUT: float = float(os.getenv("INFERENCE_RESTART_TIMEOUT", "60"))
+    
+    # Job Queue Settings
+    JOB_STORE_PATH: str = os.getenv("JOB_STORE_PATH", "data/jobs.sqlite3")
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_INFERENCE_TIMEOUT: int = int(os.getenv("JOB_INFERENCE_TIMEOUT", "300"))
+    JOB_RESULT_TTL: int = int(os.getenv("JOB_RESULT_TTL", "3600"))
+    JOB_PURGE_INTERVAL: int = int(os.getenv("JOB_PURGE_INTERVAL", "60"))
+    # Jobs waiting for a worker, each storing its upload until it runs; submissions over
+    # the limit get 503 with Retry-After (0 disables the limit)
+    JOB_MAX_QUEUED: int = int(os.getenv("JOB_MAX_QUEUED", "100"))
+    JOB_QUEUE_RETRY_AFTER: int = int(os.getenv("JOB_QUEUE_RETRY_AFTER", "30"))
+    
+    # Tracing Settings (Chrome trace-event JSON; empty disables export)
+    TRACE_EXPORT_PATH: str = os.getenv("TRACE_EXPORT_PATH", "")
+    TIMING_ALLOW_ORIGIN: str = os.getenv("TIMING_ALLOW_ORIGIN", "*")
+    
+    # Relay inference responses byte-for-byte instead of parsing and re-validating them (the
+    # inference service is asked for the PostureAnalysisResponse fields only, so both shapes match)
+    RESPONSE_PASSTHROUGH: bool = os.getenv("RESPONSE_PASSTHROUGH", "True").lower() in ("true", "1", "t")
     
     class Config:
         env_file = ".env"
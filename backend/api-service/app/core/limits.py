@@ -0,0 +1,245 @@
+import hashlib
+import heapq
+import logging
+import math
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.logging import AggregatedLogger
+
+logger = logging.getLogger(__name__)
+
+# Rate limit keys: bucket per client address, or per live session
+RATE_LIMIT_KEY_CLIENT = "client"
+RATE_LIMIT_KEY_SESSION = "session"
+
+# OpenAPI description of rate-limited endpoints' rejection
+RATE_LIMIT_RESPONSES = {429: {"description": "Rate limit exceeded; retry after Retry-After seconds"}}
+
+# JSON wrapped around a base64 image in inference service requests: {"image":"..."}
+IMAGE_JSON_OVERHEAD = len(b'{"image":""}')
+
+# Clients listed by limit hits in the rate limiter stats
+TOP_LIMITED_CLIENTS = 10
+
+# A client over its limit is rejected on every frame
+rate_limit_rejections = AggregatedLogger(logger, settings.LOG_AGGREGATE_INTERVAL)
+
+# Random per-process key for client labels, so a published label can't be matched to an
+# address or session ID by hashing candidates
+CLIENT_LABEL_KEY = secrets.token_bytes(16)
+
+def client_label(key: str) -> str:
+    """
+    Pseudonymous label for a client key, stable for the life of the process.
+
+    Client keys are addresses or live session IDs, and a session ID is
+    enough to follow that session's events, so only labels are published.
+    """
+    kind = RATE_LIMIT_KEY_SESSION if key.startswith("session:") else RATE_LIMIT_KEY_CLIENT
+    return f"{kind}:{hashlib.blake2b(key.encode(), key=CLIENT_LABEL_KEY, digest_size=6).hexdigest()}"
+
+def encoded_upload_bytes(size: int) -> int:
+    """Size of the inference service request body carrying an upload of `size` bytes as base64 JSON."""
+    return 4 * math.ceil(size / 3) + IMAGE_JSON_OVERHEAD
+
+def check_upload_size(contents: bytes) -> None:
+    """
+    Reject an upload that would exceed MAX_REQUEST_BYTES once base64-encoded.
+
+    Uploads reach the inference service base64-encoded, a third larger than
+    the file, and it applies the same MAX_REQUEST_BYTES limit. Checking the
+    encoded size here turns what would be a 413 from the inference service
+    into one from this service, whichever transport is used.
+
+    Raises:
+        HTTPException: 413 if the encoded upload is over the limit
+    """
+    max_bytes = settings.MAX_REQUEST_BYTES
+    if max_bytes > 0 and encoded_upload_bytes(len(contents)) > max_bytes:
+        logger.warning("Rejected upload of %d bytes (%d once encoded, limit %d)",
+                       len(contents), encoded_upload_bytes(len(contents)), max_bytes)
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Uploaded file exceeds {max_bytes} bytes once base64-encoded"
+        )
+
+class BodySizeLimitMiddleware:
+    """
+    ASGI middleware that caps request body size while the body streams in.
+
+    Requests declaring a Content-Length over the limit are rejected with 413
+    before any of the body is read. Chunked or under-declared bodies are
+    counted as they arrive and rejected as soon as they cross the limit, so
+    an oversized upload is never buffered in full.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.max_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = self._content_length(scope)
+        if content_length is not None and content_length > self.max_bytes:
+            logger.warning("Rejected request with Content-Length %d (limit %d)", content_length, self.max_bytes)
+            response = JSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"detail": f"Request body exceeds {self.max_bytes} bytes"}
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    logger.warning("Rejected streamed request body over %d bytes", self.max_bytes)
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Request body exceeds {self.max_bytes} bytes"
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @staticmethod
+    def _content_length(scope: Scope) -> Optional[int]:
+        """Read the Content-Length header, if present and valid."""
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter keyed by client.
+
+    Each client's bucket holds up to `burst` tokens and refills at `rate`
+    tokens per second. A request takes a token, or is rejected with the
+    time until the next token is due. Buckets are kept in least recently
+    used order and capped at `max_clients`; a forgotten client starts over
+    with a full bucket. A check is a dict lookup and a few float operations
+    on the event loop, so no locking is needed.
+    """
+
+    def __init__(self, rate: float, burst: int, max_clients: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        # Client -> [tokens, last refill time, limit hits]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        """
+        Take a token from a client's bucket.
+
+        Args:
+            key: Client identifier
+            now: Monotonic time of the request (defaults to the current time)
+
+        Returns:
+            0 if the request is allowed, otherwise seconds until a token is available
+        """
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now, 0]
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            self.allowed += 1
+            return 0.0
+        bucket[2] += 1
+        self.limited += 1
+        return (1 - bucket[0]) / self.rate
+
+    def stats(self) -> Dict[str, Any]:
+        """Request counters, with labels of the tracked clients that hit the limit most."""
+        top = heapq.nlargest(TOP_LIMITED_CLIENTS, self._buckets.items(), key=lambda item: item[1][2])
+        return {
+            "clients": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "top_limited": [{"client": client_label(key), "limited": int(bucket[2])} for key, bucket in top if bucket[2]]
+        }
+
+def client_key(request: Request) -> str:
+    """
+    Identify the client a request is rate limited and scheduled as.
+
+    Behind a reverse proxy, run uvicorn with --proxy-headers so the client
+    address is taken from X-Forwarded-For.
+    """
+    if settings.RATE_LIMIT_KEY == RATE_LIMIT_KEY_SESSION:
+        session_id = request.headers.get("x-session-id")
+        if session_id:
+            return f"session:{session_id}"
+    return request.client.host if request.client else "unknown"
+
+# Singleton instance to share across requests
+_rate_limiter_instance = None
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get or create singleton instance of RateLimiter.
+
+    Returns:
+        RateLimiter instance
+    """
+    global _rate_limiter_instance
+    if _rate_limiter_instance is None:
+        _rate_limiter_instance = RateLimiter(
+            rate=settings.RATE_LIMIT_RATE,
+            burst=settings.RATE_LIMIT_BURST,
+            max_clients=settings.RATE_LIMIT_MAX_CLIENTS
+        )
+    return _rate_limiter_instance
+
+async def rate_limit(request: Request) -> str:
+    """
+    Dependency that rejects clients over their rate limit with 429.
+
+    Returns:
+        Client key, used to schedule the client's inference calls fairly
+
+    Raises:
+        HTTPException: 429 with a Retry-After header if the client is over its limit
+    """
+    key = client_key(request)
+    if settings.RATE_LIMIT_RATE <= 0:
+        return key
+    retry_after = get_rate_limiter().acquire(key)
+    if retry_after:
+        rate_limit_rejections.log("limited", f"Rate limited client {client_label(key)}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Rate limit of {settings.RATE_LIMIT_RATE:g} requests per second exceeded",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+    return key
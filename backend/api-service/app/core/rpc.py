@@ -0,0 +1,66 @@
+import asyncio
+import struct
+from typing import Any, Dict, Tuple
+
+import msgpack
+
+# Internal transport between api-service and inference-service: MessagePack
+# messages over a persistent stream, each framed by a header holding the body
+# length and the call ID. Calls are multiplexed on one connection; responses
+# carry the ID of their call and may arrive in any order.
+FRAME_HEADER = struct.Struct(">II")
+
+# Supported call methods
+METHOD_ANALYZE = "analyze"
+
+class FrameTooLargeError(Exception):
+    """Raised when a frame exceeds the size limit; its body has been skipped."""
+
+    def __init__(self, call_id: int, length: int):
+        self.call_id = call_id
+        self.length = length
+        super().__init__(f"Frame of {length} bytes exceeds the size limit")
+
+async def read_frame(reader: asyncio.StreamReader, max_bytes: int) -> Tuple[int, Dict[str, Any]]:
+    """
+    Read one frame.
+
+    Args:
+        reader: Stream to read from
+        max_bytes: Largest accepted body size
+
+    Returns:
+        Tuple of the call ID and the decoded message
+
+    Raises:
+        FrameTooLargeError: If the body exceeds `max_bytes`; the stream is
+            left at the next frame
+        asyncio.IncompleteReadError: If the stream ends mid-frame
+    """
+    length, call_id = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    if length > max_bytes:
+        remaining = length
+        while remaining:
+            chunk = await reader.read(min(remaining, 64 * 1024))
+            if not chunk:
+                raise asyncio.IncompleteReadError(b"", remaining)
+            remaining -= len(chunk)
+        raise FrameTooLargeError(call_id, length)
+    return call_id, msgpack.unpackb(await reader.readexactly(length), raw=False)
+
+def write_frame(writer: asyncio.StreamWriter, call_id: int, message: Dict[str, Any]) -> None:
+    """
+    Queue one frame for writing.
+
+    The header and body are written without yielding to the event loop, so
+    frames from concurrent calls never interleave. Callers should await
+    `writer.drain()` afterwards.
+
+    Args:
+        writer: Stream to write to
+        call_id: Call the message belongs to
+        message: Message to encode; bytes values are sent as raw binary
+    """
+    body = msgpack.packb(message, use_bin_type=True)
+    writer.write(FRAME_HEADER.pack(len(body), call_id))
+    writer.write(body)
@@ -0,0 +1,219 @@
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Accept caller request IDs only if they are short and header/log safe
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+class Trace:
+    """Timed spans recorded while serving a single request."""
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.start = time.perf_counter()
+        # Offset converting perf_counter readings to wall-clock time for export
+        self.epoch = time.time() - self.start
+        self.spans: List[Tuple[str, float, float, int]] = []
+        self.remote: List[Tuple[str, float]] = []
+
+    def add_span(self, name: str, start: float, duration: float) -> None:
+        """Record a finished span (perf_counter start and duration in seconds)."""
+        self.spans.append((name, start, duration, threading.get_ident()))
+
+    def add_remote_timing(self, name: str, duration_ms: float) -> None:
+        """Record a timing reported by a downstream service."""
+        self.remote.append((name, duration_ms))
+
+    def server_timing(self) -> str:
+        """Format the spans recorded so far as a Server-Timing header value."""
+        entries = [f"{name};dur={duration * 1000:.1f}" for name, _, duration, _ in self.spans]
+        entries += [f"{name};dur={duration_ms:.1f}" for name, duration_ms in self.remote]
+        entries.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.1f}")
+        return ", ".join(entries)
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+def get_request_id() -> Optional[str]:
+    """Get the ID of the request being served, if any."""
+    trace = _current_trace.get()
+    return trace.request_id if trace is not None else None
+
+def get_current_trace() -> Optional[Trace]:
+    """Get the trace of the request being served, if any."""
+    return _current_trace.get()
+
+@contextmanager
+def start_trace(request_id: Optional[str] = None) -> Iterator[Trace]:
+    """
+    Trace the enclosed block as one request.
+
+    Args:
+        request_id: Caller's request ID; a new one is generated if it is
+            missing or not header/log safe
+    """
+    if not request_id or not REQUEST_ID_PATTERN.match(request_id):
+        request_id = uuid.uuid4().hex
+    trace = Trace(request_id)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Time the enclosed block as a named stage of the current request.
+
+    Outside a traced request this is a no-op. Spans also work in worker
+    threads started with run_in_threadpool, which copies the context.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_span(name, start, time.perf_counter() - start)
+
+def record_server_timing(header: Optional[str], prefix: str) -> None:
+    """
+    Merge a downstream Server-Timing header into the current trace.
+
+    Args:
+        header: Server-Timing header value from the downstream response
+        prefix: Prefix added to each downstream metric name
+    """
+    trace = _current_trace.get()
+    if trace is None or not header:
+        return
+    for entry in header.split(","):
+        parts = [part.strip() for part in entry.split(";")]
+        for param in parts[1:]:
+            if param.startswith("dur="):
+                try:
+                    trace.add_remote_timing(f"{prefix}{parts[0]}", float(param[4:]))
+                except ValueError:
+                    pass
+                break
+
+class TraceExporter:
+    """
+    Append spans to a file in the Chrome trace-event format.
+
+    The file is a JSON array left open-ended, which chrome://tracing and
+    Perfetto both accept, so events can be appended without rewriting it.
+    Timestamps are wall-clock, so traces from both services can be written
+    to the same file and viewed on one timeline.
+    """
+
+    def __init__(self, path: str, service_name: str):
+        self.path = path
+        self.service_name = service_name
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def export(self, trace: Trace, status_code: Optional[int]) -> None:
+        """Append the spans of a finished request."""
+        events = []
+        if not self._started:
+            events.append({
+                "name": "process_name", "ph": "M", "pid": self.pid,
+                "args": {"name": f"{self.service_name} ({self.pid})"}
+            })
+        args = {"request_id": trace.request_id}
+        end = time.perf_counter()
+        events.append({
+            "name": "request", "cat": self.service_name, "ph": "X", "pid": self.pid,
+            "tid": threading.get_ident(), "ts": (trace.epoch + trace.start) * 1e6,
+            "dur": (end - trace.start) * 1e6, "args": dict(args, status_code=status_code)
+        })
+        for name, start, duration, thread_id in trace.spans:
+            events.append({
+                "name": name, "cat": self.service_name, "ph": "X", "pid": self.pid,
+                "tid": thread_id, "ts": (trace.epoch + start) * 1e6, "dur": duration * 1e6, "args": args
+            })
+
+        data = b"".join(orjson.dumps(event) + b",\n" for event in events)
+        with self._lock:
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path, "ab") as f:
+                    if f.tell() == 0:
+                        f.write(b"[\n")
+                    f.write(data)
+                self._started = True
+            except OSError as e:
+                logger.error(f"Failed to export trace to {self.path}: {e}")
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware starting a trace for each HTTP request.
+
+    Accepts the caller's X-Request-ID (or generates one), makes it available
+    to spans and outgoing calls, and adds X-Request-ID and Server-Timing
+    headers to the response. Finished traces are optionally exported.
+    Browsers only expose cross-origin Server-Timing details when the
+    response carries Timing-Allow-Origin, set via `timing_allow_origin`.
+    """
+
+    def __init__(self, app, service_name: str, export_path: str = "", timing_allow_origin: str = ""):
+        self.app = app
+        self.timing_allow_origin = timing_allow_origin.encode("latin-1")
+        self.exporter = TraceExporter(export_path, service_name) if export_path else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+
+        with start_trace(request_id) as trace:
+            status_code = None
+
+            async def send_with_trace_headers(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-request-id", trace.request_id.encode("latin-1")))
+                    headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                    if self.timing_allow_origin:
+                        headers.append((b"timing-allow-origin", self.timing_allow_origin))
+                    message = dict(message, headers=headers)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_headers)
+            finally:
+                if self.exporter is not None:
+                    self.exporter.export(trace, status_code)
+
+class RequestIdLogFilter(logging.Filter):
+    """Add the current request ID to log records as `request_id`."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = get_request_id() or "-"
+        return True
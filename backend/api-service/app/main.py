@@ -1,8 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.api.routes import router as api_router
 from app.core.config import settings
+from app.core.limits import BodySizeLimitMiddleware
+from app.core.logging import setup_logging
+from app.core.tracing import TracingMiddleware
+from app.services.inference_client import close_http_client
+from app.services.job_queue import get_job_queue
+from app.services.rpc_client import close_rpc_client
+
+# Configure logging (records are written by a background thread)
+setup_logging(settings.LOG_LEVEL)
 
 def create_application() -> FastAPI:
     """Create and configure the FastAPI application."""
@@ -12,15 +22,28 @@ def create_application() -> FastAPI:
         version=settings.VERSION,
         docs_url="/docs",
         redoc_url="/redoc",
+        default_response_class=ORJSONResponse,
     )
 
-    # Configure CORS
+    # Cap request bodies while they stream in
+    application.add_middleware(BodySizeLimitMiddleware, max_bytes=settings.MAX_REQUEST_BYTES)
+
+    # Trace requests so every response carries X-Request-ID and Server-Timing
+    application.add_middleware(
+        TracingMiddleware,
+        service_name="api-service",
+        export_path=settings.TRACE_EXPORT_PATH,
+        timing_allow_origin=settings.TIMING_ALLOW_ORIGIN
+    )
+
+    # Configure CORS (added last so it also wraps limit rejections)
     application.add_middleware(
         CORSMiddleware,
         allow_origins=settings.CORS_ORIGINS,
         allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
         allow_methods=settings.CORS_ALLOW_METHODS,
         allow_headers=settings.CORS_ALLOW_HEADERS,
+        expose_headers=settings.CORS_EXPOSE_HEADERS,
     )
 
     # Include API routes
@@ -31,6 +54,18 @@ def create_application() -> FastAPI:
         """Root endpoint for health checks."""
         return {"status": "ok", "message": "Welcome to SIT-WELL-APP API"}
 
+    @application.on_event("startup")
+    async def startup_event():
+        """Start the job queue workers."""
+        await get_job_queue().start()
+
+    @application.on_event("shutdown")
+    async def shutdown_event():
+        """Stop job workers and release pooled connections on shutdown."""
+        await get_job_queue().stop()
+        await close_http_client()
+        await close_rpc_client()
+
     return application
 
 app = create_application()
@@ -0,0 +1,13 @@
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field
+
+class JobStatusResponse(BaseModel):
+    """Model for the status of an asynchronous analysis job."""
+    id: str = Field(..., description="Job identifier")
+    status: str = Field(..., description="Job state: pending, running, succeeded or failed")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Analysis parameters")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+    status_code: Optional[int] = Field(None, description="HTTP status of the finished analysis")
+    created_at: float = Field(..., description="Submission time (Unix seconds)")
+    updated_at: float = Field(..., description="Last state change (Unix seconds)")
+    expires_at: Optional[float] = Field(None, description="Time the finished job is purged (Unix seconds)")
@@ -0,0 +1,31 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+class LimitedClient(BaseModel):
+    """Model for a client's rate limit hits."""
+    client: str = Field(..., description="Pseudonymous client or session label, stable until restart")
+    limited: int = Field(..., description="Requests rejected with 429")
+
+class RateLimitMetrics(BaseModel):
+    """Model for the per-client rate limiter counters."""
+    enabled: bool = Field(..., description="Whether rate limiting is enabled")
+    rate: float = Field(..., description="Requests per second a client may sustain")
+    burst: int = Field(..., description="Requests a client may send in a burst")
+    clients: int = Field(..., description="Clients currently tracked")
+    allowed: int = Field(..., description="Requests allowed since startup")
+    limited: int = Field(..., description="Requests rejected with 429 since startup")
+    top_limited: List[LimitedClient] = Field(default_factory=list, description="Tracked clients rejected most often")
+
+class SchedulerMetrics(BaseModel):
+    """Model for inference slot usage and queue depth."""
+    max_concurrency: int = Field(..., description="Maximum concurrent inference calls")
+    active: int = Field(..., description="Inference calls in progress")
+    queued_interactive: int = Field(..., description="Interactive calls waiting for a slot")
+    queued_bulk: int = Field(..., description="Bulk job calls waiting for a slot")
+    queued_clients_interactive: int = Field(..., description="Clients with interactive calls waiting")
+    queued_clients_bulk: int = Field(..., description="Clients with bulk job calls waiting")
+
+class MetricsResponse(BaseModel):
+    """Model for the API service metrics."""
+    rate_limit: RateLimitMetrics
+    scheduler: SchedulerMetrics
@@ -1,6 +1,8 @@
 from typing import Dict, List, Optional, Any
 from pydantic import BaseModel, Field
 
+from app.core.config import settings
+
 class KeyPoint(BaseModel):
     """Model for a single keypoint with coordinates and confidence."""
     x: float
@@ -9,7 +11,7 @@ class KeyPoint(BaseModel):
 
 class PostureAnalysisRequest(BaseModel):
     """Model for posture analysis request with base64 image."""
-    image: str = Field(..., description="Base64 encoded image data")
+    image: str = Field(..., max_length=settings.MAX_REQUEST_BYTES, description="Base64 encoded image data")
 
 class PostureAnalysisResponse(BaseModel):
     """Model for posture analysis response with results and feedback."""
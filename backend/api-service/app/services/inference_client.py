@@ -1,58 +1,434 @@
+import asyncio
+import base64
 import httpx
 import logging
-from typing import Dict, Any, Optional
+import orjson
+import time
+from typing import Awaitable, Callable, Dict, Any, Optional, Tuple, TypeVar, Union
+from urllib.parse import quote
 
 from app.core.config import settings
+from app.core.logging import AggregatedLogger
+from app.core.rpc import METHOD_ANALYZE
+from app.core.tracing import REQUEST_ID_HEADER, get_request_id, record_server_timing, span
+from app.services.keypoint_codec import FORMAT_FULL, decode_payload
+from app.services.rpc_client import get_rpc_client, unix_socket_path
 
 logger = logging.getLogger(__name__)
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Base URL for requests sent through a Unix domain socket (the host only fills the Host header)
+UDS_BASE_URL = "http://inference-service"
+
+# Supported transports to the inference service
+TRANSPORT_HTTP = "http"
+TRANSPORT_RPC = "rpc"
+
+# Details of the inference service's 503 answers while it starts up or drains for a restart
+RESTARTING_DETAILS = ("Service is starting", "Service is shutting down")
+
+# Transport errors while the inference service restarts: nothing listening yet, or a
+# kept-alive connection closed by the instance shutting down
+HTTP_RESTARTING_ERRORS = (httpx.ConnectError, httpx.RemoteProtocolError)
+RPC_RESTARTING_ERRORS = (ConnectionError, FileNotFoundError)
+
+T = TypeVar("T")
+
+# Client errors such as "no person detected" repeat on every live frame
+inference_rejections = AggregatedLogger(logger, settings.LOG_AGGREGATE_INTERVAL)
+
+# Every call held during an inference service restart retries until it is back
+restart_retries = AggregatedLogger(logger, settings.LOG_AGGREGATE_INTERVAL)
+
+def log_error_status(status_code: int) -> None:
+    """Log an error response from the inference service, summarizing repeated client errors."""
+    if status_code < 500:
+        inference_rejections.log(str(status_code), f"Inference service rejected request with status {status_code}")
+    else:
+        logger.error("Inference service returned error status %d", status_code)
+
+# Shared HTTP client so connections to the inference service are pooled
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get or create the shared HTTP client for the inference service.
+
+    Returns:
+        httpx.AsyncClient instance
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        socket_path = unix_socket_path(settings.INFERENCE_SERVICE_URL)
+        transport = httpx.AsyncHTTPTransport(uds=socket_path) if socket_path else None
+        _http_client = httpx.AsyncClient(timeout=settings.INFERENCE_TIMEOUT, transport=transport)
+    return _http_client
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client, if it was created."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 class InferenceClient:
-    """Client for communicating with the inference service."""
-    
+    """
+    Client for communicating with the inference service.
+
+    Calls go over the JSON/HTTP API, or with INFERENCE_TRANSPORT=rpc over the
+    internal binary transport, where raw image bytes and binary payloads
+    travel without base64 or JSON encoding. Either transport connects through
+    a Unix domain socket when its URL uses the unix:// scheme.
+    """
+
     def __init__(self):
         self.base_url = settings.INFERENCE_SERVICE_URL
+        if unix_socket_path(self.base_url):
+            # The shared HTTP client connects through the socket
+            self.base_url = UDS_BASE_URL
         self.timeout = settings.INFERENCE_TIMEOUT
-    
-    async def analyze_image(self, image_data: str) -> Dict[str, Any]:
+        self.transport = settings.INFERENCE_TRANSPORT
+        self.client = get_http_client()
+
+    async def analyze_image(
+        self,
+        image_data: Union[str, bytes],
+        response_format: str = FORMAT_FULL,
+        tier: Optional[str] = None,
+        session_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+        include_image: bool = True
+    ) -> Dict[str, Any]:
         """
         Send image data to inference service for analysis.
-        
+
         Args:
-            image_data: Base64 encoded image
-            
+            image_data: Base64 encoded image, or raw image bytes
+            response_format: Response format to request from the inference service
+            tier: Model latency tier to run the image on
+            session_id: Live session ID forwarded for keyframe tracking
+            timeout: Request timeout in seconds (defaults to INFERENCE_TIMEOUT)
+            include_image: Request the pose overlay image
+
         Returns:
             Analysis results from inference service
-            
+
         Raises:
-            HTTPException: If inference service returns an error
+            InferenceServiceError: If inference service returns an error
         """
+        if self.transport == TRANSPORT_RPC:
+            content, content_type = await self._call_rpc(
+                image_data, response_format, tier, session_id, include_image, timeout
+            )
+            with span("decode"):
+                return decode_payload(content, content_type)
+
+        response = await self._retry_if_restarting(
+            self._post_analysis, image_data, response_format, tier, session_id, timeout, include_image
+        )
+        with span("decode"):
+            return decode_payload(response.content, response.headers.get("content-type"))
+
+    async def _post_analysis(
+        self,
+        image_data: Union[str, bytes],
+        response_format: str,
+        tier: Optional[str],
+        session_id: Optional[str],
+        timeout: Optional[float],
+        include_image: bool
+    ) -> httpx.Response:
+        """Run an analyze call over HTTP, returning the successful response."""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
+            with span("inference"):
+                response = await self.client.post(
                     f"{self.base_url}/api/inference/analyze",
-                    json={"image": image_data}
+                    content=self._json_body(image_data),
+                    headers=self._request_headers(session_id),
+                    params=self._query_params(response_format, tier, include_image),
+                    timeout=timeout or self.timeout
                 )
-                response.raise_for_status()
-                return response.json()
+            record_server_timing(response.headers.get("server-timing"), "inference-")
+            response.raise_for_status()
+            return response
         except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error occurred while calling inference service: {e}")
-            error_detail = await self._extract_error_detail(e.response)
+            log_error_status(e.response.status_code)
+            error_detail = self._extract_error_detail(e.response)
             raise InferenceServiceError(
-                status_code=e.response.status_code, 
+                status_code=e.response.status_code,
                 detail=error_detail or str(e)
             )
         except httpx.RequestError as e:
-            logger.error(f"Error occurred while requesting inference service: {e}")
+            logger.error("Error occurred while requesting inference service: %s", e)
+            raise InferenceServiceError(
+                status_code=503,
+                detail=f"Inference service unavailable: {str(e)}",
+                restarting=isinstance(e, HTTP_RESTARTING_ERRORS)
+            )
+
+    async def fetch_analysis(
+        self,
+        image_data: Union[str, bytes],
+        response_format: str = FORMAT_FULL,
+        tier: Optional[str] = None,
+        session_id: Optional[str] = None,
+        include_image: bool = True
+    ) -> Tuple[bytes, str]:
+        """
+        Send image data over the RPC transport and return the encoded response.
+
+        The body is exactly what the HTTP API would have returned, so it can
+        be relayed to the caller without being parsed.
+
+        Args:
+            image_data: Base64 encoded image, or raw image bytes
+            response_format: Response format to request from the inference service
+            tier: Model latency tier to run the image on
+            session_id: Live session ID forwarded for keyframe tracking
+            include_image: Request the pose overlay image
+
+        Returns:
+            Tuple of the response body and its media type
+
+        Raises:
+            InferenceServiceError: If inference service returns an error
+        """
+        return await self._call_rpc(image_data, response_format, tier, session_id, include_image)
+
+    async def open_analysis_stream(
+        self,
+        image_data: Union[str, bytes],
+        response_format: str = FORMAT_FULL,
+        tier: Optional[str] = None,
+        session_id: Optional[str] = None,
+        include_image: bool = True
+    ) -> httpx.Response:
+        """
+        Send image data to inference service and return the unread response.
+
+        The response body is left unread so it can be relayed to the caller
+        chunk by chunk without being parsed. The caller must close the
+        response with `aclose()` once it has been consumed.
+
+        Args:
+            image_data: Base64 encoded image, or raw image bytes
+            response_format: Response format to request from the inference service
+            tier: Model latency tier to run the image on
+            session_id: Live session ID forwarded for keyframe tracking
+            include_image: Request the pose overlay image
+
+        Returns:
+            Streaming response from inference service
+
+        Raises:
+            InferenceServiceError: If inference service returns an error
+        """
+        return await self._retry_if_restarting(
+            self._open_analysis_stream, image_data, response_format, tier, session_id, include_image
+        )
+
+    async def _open_analysis_stream(
+        self,
+        image_data: Union[str, bytes],
+        response_format: str,
+        tier: Optional[str],
+        session_id: Optional[str],
+        include_image: bool
+    ) -> httpx.Response:
+        """Send an analyze call over HTTP, returning the successful response unread."""
+        request = self.client.build_request(
+            "POST",
+            f"{self.base_url}/api/inference/analyze",
+            content=self._json_body(image_data),
+            headers=self._request_headers(session_id),
+            params=self._query_params(response_format, tier, include_image),
+            timeout=self.timeout
+        )
+        try:
+            with span("inference"):
+                response = await self.client.send(request, stream=True)
+        except httpx.RequestError as e:
+            logger.error("Error occurred while requesting inference service: %s", e)
+            raise InferenceServiceError(
+                status_code=503,
+                detail=f"Inference service unavailable: {str(e)}",
+                restarting=isinstance(e, HTTP_RESTARTING_ERRORS)
+            )
+
+        record_server_timing(response.headers.get("server-timing"), "inference-")
+        if response.is_error:
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+            log_error_status(response.status_code)
+            raise InferenceServiceError(
+                status_code=response.status_code,
+                detail=self._extract_error_detail(response) or f"Inference service error: {response.status_code}"
+            )
+        return response
+
+    async def open_event_stream(self, session_id: str) -> httpx.Response:
+        """
+        Subscribe to a live session's posture state events.
+
+        Events are only served over HTTP, whichever transport analyze calls
+        use. The Server-Sent Events body is left unread with no read timeout,
+        since events may be minutes apart. The caller must close the response
+        with `aclose()` once the subscriber disconnects.
+
+        Args:
+            session_id: Live session ID the frames are sent with
+
+        Returns:
+            Streaming response from inference service
+
+        Raises:
+            InferenceServiceError: If inference service returns an error
+        """
+        request = self.client.build_request(
+            "GET",
+            f"{self.base_url}/api/inference/sessions/{quote(session_id, safe='')}/events",
+            headers=self._request_headers(None),
+            timeout=httpx.Timeout(self.timeout, read=None)
+        )
+        try:
+            response = await self.client.send(request, stream=True)
+        except httpx.RequestError as e:
+            logger.error("Error occurred while subscribing to inference service events: %s", e)
             raise InferenceServiceError(
                 status_code=503,
                 detail=f"Inference service unavailable: {str(e)}"
             )
-    
+
+        if response.is_error:
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+            log_error_status(response.status_code)
+            raise InferenceServiceError(
+                status_code=response.status_code,
+                detail=self._extract_error_detail(response) or f"Inference service error: {response.status_code}"
+            )
+        return response
+
+    async def _call_rpc(
+        self,
+        image_data: Union[str, bytes],
+        response_format: str,
+        tier: Optional[str],
+        session_id: Optional[str],
+        include_image: bool = True,
+        timeout: Optional[float] = None
+    ) -> Tuple[bytes, str]:
+        """Run an analyze call over the RPC transport, returning the encoded body and its media type."""
+        return await self._retry_if_restarting(
+            self._send_rpc, image_data, response_format, tier, session_id, include_image, timeout
+        )
+
+    async def _send_rpc(
+        self,
+        image_data: Union[str, bytes],
+        response_format: str,
+        tier: Optional[str],
+        session_id: Optional[str],
+        include_image: bool,
+        timeout: Optional[float]
+    ) -> Tuple[bytes, str]:
+        """Send one analyze call over the RPC transport."""
+        message = {
+            "method": METHOD_ANALYZE,
+            "image": image_data,
+            "format": response_format,
+            "tier": tier,
+            "session_id": session_id,
+            "include_image": include_image,
+            "include_analysis": False,
+            "request_id": get_request_id()
+        }
+        try:
+            with span("inference"):
+                reply = await get_rpc_client().call(message, timeout or self.timeout)
+        except (ConnectionError, OSError, asyncio.TimeoutError) as e:
+            logger.error("Error occurred while calling inference service over RPC: %r", e)
+            raise InferenceServiceError(
+                status_code=503,
+                detail=f"Inference service unavailable: {str(e) or type(e).__name__}",
+                restarting=isinstance(e, RPC_RESTARTING_ERRORS)
+            )
+
+        record_server_timing(reply.get("timing"), "inference-")
+        status_code = reply.get("status", 500)
+        if status_code >= 400:
+            log_error_status(status_code)
+            raise InferenceServiceError(
+                status_code=status_code,
+                detail=reply.get("detail") or f"Inference service error: {status_code}"
+            )
+        return reply["body"], reply["content_type"]
+
     @staticmethod
-    async def _extract_error_detail(response) -> Optional[str]:
+    async def _retry_if_restarting(call: Callable[..., Awaitable[T]], *args: Any) -> T:
+        """
+        Await an analyze call, holding it while the inference service restarts.
+
+        Calls turned away because the service is starting up or draining,
+        or that find nothing listening, are retried every
+        INFERENCE_RETRY_DELAY seconds for up to INFERENCE_RESTART_TIMEOUT
+        seconds, so a restart delays calls instead of failing them.
+        """
+        deadline = time.monotonic() + settings.INFERENCE_RESTART_TIMEOUT
+        while True:
+            try:
+                return await call(*args)
+            except InferenceServiceError as e:
+                if (not settings.INFERENCE_RETRY_DELAY or not e.restarting
+                        or time.monotonic() + settings.INFERENCE_RETRY_DELAY > deadline):
+                    raise
+                restart_retries.log(
+                    "restarting", f"Inference service restarting ({e.detail}), retrying every "
+                    f"{settings.INFERENCE_RETRY_DELAY:g}s for up to {settings.INFERENCE_RESTART_TIMEOUT:g}s"
+                )
+            await asyncio.sleep(settings.INFERENCE_RETRY_DELAY)
+
+    @staticmethod
+    def _json_body(image_data: Union[str, bytes]) -> bytes:
+        """Encode the JSON request body, base64-encoding raw image bytes."""
+        if isinstance(image_data, bytes):
+            image_data = base64.b64encode(image_data).decode("utf-8")
+        return orjson.dumps({"image": image_data})
+
+    @staticmethod
+    def _request_headers(session_id: Optional[str]) -> Dict[str, str]:
+        """Build request headers, forwarding the request and live session IDs if present."""
+        headers = dict(JSON_HEADERS)
+        request_id = get_request_id()
+        if request_id:
+            headers[REQUEST_ID_HEADER] = request_id
+        if session_id:
+            headers["X-Session-ID"] = session_id
+        return headers
+
+    @staticmethod
+    def _query_params(response_format: str, tier: Optional[str], include_image: bool = True) -> Dict[str, str]:
+        """Build query parameters selecting the response format, model tier, overlay image and fields."""
+        # Only the fields of PostureAnalysisResponse, so relayed responses match it
+        params = {"include_analysis": "false"}
+        if response_format != FORMAT_FULL:
+            params["format"] = response_format
+        if tier:
+            params["tier"] = tier
+        if not include_image:
+            params["include_image"] = "false"
+        return params
+
+    @staticmethod
+    def _extract_error_detail(response) -> Optional[str]:
         """Extract error detail from response if available."""
         try:
-            error_data = await response.json()
+            error_data = orjson.loads(response.content)
             if isinstance(error_data, dict) and "detail" in error_data:
                 return error_data["detail"]
             return None
@@ -62,8 +438,10 @@ class InferenceClient:
 
 class InferenceServiceError(Exception):
     """Exception raised for errors in the inference service."""
-    
-    def __init__(self, status_code: int, detail: str):
+
+    def __init__(self, status_code: int, detail: str, restarting: bool = False):
         self.status_code = status_code
         self.detail = detail
-        super().__init__(self.detail)
\ No newline at end of file
+        # Whether the call failed because the inference service is restarting
+        self.restarting = restarting or (status_code == 503 and detail in RESTARTING_DETAILS)
+        super().__init__(self.detail)
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from app.core.config import settings
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BULK)
+
+class InferenceScheduler:
+    """
+    Concurrency limiter for calls to the inference service.
+
+    At most `max_concurrency` calls run at once. When all slots are busy,
+    waiters queue by priority and a freed slot goes to the most urgent
+    priority, so interactive requests overtake queued bulk jobs. Within a
+    priority each client has its own queue and clients take turns, so one
+    client flooding the queue only delays its own calls.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._active = 0
+        self._queued = 0
+        # Per priority, each client's waiters in the order the clients take turns
+        self._waiters: Dict[int, "OrderedDict[str, Deque[asyncio.Future]]"] = {
+            priority: OrderedDict() for priority in PRIORITIES
+        }
+
+    @property
+    def active(self) -> int:
+        """Number of slots in use."""
+        return self._active
+
+    def queued(self, priority: Optional[int] = None) -> int:
+        """Number of waiters, optionally for a single priority."""
+        if priority is not None:
+            return sum(len(waiters) for waiters in self._waiters[priority].values())
+        return self._queued
+
+    def queued_clients(self, priority: int) -> int:
+        """Number of clients with waiters at a priority."""
+        return len(self._waiters[priority])
+
+    def stats(self) -> Dict[str, int]:
+        """Slot usage and queue depth per priority."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "queued_interactive": self.queued(PRIORITY_INTERACTIVE),
+            "queued_bulk": self.queued(PRIORITY_BULK),
+            "queued_clients_interactive": self.queued_clients(PRIORITY_INTERACTIVE),
+            "queued_clients_bulk": self.queued_clients(PRIORITY_BULK)
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_INTERACTIVE, client: str = "") -> AsyncIterator[None]:
+        """Hold an inference slot for the duration of the block."""
+        with span("queue"):
+            await self.acquire(priority, client)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE, client: str = "") -> None:
+        """Wait for a free inference slot on behalf of a client."""
+        if self._active < self.max_concurrency and not self._queued:
+            self._active += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        clients = self._waiters[priority]
+        waiters = clients.get(client)
+        if waiters is None:
+            waiters = clients[client] = deque()
+        waiters.append(waiter)
+        self._queued += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before cancellation; pass it on
+                self.release()
+            else:
+                self._discard(priority, client, waiter)
+            raise
+
+    def release(self) -> None:
+        """Release a slot, handing it to the next waiter if there is one."""
+        for priority in PRIORITIES:
+            clients = self._waiters[priority]
+            while clients:
+                # Serve the client whose turn it is, then send it to the back of the line
+                client, waiters = next(iter(clients.items()))
+                waiter = waiters.popleft()
+                self._queued -= 1
+                if waiters:
+                    clients.move_to_end(client)
+                else:
+                    del clients[client]
+                if not waiter.done():
+                    # Hand the slot over directly; the active count is unchanged
+                    waiter.set_result(None)
+                    return
+        self._active -= 1
+
+    def _discard(self, priority: int, client: str, waiter: asyncio.Future) -> None:
+        """Remove a cancelled waiter that is still queued."""
+        waiters = self._waiters[priority].get(client)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        self._queued -= 1
+        if not waiters:
+            del self._waiters[priority][client]
+
+# Singleton instance to share across requests
+_inference_scheduler_instance = None
+
+def get_inference_scheduler() -> InferenceScheduler:
+    """
+    Get or create singleton instance of InferenceScheduler.
+
+    Returns:
+        InferenceScheduler instance
+    """
+    global _inference_scheduler_instance
+    if _inference_scheduler_instance is None:
+        _inference_scheduler_instance = InferenceScheduler(settings.INFERENCE_CONCURRENCY)
+    return _inference_scheduler_instance
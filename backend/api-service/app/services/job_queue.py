@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Dict, Any, List, Optional
+
+import orjson
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.inference_client import InferenceClient, InferenceServiceError
+from app.services.inference_scheduler import get_inference_scheduler, PRIORITY_BULK
+from app.services.job_store import JobStore
+
+logger = logging.getLogger(__name__)
+
+class JobQueueFullError(Exception):
+    """Exception raised when a job is submitted while the queue is full."""
+
+    def __init__(self, detail: str):
+        self.detail = detail
+        super().__init__(self.detail)
+
+class JobQueue:
+    """
+    Asynchronous job queue for heavy analysis requests.
+
+    Jobs are persisted in a JobStore and processed by a pool of local
+    worker tasks. Workers take inference slots at bulk priority, so
+    interactive `/analyze` calls are served first whenever the inference
+    service is saturated. Unfinished jobs are requeued on startup, and
+    finished jobs are purged once their retention TTL expires. Queued jobs
+    keep their uploads in the store until they run, so at most
+    `max_queued` jobs may wait at once.
+    """
+
+    def __init__(self, store_path: str, workers: int, result_ttl: float, purge_interval: float, max_queued: int):
+        self.store_path = store_path
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self.purge_interval = purge_interval
+        self.max_queued = max_queued
+        self.store: Optional[JobStore] = None
+        self._queue: Optional["asyncio.Queue[str]"] = None
+        self._tasks: List[asyncio.Task] = []
+        # Submissions being written to the store, counted against the limit meanwhile
+        self._submitting = 0
+
+    async def start(self) -> None:
+        """Open the store, requeue unfinished jobs and start the workers."""
+        self.store = await run_in_threadpool(JobStore, self.store_path)
+        self._queue = asyncio.Queue()
+        for job_id in await run_in_threadpool(self.store.requeue_unfinished):
+            self._queue.put_nowait(job_id)
+        if self._queue.qsize():
+            logger.info(f"Requeued {self._queue.qsize()} unfinished jobs")
+
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._purge_loop()))
+
+    async def stop(self) -> None:
+        """Stop the workers. Interrupted jobs stay in the store and are requeued on next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.store is not None:
+            await run_in_threadpool(self.store.close)
+            self.store = None
+
+    async def submit(self, image: bytes, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Persist a new job and queue it for processing.
+
+        Args:
+            image: Raw image bytes
+            params: Analysis parameters (e.g. model tier)
+
+        Returns:
+            Job metadata
+
+        Raises:
+            JobQueueFullError: If `max_queued` jobs are already waiting
+        """
+        if self.max_queued and self._queue.qsize() + self._submitting >= self.max_queued:
+            raise JobQueueFullError(f"Job queue is full ({self.max_queued} jobs waiting)")
+        job_id = uuid.uuid4().hex
+        self._submitting += 1
+        try:
+            job = await run_in_threadpool(self.store.create, job_id, params, image)
+        finally:
+            self._submitting -= 1
+        self._queue.put_nowait(job_id)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get job metadata, treating expired jobs as gone."""
+        job = await run_in_threadpool(self.store.get, job_id)
+        if job is None or (job["expires_at"] is not None and job["expires_at"] < time.time()):
+            return None
+        return job
+
+    async def get_result(self, job_id: str) -> Optional[bytes]:
+        """Get the JSON-encoded result of a finished job."""
+        return await run_in_threadpool(self.store.get_result, job_id)
+
+    async def _worker(self, index: int) -> None:
+        """Process queued jobs until cancelled."""
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {index} failed on job {job_id}: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        """Run a single job against the inference service."""
+        job = await run_in_threadpool(self.store.get, job_id)
+        payload = await run_in_threadpool(self.store.get_payload, job_id)
+        if job is None or payload is None:
+            return
+
+        await run_in_threadpool(self.store.mark_running, job_id)
+        params = job["params"]
+        try:
+            async with get_inference_scheduler().slot(PRIORITY_BULK):
+                result = await InferenceClient().analyze_image(
+                    payload,
+                    tier=params.get("tier"),
+                    timeout=settings.JOB_INFERENCE_TIMEOUT
+                )
+        except InferenceServiceError as e:
+            logger.warning(f"Job {job_id} failed: {e.detail}")
+            await run_in_threadpool(self.store.fail, job_id, e.detail, e.status_code, self.result_ttl)
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+            await run_in_threadpool(self.store.fail, job_id, str(e), 500, self.result_ttl)
+            return
+
+        await run_in_threadpool(self.store.complete, job_id, orjson.dumps(result), self.result_ttl)
+        logger.info(f"Job {job_id} succeeded")
+
+    async def _purge_loop(self) -> None:
+        """Periodically delete expired jobs."""
+        while True:
+            await asyncio.sleep(self.purge_interval)
+            try:
+                purged = await run_in_threadpool(self.store.purge_expired)
+                if purged:
+                    logger.info(f"Purged {purged} expired jobs")
+            except Exception as e:
+                logger.error(f"Error purging expired jobs: {e}", exc_info=True)
+
+# Singleton instance to share across requests
+_job_queue_instance = None
+
+def get_job_queue() -> JobQueue:
+    """
+    Get or create singleton instance of JobQueue.
+
+    Returns:
+        JobQueue instance
+    """
+    global _job_queue_instance
+    if _job_queue_instance is None:
+        _job_queue_instance = JobQueue(
+            store_path=settings.JOB_STORE_PATH,
+            workers=settings.JOB_WORKERS,
+            result_ttl=settings.JOB_RESULT_TTL,
+            purge_interval=settings.JOB_PURGE_INTERVAL,
+            max_queued=settings.JOB_MAX_QUEUED
+        )
+    return _job_queue_instance
@@ -0,0 +1,153 @@
+import os
+import sqlite3
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Job states
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    payload BLOB,
+    result BLOB,
+    error TEXT,
+    status_code INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_expires ON jobs (expires_at);
+"""
+
+JOB_COLUMNS = "id, status, params, error, status_code, created_at, updated_at, expires_at"
+
+class JobStore:
+    """
+    Durable local job store backed by SQLite.
+
+    Jobs keep their image payload until they finish, so pending and running
+    jobs survive a restart and can be requeued. Finished jobs drop the
+    payload, keep the result until `expires_at`, and are then purged.
+    All methods are blocking and should be called from a worker thread.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str, params: Dict[str, Any], payload: bytes) -> Dict[str, Any]:
+        """Insert a new pending job."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, params, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, JOB_PENDING, orjson.dumps(params).decode("utf-8"), payload, now, now)
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get job metadata (without payload or result)."""
+        with self._lock:
+            row = self._conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def get_payload(self, job_id: str) -> Optional[bytes]:
+        """Get the image payload of an unfinished job."""
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def get_result(self, job_id: str) -> Optional[bytes]:
+        """Get the encoded result of a finished job."""
+        with self._lock:
+            row = self._conn.execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def mark_running(self, job_id: str) -> None:
+        """Mark a job as running."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                (JOB_RUNNING, time.time(), job_id)
+            )
+
+    def complete(self, job_id: str, result: bytes, ttl: float) -> None:
+        """Store a job result, drop its payload and start its retention TTL."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, payload = NULL, status_code = 200, "
+                "updated_at = ?, expires_at = ? WHERE id = ?",
+                (JOB_SUCCEEDED, result, now, now + ttl, job_id)
+            )
+
+    def fail(self, job_id: str, error: str, status_code: int, ttl: float) -> None:
+        """Record a job failure, drop its payload and start its retention TTL."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, payload = NULL, status_code = ?, "
+                "updated_at = ?, expires_at = ? WHERE id = ?",
+                (JOB_FAILED, error, status_code, now, now + ttl, job_id)
+            )
+
+    def requeue_unfinished(self) -> List[str]:
+        """Reset running jobs to pending and return all pending job IDs, oldest first."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?",
+                (JOB_PENDING, time.time(), JOB_RUNNING)
+            )
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at",
+                (JOB_PENDING,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def purge_expired(self) -> int:
+        """Delete finished jobs past their retention TTL."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at < ?",
+                (time.time(),)
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _to_dict(row) -> Dict[str, Any]:
+        """Convert a metadata row to a dictionary."""
+        job_id, status, params, error, status_code, created_at, updated_at, expires_at = row
+        return {
+            "id": job_id,
+            "status": status,
+            "params": orjson.loads(params),
+            "error": error,
+            "status_code": status_code,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "expires_at": expires_at,
+        }
@@ -0,0 +1,104 @@
+import msgpack
+import orjson
+from typing import Dict, Any, Optional
+
+# Supported response formats (mirrors the inference service)
+FORMAT_FULL = "full"
+FORMAT_COMPACT = "compact"
+FORMAT_MSGPACK = "msgpack"
+FORMAT_PATTERN = f"^({FORMAT_FULL}|{FORMAT_COMPACT}|{FORMAT_MSGPACK})$"
+
+# Media types used for content negotiation
+JSON_MEDIA_TYPE = "application/json"
+COMPACT_MEDIA_TYPE = "application/vnd.sitwell.compact+json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+MSGPACK_MEDIA_TYPE = MSGPACK_MEDIA_TYPES[0]
+
+# Formats negotiable through the Accept header, with their media types; when
+# ranges are accepted equally, formats listed first are preferred
+ACCEPT_FORMATS = (
+    (FORMAT_MSGPACK, MSGPACK_MEDIA_TYPES),
+    (FORMAT_COMPACT, (COMPACT_MEDIA_TYPE,)),
+    (FORMAT_FULL, (JSON_MEDIA_TYPE,)),
+)
+# Ranges that also cover JSON
+JSON_WILDCARDS = ("application/*", "*/*")
+
+MEDIA_TYPES = {
+    FORMAT_FULL: JSON_MEDIA_TYPE,
+    FORMAT_COMPACT: COMPACT_MEDIA_TYPE,
+    FORMAT_MSGPACK: MSGPACK_MEDIA_TYPE,
+}
+
+def negotiate_format(requested: Optional[str], accept: Optional[str]) -> str:
+    """
+    Pick the response format for a request.
+
+    An explicit `format` query value wins over the Accept header. Otherwise
+    the supported format with the highest quality in the Accept header is
+    used, with JSON as the fallback; ranges with q=0 are never picked.
+
+    Args:
+        requested: Value of the `format` query parameter
+        accept: Value of the Accept header
+
+    Returns:
+        One of FORMAT_FULL, FORMAT_COMPACT or FORMAT_MSGPACK
+    """
+    if requested:
+        return requested
+    if not accept:
+        return FORMAT_FULL
+
+    qualities = parse_accept(accept)
+    best_format, best_quality = FORMAT_FULL, 0.0
+    for response_format, media_types in ACCEPT_FORMATS:
+        listed = [qualities[media_type] for media_type in media_types if media_type in qualities]
+        if not listed and response_format == FORMAT_FULL:
+            listed = [qualities[media_type] for media_type in JSON_WILDCARDS if media_type in qualities]
+        if listed and max(listed) > best_quality:
+            best_format, best_quality = response_format, max(listed)
+    return best_format
+
+def parse_accept(accept: str) -> Dict[str, float]:
+    """
+    Parse an Accept header into media ranges and their quality values.
+
+    Ranges without a q parameter have quality 1; ranges with an invalid one
+    are skipped. A range listed more than once keeps its highest quality.
+
+    Args:
+        accept: Value of the Accept header
+
+    Returns:
+        Dictionary of lowercased media ranges to qualities (0-1)
+    """
+    qualities: Dict[str, float] = {}
+    for media_range in accept.lower().split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        if not media_type:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    quality = None
+                break
+        if quality is not None:
+            qualities[media_type] = max(quality, qualities.get(media_type, 0.0))
+    return qualities
+
+def decode_payload(content: bytes, content_type: Optional[str]) -> Dict[str, Any]:
+    """Decode an inference service response body based on its content type."""
+    if content_type and any(media_type in content_type for media_type in MSGPACK_MEDIA_TYPES):
+        return msgpack.unpackb(content, raw=False)
+    return orjson.loads(content)
+
+def encode_payload(payload: Dict[str, Any], response_format: str) -> bytes:
+    """Encode a response payload for a compact or MessagePack response."""
+    if response_format == FORMAT_MSGPACK:
+        return msgpack.packb(payload, use_bin_type=True)
+    return orjson.dumps(payload)
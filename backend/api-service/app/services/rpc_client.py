@@ -0,0 +1,162 @@
+import asyncio
+import itertools
+import logging
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+from app.core.rpc import FrameTooLargeError, read_frame, write_frame
+
+logger = logging.getLogger(__name__)
+
+# Call IDs are 32-bit and wrap around
+MAX_CALL_ID = 2**32
+
+def unix_socket_path(url: str) -> Optional[str]:
+    """
+    Get the socket path of a unix:// URL.
+
+    Both unix:///absolute/path and unix://relative/path are accepted.
+
+    Returns:
+        Socket path, or None if the URL has another scheme
+
+    Raises:
+        ValueError: If a unix:// URL has no path
+    """
+    parts = urlsplit(url)
+    if parts.scheme != "unix":
+        return None
+    path = parts.netloc + parts.path
+    if not path:
+        raise ValueError(f"Invalid Unix socket URL: {url!r} (expected unix:///path/to/socket)")
+    return path
+
+def parse_rpc_url(url: str) -> Tuple[str, int]:
+    """
+    Parse an RPC URL of the form tcp://host:port.
+
+    Raises:
+        ValueError: If the URL is not a tcp:// URL with a port
+    """
+    parts = urlsplit(url)
+    if parts.scheme != "tcp" or not parts.hostname or not parts.port:
+        raise ValueError(f"Invalid RPC URL: {url!r} (expected tcp://host:port or unix:///path/to/socket)")
+    return parts.hostname, parts.port
+
+class RpcClient:
+    """
+    Client for the inference service's internal RPC transport.
+
+    Keeps one persistent connection and multiplexes concurrent calls on
+    it: each call is tagged with an ID and a reader task resolves the
+    waiting call when its reply arrives, in whatever order replies come
+    back. A dropped connection fails the calls in flight and is
+    re-established on the next call.
+    """
+
+    def __init__(self, url: str, max_frame_bytes: int):
+        self.socket_path = unix_socket_path(url)
+        self.host, self.port = parse_rpc_url(url) if self.socket_path is None else (None, None)
+        self.max_frame_bytes = max_frame_bytes
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._call_ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+        # Concurrent drain() calls on one writer are not supported before Python 3.10
+        self._drain_lock = asyncio.Lock()
+
+    async def call(self, message: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """
+        Send a call and wait for its reply.
+
+        Args:
+            message: Call message; bytes values are sent as raw binary
+            timeout: Seconds to wait for the reply
+
+        Returns:
+            Reply message
+
+        Raises:
+            ConnectionError: If the connection fails or drops before the reply
+            asyncio.TimeoutError: If no reply arrives in time
+        """
+        writer = await self._connect()
+        call_id = next(self._call_ids) % MAX_CALL_ID
+        future = asyncio.get_running_loop().create_future()
+        self._pending[call_id] = future
+        try:
+            write_frame(writer, call_id, message)
+            async with self._drain_lock:
+                await writer.drain()
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(call_id, None)
+
+    async def close(self) -> None:
+        """Close the connection, failing calls in flight."""
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+            self._reader_task = None
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        """Get the open connection, connecting first if needed."""
+        if self._writer is not None and not self._writer.is_closing():
+            return self._writer
+        async with self._connect_lock:
+            if self._writer is None or self._writer.is_closing():
+                if self.socket_path is not None:
+                    reader, self._writer = await asyncio.open_unix_connection(self.socket_path)
+                else:
+                    reader, self._writer = await asyncio.open_connection(self.host, self.port)
+                self._reader_task = asyncio.create_task(self._read_replies(reader, self._writer))
+            return self._writer
+
+    async def _read_replies(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Resolve pending calls as replies arrive, until the connection closes."""
+        error: Exception = ConnectionError("Connection to inference service closed")
+        try:
+            while True:
+                try:
+                    call_id, reply = await read_frame(reader, self.max_frame_bytes)
+                except FrameTooLargeError as e:
+                    call_id, reply = e.call_id, {"status": 502, "detail": str(e)}
+                future = self._pending.get(call_id)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            logger.warning("RPC connection to inference service lost: %s", e)
+        except Exception as e:
+            logger.error("RPC connection to inference service failed: %s", e, exc_info=True)
+            error = ConnectionError(f"Connection to inference service failed: {e}")
+        finally:
+            writer.close()
+            if self._writer is writer:
+                self._writer = None
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+
+# Shared client so all calls are multiplexed on one connection
+_rpc_client: Optional[RpcClient] = None
+
+def get_rpc_client() -> RpcClient:
+    """
+    Get or create the shared RPC client for the inference service.
+
+    Returns:
+        RpcClient instance
+    """
+    global _rpc_client
+    if _rpc_client is None:
+        _rpc_client = RpcClient(settings.INFERENCE_RPC_URL, settings.INFERENCE_RPC_MAX_FRAME_BYTES)
+    return _rpc_client
+
+async def close_rpc_client() -> None:
+    """Close the shared RPC client, if it was created."""
+    global _rpc_client
+    if _rpc_client is not None:
+        await _rpc_client.close()
+        _rpc_client = None
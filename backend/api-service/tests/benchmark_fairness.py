@@ -0,0 +1,59 @@
+import asyncio
+import os
+import sys
+import time
+import numpy as np
+
+# Run from the api-service directory: python tests/benchmark_fairness.py
+# Simulates one client flooding the inference queue while light clients send a
+# frame now and then, and compares the light clients' queueing delay when the
+# scheduler takes turns across clients with a single shared queue. Also times
+# the per-request rate limiter check.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.limits import RateLimiter
+from app.services.inference_scheduler import InferenceScheduler, PRIORITY_INTERACTIVE
+
+concurrency = 2
+inference_seconds = 0.01
+heavy_requests = 200
+light_clients = 5
+light_interval = 0.1
+limiter_checks = 200000
+
+async def simulate(fair):
+    scheduler = InferenceScheduler(concurrency)
+    light_waits = []
+
+    async def call(client, waits=None):
+        start = time.perf_counter()
+        async with scheduler.slot(PRIORITY_INTERACTIVE, client if fair else ""):
+            if waits is not None:
+                waits.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(inference_seconds)
+
+    async def light_client(name):
+        for _ in range(5):
+            await call(name, light_waits)
+            await asyncio.sleep(light_interval)
+
+    heavy = [asyncio.create_task(call("heavy")) for _ in range(heavy_requests)]
+    await asyncio.sleep(0)
+    await asyncio.gather(*(light_client(f"light-{i}") for i in range(light_clients)), *heavy)
+    return np.median(light_waits), np.max(light_waits)
+
+def time_limiter():
+    limiter = RateLimiter(rate=5, burst=10, max_clients=10000)
+    start = time.perf_counter()
+    for i in range(limiter_checks):
+        limiter.acquire(str(i % 1000))
+    return (time.perf_counter() - start) / limiter_checks * 1e6
+
+if __name__ == "__main__":
+    print(f"{heavy_requests} queued calls from one client, {light_clients} light clients, "
+          f"{concurrency} slots, {inference_seconds * 1000:.0f} ms per call\n")
+    for fair in (False, True):
+        p50, worst = asyncio.run(simulate(fair))
+        label = "turns across clients" if fair else "single queue        "
+        print(f"{label}  light client wait p50: {p50:8.2f} ms   max: {worst:8.2f} ms")
+    print(f"\nrate limiter check: {time_limiter():.2f} us per request")
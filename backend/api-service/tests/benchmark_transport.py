@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sys
+import time
+import numpy as np
+
+# Run from the api-service directory against a running inference service:
+#   INFERENCE_SERVICE_URL=http://localhost:8001 INFERENCE_RPC_URL=tcp://localhost:8002 \
+#   python tests/benchmark_transport.py [image_path]
+# Repeat with unix:// URLs (UDS_PATH / RPC_SOCKET_PATH on the inference service)
+# to compare Unix domain sockets against loopback TCP.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings
+from app.services.inference_client import InferenceClient, TRANSPORT_HTTP, TRANSPORT_RPC, close_http_client
+from app.services.keypoint_codec import FORMAT_FULL, FORMAT_MSGPACK
+from app.services.rpc_client import close_rpc_client
+
+default_image = os.path.join(
+    os.path.dirname(__file__), "..", "..", "inference-service", "tests", "test_images", "right-chair-sit-1.jpg"
+)
+requests_per_run = 100
+concurrency_levels = (1, 8)
+
+async def run(transport, image, response_format, concurrency):
+    client = InferenceClient()
+    client.transport = transport
+
+    # Warm up the connection (and the model)
+    for _ in range(3):
+        await client.analyze_image(image, response_format)
+
+    timings = []
+    remaining = requests_per_run
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            await client.analyze_image(image, response_format)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return np.median(timings), np.percentile(timings, 95), requests_per_run / elapsed
+
+async def main(image_path):
+    with open(image_path, "rb") as f:
+        image = f.read()
+    print(f"{requests_per_run} analyze calls per run, image {os.path.basename(image_path)} ({len(image)} bytes)")
+    print(f"http: {settings.INFERENCE_SERVICE_URL}   rpc: {settings.INFERENCE_RPC_URL}\n")
+
+    for concurrency in concurrency_levels:
+        for response_format in (FORMAT_FULL, FORMAT_MSGPACK):
+            for transport in (TRANSPORT_HTTP, TRANSPORT_RPC):
+                p50, p95, throughput = await run(transport, image, response_format, concurrency)
+                print(f"concurrency {concurrency:2d}  {response_format:8s} {transport:5s} "
+                      f"p50: {p50:7.2f} ms   p95: {p95:7.2f} ms   {throughput:7.1f} req/s")
+        print()
+
+    await close_http_client()
+    await close_rpc_client()
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else default_image))
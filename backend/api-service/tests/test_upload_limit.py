@@ -0,0 +1,103 @@
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+
+# Run from the api-service directory: python tests/test_upload_limit.py
+# Starts the inference service and the api-service in front of it with the
+# same small MAX_REQUEST_BYTES, as in compose.yaml, and uploads a test image
+# padded to the largest size that fits the limit once base64-encoded, then to
+# one byte more. The largest upload must be analyzed rather than rejected by
+# the inference service, and the one over it must get 413 from the
+# api-service. Exits non-zero on any other outcome.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.limits import encoded_upload_bytes
+
+service_dir = os.path.join(os.path.dirname(__file__), "..")
+inference_service_dir = os.path.join(service_dir, "..", "inference-service")
+test_image = os.path.join(inference_service_dir, "tests", "test_images", "improper-chair-sit-1.jpg")
+inference_port = 18201
+api_port = 18200
+max_request_bytes = 1024 * 1024
+startup_timeout = 120.0
+
+def largest_upload(max_bytes):
+    size = max_bytes * 3 // 4
+    while encoded_upload_bytes(size + 1) <= max_bytes:
+        size += 1
+    while encoded_upload_bytes(size) > max_bytes:
+        size -= 1
+    return size
+
+def padded_image(size):
+    # Decoders stop at the JPEG end marker, so trailing padding is ignored
+    with open(test_image, "rb") as f:
+        image = f.read()
+    return image + b"\0" * (size - len(image))
+
+def start_services(job_store_path):
+    inference = subprocess.Popen(
+        [sys.executable, "-m", "app.server"],
+        cwd=inference_service_dir,
+        env=dict(os.environ, PORT=str(inference_port), RPC_PORT="0", UDS_PATH="", RPC_SOCKET_PATH="",
+                 MAX_REQUEST_BYTES=str(max_request_bytes)),
+        stdout=subprocess.DEVNULL
+    )
+    api_service = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(api_port), "--log-level", "warning"],
+        cwd=service_dir,
+        env=dict(os.environ, INFERENCE_SERVICE_URL=f"http://127.0.0.1:{inference_port}", INFERENCE_TRANSPORT="http",
+                 MAX_REQUEST_BYTES=str(max_request_bytes), RATE_LIMIT_RATE="0", JOB_STORE_PATH=job_store_path)
+    )
+    return inference, api_service
+
+def wait_ready(client, url):
+    deadline = time.monotonic() + startup_timeout
+    while True:
+        try:
+            if client.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"{url} did not become ready")
+        time.sleep(0.1)
+
+def upload(client, size):
+    response = client.post(
+        f"http://127.0.0.1:{api_port}/api/posture/analyze/upload",
+        files={"file": ("image.jpg", padded_image(size), "image/jpeg")},
+        params={"include_image": "false"}
+    )
+    print(f"upload of {size} bytes ({encoded_upload_bytes(size)} encoded, limit {max_request_bytes}): "
+          f"{response.status_code} {'' if response.status_code == 200 else response.text}")
+    return response
+
+def main():
+    size = largest_upload(max_request_bytes)
+    job_store = tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False)
+    job_store.close()
+    inference, api_service = start_services(job_store.name)
+    try:
+        with httpx.Client(timeout=60) as client:
+            wait_ready(client, f"http://127.0.0.1:{inference_port}/ready")
+            wait_ready(client, f"http://127.0.0.1:{api_port}/")
+            largest = upload(client, size)
+            over = upload(client, size + 1)
+    finally:
+        for process in (inference, api_service):
+            process.send_signal(signal.SIGTERM)
+        for process in (inference, api_service):
+            process.wait()
+        os.remove(job_store.name)
+
+    passed = largest.status_code == 200 and over.status_code == 413 and "base64" in over.json()["detail"]
+    print("passed" if passed else "failed")
+    return passed
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
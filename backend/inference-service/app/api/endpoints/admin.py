@@ -0,0 +1,161 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, PlainTextResponse
+from typing import List, Dict, Any
+
+from app.core.security import require_admin
+from app.core.config import settings
+from app.models.admin import (
+    ModelLoadRequest, ModelTierInfo, ProfileInfo, QuantizationCheckRequest, QuantizationReport, WorkerInfo
+)
+from app.services.inference_pool import get_inference_pool
+from app.services.model_registry import get_model_registry, ModelRegistry
+from app.services.posture_rules import get_rule_engine, RuleConfigError, RuleEngine
+from app.services.quantization import run_accuracy_check
+from app.services.request_profiler import get_request_profiler, RequestProfiler
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+logger = logging.getLogger(__name__)
+
+def require_in_process_models() -> None:
+    """Reject model management while the models run in the inference pool."""
+    if settings.INFERENCE_WORKERS:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Models run in the inference pool workers; change MODEL_TIERS and restart instead"
+        )
+
+@router.get(
+    "/models",
+    response_model=List[ModelTierInfo],
+    summary="List model tiers",
+    description="List registered model tiers and whether they are loaded"
+)
+async def list_models(
+    registry: ModelRegistry = Depends(get_model_registry)
+) -> List[Dict[str, Any]]:
+    """List registered model tiers."""
+    return registry.describe()
+
+@router.put(
+    "/models/{tier}",
+    response_model=List[ModelTierInfo],
+    summary="Load or swap a model tier",
+    description="Load a model for a tier, replacing the current one once the new model is ready",
+    dependencies=[Depends(require_in_process_models)]
+)
+async def load_model(
+    tier: str,
+    request: ModelLoadRequest,
+    registry: ModelRegistry = Depends(get_model_registry)
+) -> List[Dict[str, Any]]:
+    """Load or hot-swap the model behind a tier."""
+    # Load in a worker thread so inference traffic keeps flowing meanwhile
+    await run_in_threadpool(registry.load, tier, request.model_path)
+    return registry.describe()
+
+@router.delete(
+    "/models/{tier}",
+    response_model=List[ModelTierInfo],
+    summary="Unload a model tier",
+    description="Unload the model for a tier; it is reloaded on next use",
+    dependencies=[Depends(require_in_process_models)]
+)
+async def unload_model(
+    tier: str,
+    registry: ModelRegistry = Depends(get_model_registry)
+) -> List[Dict[str, Any]]:
+    """Unload the model behind a tier."""
+    registry.unload(tier)
+    return registry.describe()
+
+@router.get(
+    "/workers",
+    response_model=List[WorkerInfo],
+    summary="List inference pool workers",
+    description="List the model worker processes and their calls in flight (empty when INFERENCE_WORKERS is 0)"
+)
+async def list_workers() -> List[Dict[str, Any]]:
+    """List inference pool workers."""
+    if not settings.INFERENCE_WORKERS:
+        return []
+    return get_inference_pool().stats()
+
+@router.post(
+    "/quantization/check",
+    response_model=QuantizationReport,
+    summary="Check quantized model accuracy",
+    description="Compare keypoints and posture verdicts of a quantized model against FP32 on a reference set"
+)
+async def check_quantization(request: QuantizationCheckRequest) -> Dict[str, Any]:
+    """Run the quantization accuracy check."""
+    return await run_in_threadpool(
+        run_accuracy_check,
+        request.model_path or settings.MODEL_PATH,
+        request.reference_dir or settings.QUANTIZATION_REFERENCE_DIR,
+        request.quantization
+    )
+
+@router.get(
+    "/profiles",
+    response_model=List[ProfileInfo],
+    summary="List request profiles",
+    description="List saved on-demand and sampled request profiles, newest first"
+)
+async def list_profiles(
+    profiler: RequestProfiler = Depends(get_request_profiler)
+) -> List[Dict[str, Any]]:
+    """List saved request profiles."""
+    return await run_in_threadpool(profiler.list_profiles)
+
+@router.get(
+    "/profiles/{profile_id}",
+    summary="Download a request profile",
+    description=(
+        "Download a saved profile as a pstats file (`format=prof`, readable with `pstats` or snakeviz) "
+        "or as a text report sorted by cumulative time (`format=text`)"
+    ),
+    response_class=FileResponse
+)
+async def get_profile(
+    profile_id: str,
+    format: str = Query("prof", pattern="^(prof|text)$", description="Download format"),
+    profiler: RequestProfiler = Depends(get_request_profiler)
+):
+    """Download a saved request profile."""
+    path = profiler.get_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Profile '{profile_id}' not found")
+    if format == "text":
+        return PlainTextResponse(await run_in_threadpool(profiler.render_text, path))
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+
+@router.get(
+    "/rules",
+    summary="Get posture rules",
+    description="Get the active posture rule configuration"
+)
+async def get_rules(
+    engine: RuleEngine = Depends(get_rule_engine)
+) -> Dict[str, Any]:
+    """Get the active posture rule configuration."""
+    return engine.describe()
+
+@router.post(
+    "/rules/reload",
+    summary="Reload posture rules",
+    description=(
+        "Recompile the posture rules from POSTURE_RULES_PATH now instead of waiting for the "
+        "file change to be picked up. An invalid configuration is rejected and the current rules stay active."
+    )
+)
+async def reload_rules(
+    engine: RuleEngine = Depends(get_rule_engine)
+) -> Dict[str, Any]:
+    """Recompile the posture rules."""
+    try:
+        await run_in_threadpool(engine.reload)
+    except (OSError, RuleConfigError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return engine.describe()
@@ -1,61 +1,282 @@
+import asyncio
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Dict, Any
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import AsyncIterator, Dict, Any, Optional, Union
 
 from app.models.inference import InferenceRequest, InferenceResponse
-from app.services.pose_detector import get_pose_detector, PoseDetector
+from app.services.lifecycle import get_service_lifecycle, track_work, ServiceLifecycle
+from app.services.keypoint_codec import (
+    FORMAT_COMPACT, FORMAT_MSGPACK, FORMAT_PATTERN,
+    COMPACT_MEDIA_TYPE, MSGPACK_MEDIA_TYPE,
+    negotiate_format, to_compact, to_msgpack
+)
+from app.services.inference_pool import get_inference_pool
+from app.services.model_registry import get_model_registry, ModelRegistry
+from app.services.pose_detector import PoseDetector
 from app.services.posture_analyzer import analyze_posture
-from app.core.errors import NoPersonDetectedError, ImageProcessingError
+from app.services.posture_state import get_posture_state_tracker, PostureStateTracker, Subscriber
+from app.services.request_profiler import (
+    get_request_profiler, ProfileCapture, RequestProfiler, PROFILE_ON_DEMAND, PROFILE_SAMPLED
+)
+from app.core.config import settings
+from app.core.errors import ModelError, NoPersonDetectedError, ImageProcessingError, ServiceUnavailableError
+from app.core.security import require_admin
+from app.core.tracing import span
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+# Keep proxies from buffering or caching the event stream
+EVENT_STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+# Seconds between keep-alive comments on an idle event stream
+EVENT_KEEPALIVE_INTERVAL = 15.0
+
+def render_response(payload: Dict[str, Any], response_format: str) -> Union[Dict[str, Any], Response]:
+    """Encode a response payload in the negotiated format."""
+    if response_format == FORMAT_COMPACT:
+        # Compact payloads skip response model validation entirely
+        with span("serialize"):
+            return ORJSONResponse(to_compact(payload), media_type=COMPACT_MEDIA_TYPE)
+    if response_format == FORMAT_MSGPACK:
+        with span("serialize"):
+            return Response(content=to_msgpack(payload), media_type=MSGPACK_MEDIA_TYPE)
+    return payload
+
+async def resolve_detector(registry: ModelRegistry, tier: Optional[str]) -> PoseDetector:
+    """
+    Get the detector for a model tier.
+
+    With INFERENCE_WORKERS set, the model runs in the inference pool;
+    otherwise the tier's model is loaded in-process, off the event loop if
+    it is not loaded yet.
+
+    Args:
+        registry: In-process model registry
+        tier: Latency tier name (defaults to the default tier)
+
+    Returns:
+        PoseDetector instance
+
+    Raises:
+        ModelError: If the tier is unknown or its model fails to load
+    """
+    if settings.INFERENCE_WORKERS:
+        return get_inference_pool().detector(tier)
+    if registry.is_loaded(tier):
+        return registry.get(tier)
+    return await run_in_threadpool(registry.get, tier)
+
+def build_payload(
+    pose_detector: PoseDetector,
+    image: Union[str, bytes],
+    response_format: str,
+    session_id: Optional[str],
+    include_image: bool = True,
+    include_analysis: bool = True
+) -> Dict[str, Any]:
+    """
+    Run pose detection and posture analysis on an image.
+
+    Frames of a live session also feed the session's posture state.
+
+    Args:
+        pose_detector: Detector for the requested tier
+        image: Base64 encoded image, or raw image bytes
+        response_format: Negotiated response format
+        session_id: Live session ID enabling keyframe tracking and posture state events
+        include_image: Render the pose overlay; when False `img_with_pose` is None
+        include_analysis: Include the detailed `analysis` and the `tracked` flag
+
+    Returns:
+        Response payload
+
+    Raises:
+        NoPersonDetectedError: If no person is detected
+        ImageProcessingError: If the image cannot be processed
+    """
+    # Run pose detection
+    try:
+        result = pose_detector.detect_pose(
+            image,
+            encode_base64=response_format != FORMAT_MSGPACK,
+            session_id=session_id,
+            include_image=include_image
+        )
+        if not result or "keypoints" not in result:
+            # Logged, aggregated, where the error is handled
+            raise NoPersonDetectedError()
+    except NoPersonDetectedError:
+        if session_id:
+            get_posture_state_tracker().observe(session_id, None)
+        raise
+    
+    # Run posture analysis (unless pose detection already did)
+    analysis_results = result.get("analysis")
+    if not analysis_results:
+        with span("analyze"):
+            analysis_results = analyze_posture(result["keypoints"])
+    
+    if session_id:
+        get_posture_state_tracker().observe(session_id, analysis_results)
+    
+    # Construct response
+    payload = {
+        "isGoodPosture": analysis_results["is_good_posture"],
+        "confidence": int(analysis_results["overall_score"] * 100),
+        "feedback": analysis_results["feedback"],
+        "keypoints": result["keypoints"],
+        "img_with_pose": result["img_with_pose"]
+    }
+    if include_analysis:
+        payload["analysis"] = {
+            "shoulder_balance": analysis_results.get("shoulder_balance"),
+            "neck_position": analysis_results.get("neck_position"),
+            "back_position": analysis_results.get("back_position"),
+            "scores": analysis_results["scores"],
+            "overall_score": analysis_results["overall_score"],
+            "is_good_posture": analysis_results["is_good_posture"]
+        }
+        payload["tracked"] = result.get("tracked")
+    return payload
+
 @router.post(
     "/analyze", 
     response_model=InferenceResponse,
+    # Fields left out of the payload (see include_analysis) stay out of the response
+    response_model_exclude_unset=True,
     summary="Analyze posture from image",
-    description="Run inference on an image to detect pose and analyze posture"
+    description=(
+        "Run inference on an image to detect pose and analyze posture. "
+        "Keypoints can be returned as a flat 17x3 array (`format=compact` or "
+        f"`Accept: {COMPACT_MEDIA_TYPE}`) or as MessagePack with packed float32 "
+        f"keypoints and raw PNG overlay bytes (`format=msgpack` or `Accept: {MSGPACK_MEDIA_TYPE}`). "
+        "Admins can profile a request with `X-Profile: 1` or `profile=true`; the profile ID is "
+        "returned in the `X-Profile-Id` header. With `include_image=false` the pose overlay is "
+        "neither rendered nor returned, and with `include_analysis=false` the response only holds "
+        "the fields api-service returns to its clients. Responds with 503 while the service is starting or "
+        "shutting down."
+    ),
+    responses={200: {"content": {COMPACT_MEDIA_TYPE: {}, MSGPACK_MEDIA_TYPE: {}}}},
+    dependencies=[Depends(track_work)]
 )
 async def analyze_image(
     request: InferenceRequest,
-    pose_detector: PoseDetector = Depends(get_pose_detector)
-) -> Dict[str, Any]:
+    response: Response,
+    format: Optional[str] = Query(None, pattern=FORMAT_PATTERN, description="Response format"),
+    tier: Optional[str] = Query(None, description="Model latency tier (defaults to the default tier)"),
+    include_image: bool = Query(True, description="Render and return the pose overlay image"),
+    include_analysis: bool = Query(True, description="Return the detailed analysis and tracking flag"),
+    accept: Optional[str] = Header(None),
+    x_session_id: Optional[str] = Header(None, description="Live session ID enabling keyframe tracking"),
+    profile: bool = Query(False, description="Profile this request (requires the admin token)"),
+    x_profile: bool = Header(False, description="Profile this request (requires the admin token)"),
+    x_admin_token: Optional[str] = Header(None),
+    registry: ModelRegistry = Depends(get_model_registry),
+    profiler: RequestProfiler = Depends(get_request_profiler)
+) -> Union[Dict[str, Any], Response]:
     """Process image for pose detection and posture analysis."""
+    response_format = negotiate_format(format, accept)
+    
+    # Resolve the model for the requested tier
+    pose_detector = await resolve_detector(registry, tier)
+    
+    # Profile on demand (admin only) or as part of the 1-in-N sample
+    profile_kind = None
+    if x_profile or profile:
+        await require_admin(x_admin_token)
+        profile_kind = PROFILE_ON_DEMAND
+    elif profiler.should_sample():
+        profile_kind = PROFILE_SAMPLED
+    
     try:
-        # Run pose detection
-        result = pose_detector.detect_pose(request.image)
-        
-        if not result or "keypoints" not in result:
-            logger.warning("No pose detected in the image")
-            raise NoPersonDetectedError()
+        # Off the event loop, so readiness checks and draining keep running meanwhile
+        args = (pose_detector, request.image, response_format, x_session_id, include_image, include_analysis)
+        if profile_kind is None:
+            payload = await run_in_threadpool(build_payload, *args)
+            return render_response(payload, response_format)
         
-        # Run posture analysis
-        analysis_results = analyze_posture(result["keypoints"])
-        
-        # Construct response
-        return {
-            "isGoodPosture": analysis_results["is_good_posture"],
-            "confidence": int(analysis_results["overall_score"] * 100),
-            "feedback": analysis_results["feedback"],
-            "keypoints": result["keypoints"],
-            "img_with_pose": result["img_with_pose"],
-            "analysis": {
-                "shoulder_balance": analysis_results["shoulder_balance"],
-                "neck_position": analysis_results["neck_position"],
-                "back_position": analysis_results["back_position"],
-                "overall_score": analysis_results["overall_score"],
-                "is_good_posture": analysis_results["is_good_posture"]
-            }
-        }
+        # The profiler is enabled in the worker thread, so it only records this call
+        capture = ProfileCapture(profile_kind)
+        payload = await run_in_threadpool(profiler.run, capture, build_payload, *args)
+        rendered = render_response(payload, response_format)
+        if profile_kind == PROFILE_ON_DEMAND:
+            # Encoded responses bypass the injected response, so set the header on whichever is returned
+            target = rendered if isinstance(rendered, Response) else response
+            target.headers["X-Profile-Id"] = capture.profile_id
+        return rendered
     except NoPersonDetectedError as e:
         # This exception is already properly handled by the exception handler
         raise
     except ImageProcessingError as e:
         # This exception is already properly handled by the exception handler
         raise
+    except ModelError:
+        # Keeps its status code, e.g. 503 when no inference worker can take the call
+        raise
     except Exception as e:
-        logger.error(f"Error analyzing image: {str(e)}", exc_info=True)
+        logger.error("Error analyzing image: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error analyzing image: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+async def session_event_stream(
+    tracker: PostureStateTracker,
+    session_id: str,
+    subscriber: Subscriber
+) -> AsyncIterator[bytes]:
+    """Yield a subscriber's events in Server-Sent Events format, with keep-alive comments while idle."""
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(subscriber.queue.get(), EVENT_KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            if item is None or subscriber.closed:
+                return
+            event, data = item
+            yield b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+    finally:
+        tracker.unsubscribe(session_id, subscriber)
+
+@router.get(
+    "/sessions/{session_id}/events",
+    summary="Stream posture state events",
+    description=(
+        "Server-Sent Events stream of a live session's debounced posture state. A `state` event "
+        "carries the current state on connect and every transition between `good`, `bad` and "
+        "`away`; a `summary` event covers the frames analyzed in each summary interval. Frames "
+        "are attributed to the session by the `X-Session-ID` header of `/analyze` calls, and only "
+        "sessions with recent frames can be subscribed to. The stream ends when the service shuts down."
+    ),
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {EVENT_STREAM_MEDIA_TYPE: {}}},
+        404: {"description": "No recent frames for the session"},
+        429: {"description": "Too many subscribers for the session or the service"}
+    }
+)
+async def stream_session_events(
+    session_id: str,
+    tracker: PostureStateTracker = Depends(get_posture_state_tracker),
+    lifecycle: ServiceLifecycle = Depends(get_service_lifecycle)
+) -> StreamingResponse:
+    """Stream posture state events for a live session."""
+    # Streams end when the service drains, so don't open new ones meanwhile
+    if not lifecycle.accepting:
+        raise ServiceUnavailableError("Service is shutting down")
+    # Subscribe before streaming so a refusal is sent as an error status
+    subscriber = tracker.subscribe(session_id)
+    return StreamingResponse(
+        session_event_stream(tracker, session_id, subscriber),
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        headers=EVENT_STREAM_HEADERS,
+        # Also runs if the client disconnects before the stream starts
+        background=BackgroundTask(tracker.unsubscribe, session_id, subscriber)
+    )
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Set
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.api.endpoints.inference import build_payload, resolve_detector
+from app.core.config import settings
+from app.core.errors import (
+    ImageProcessingError, ModelError, NoPersonDetectedError, ServiceUnavailableError, no_person_detected
+)
+from app.core.rpc import METHOD_ANALYZE, FrameTooLargeError, read_frame, write_frame
+from app.core.tracing import TraceExporter, span, start_trace
+from app.services.keypoint_codec import FORMAT_FULL, FORMAT_COMPACT, FORMAT_MSGPACK, encode_response
+from app.services.lifecycle import get_service_lifecycle
+from app.services.model_registry import get_model_registry
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_FORMATS = (FORMAT_FULL, FORMAT_COMPACT, FORMAT_MSGPACK)
+
+class RpcServer:
+    """
+    Internal binary transport for the analysis endpoint.
+
+    Serves the same analysis as `POST /api/inference/analyze` over
+    persistent connections framed by `app.core.rpc`, without HTTP parsing
+    or pydantic validation. An `analyze` call carries the image as raw
+    bytes (or a base64 string) with the response format, model tier, live
+    session ID, request ID and whether to include the overlay image and the
+    detailed analysis. The
+    reply holds the status code, the Server-Timing value and, on success,
+    the response body exactly as the HTTP endpoint would encode it, so
+    api-service can relay it unchanged. Calls on a connection run
+    concurrently, up to `max_connection_calls` at once, and are answered
+    as they finish.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        max_frame_bytes: int,
+        max_connection_calls: int,
+        export_path: str = "",
+        socket_path: str = ""
+    ):
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.max_frame_bytes = max_frame_bytes
+        self.max_connection_calls = max_connection_calls
+        self.exporter = TraceExporter(export_path, "inference-service") if export_path else None
+        self._servers: List[asyncio.AbstractServer] = []
+        self._connections: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        """Start listening on the TCP port and the Unix socket, whichever are configured."""
+        if self.port:
+            # reuse_port lets each uvicorn worker process bind the same port
+            self._servers.append(await asyncio.start_server(
+                self._handle_connection, self.host, self.port, reuse_port=True
+            ))
+            logger.info("RPC server listening on %s:%d", self.host, self.port)
+        if self.socket_path:
+            # Replaces a stale socket file; a socket path serves a single process
+            self._servers.append(await asyncio.start_unix_server(self._handle_connection, self.socket_path))
+            os.chmod(self.socket_path, 0o666)
+            logger.info("RPC server listening on unix socket %s", self.socket_path)
+
+    async def stop(self) -> None:
+        """Stop listening and close open connections."""
+        if not self._servers:
+            return
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Read calls from a connection until it closes, serving each in its own task."""
+        self._connections.add(asyncio.current_task())
+        calls: Set[asyncio.Task] = set()
+        # Concurrent drain() calls on one writer are not supported before Python 3.10
+        drain_lock = asyncio.Lock()
+        call_slots = asyncio.Semaphore(self.max_connection_calls)
+        try:
+            while True:
+                # Stop reading while the connection has its maximum of calls in flight
+                await call_slots.acquire()
+                try:
+                    call_id, message = await read_frame(reader, self.max_frame_bytes)
+                except FrameTooLargeError as e:
+                    call_slots.release()
+                    await self._reply(writer, drain_lock, e.call_id, self._error(413, str(e)))
+                    continue
+                call = asyncio.create_task(self._serve(writer, drain_lock, call_id, message))
+                calls.add(call)
+                call.add_done_callback(calls.discard)
+                call.add_done_callback(lambda _: call_slots.release())
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error("RPC connection failed: %s", e, exc_info=True)
+        finally:
+            for call in calls:
+                call.cancel()
+            writer.close()
+            self._connections.discard(asyncio.current_task())
+
+    async def _serve(
+        self,
+        writer: asyncio.StreamWriter,
+        drain_lock: asyncio.Lock,
+        call_id: int,
+        message: Dict[str, Any]
+    ) -> None:
+        """Serve one call and write its reply."""
+        with start_trace(message.get("request_id")) as trace:
+            reply = await self._dispatch(message)
+            reply["timing"] = trace.server_timing()
+        if self.exporter is not None:
+            self.exporter.export(trace, reply["status"])
+        await self._reply(writer, drain_lock, call_id, reply)
+
+    async def _reply(
+        self,
+        writer: asyncio.StreamWriter,
+        drain_lock: asyncio.Lock,
+        call_id: int,
+        reply: Dict[str, Any]
+    ) -> None:
+        if writer.is_closing():
+            return
+        write_frame(writer, call_id, reply)
+        async with drain_lock:
+            await writer.drain()
+
+    async def _dispatch(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a call, mapping errors to status codes like the HTTP exception handlers."""
+        if message.get("method") != METHOD_ANALYZE:
+            return self._error(400, f"Unknown method: {message.get('method')}")
+        image = message.get("image")
+        response_format = message.get("format") or FORMAT_FULL
+        if not isinstance(image, (str, bytes)) or response_format not in RESPONSE_FORMATS:
+            return self._error(422, "Invalid analyze call")
+
+        try:
+            with get_service_lifecycle().work():
+                pose_detector = await resolve_detector(get_model_registry(), message.get("tier"))
+                payload = await run_in_threadpool(
+                    build_payload, pose_detector, image, response_format, message.get("session_id"),
+                    message.get("include_image", True), message.get("include_analysis", True)
+                )
+            with span("serialize"):
+                body, media_type = encode_response(payload, response_format)
+            return {"status": 200, "content_type": media_type, "body": body}
+        except NoPersonDetectedError as e:
+            no_person_detected.log("no_person", "No Person Detected")
+            return self._error(e.status_code, e.detail)
+        except ServiceUnavailableError as e:
+            return self._error(e.status_code, e.detail)
+        except (ImageProcessingError, ModelError) as e:
+            logger.error("RPC analyze failed: %s", e.detail)
+            return self._error(e.status_code, e.detail)
+        except Exception as e:
+            logger.error("Error analyzing image: %s", e, exc_info=True)
+            return self._error(500, f"Error analyzing image: {str(e)}")
+
+    @staticmethod
+    def _error(status_code: int, detail: str) -> Dict[str, Any]:
+        return {"status": status_code, "detail": detail}
+
+# Singleton instance to share across the application
+_rpc_server_instance = None
+
+def get_rpc_server() -> RpcServer:
+    """
+    Get or create singleton instance of RpcServer.
+
+    Returns:
+        RpcServer instance
+    """
+    global _rpc_server_instance
+    if _rpc_server_instance is None:
+        _rpc_server_instance = RpcServer(
+            host=settings.RPC_HOST,
+            port=settings.RPC_PORT,
+            max_frame_bytes=settings.MAX_REQUEST_BYTES,
+            max_connection_calls=settings.RPC_MAX_CONNECTION_CALLS,
+            export_path=settings.TRACE_EXPORT_PATH,
+            socket_path=settings.RPC_SOCKET_PATH
+        )
+    return _rpc_server_instance
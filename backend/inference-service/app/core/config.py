@@ -12,17 +12,113 @@ class Settings(BaseSettings):
     VERSION: str = "0.1.0"
     DEBUG: bool = os.getenv("DEBUG", "False").lower() in ("true", "1", "t")
     
+    # Logging Settings (repeated per-frame warnings are summarized once per interval)
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_AGGREGATE_INTERVAL: float = float(os.getenv("LOG_AGGREGATE_INTERVAL", "60"))
+    
     # CORS Settings
     CORS_ORIGINS: List[str] = ["*"]  # Should be restricted in production
     CORS_ALLOW_CREDENTIALS: bool = True
     CORS_ALLOW_METHODS: List[str] = ["*"]
     CORS_ALLOW_HEADERS: List[str] = ["*"]
     
+    # Request Limits
+    MAX_REQUEST_BYTES: int = int(os.getenv("MAX_REQUEST_BYTES", str(16 * 1024 * 1024)))
+    MAX_IMAGE_PIXELS: int = int(os.getenv("MAX_IMAGE_PIXELS", str(25_000_000)))
+    MAX_IMAGE_DIMENSION: int = int(os.getenv("MAX_IMAGE_DIMENSION", "8192"))
+    
+    # Server Settings (used by `python -m app.server`; UDS_PATH also serves the API on a
+    # Unix domain socket for clients on the same host, empty disables)
+    HOST: str = os.getenv("HOST", "0.0.0.0")
+    PORT: int = int(os.getenv("PORT", "8001"))
+    UDS_PATH: str = os.getenv("UDS_PATH", "")
+    # Graceful shutdown on SIGTERM: readiness turns false while work is still accepted for
+    # SHUTDOWN_DRAIN_DELAY seconds so load balancers stop routing here, then new work gets 503
+    # and accepted calls have SHUTDOWN_GRACE_PERIOD seconds to finish before the server exits
+    SHUTDOWN_DRAIN_DELAY: float = float(os.getenv("SHUTDOWN_DRAIN_DELAY", "2"))
+    SHUTDOWN_GRACE_PERIOD: float = float(os.getenv("SHUTDOWN_GRACE_PERIOD", "25"))
+    
+    # Internal RPC Settings (length-prefixed MessagePack used by api-service; RPC_PORT=0 disables
+    # TCP, RPC_SOCKET_PATH also listens on a Unix domain socket, empty disables). RPC calls are
+    # not authenticated, so TCP only listens on loopback unless RPC_HOST says otherwise.
+    RPC_HOST: str = os.getenv("RPC_HOST", "127.0.0.1")
+    RPC_PORT: int = int(os.getenv("RPC_PORT", "8002"))
+    RPC_SOCKET_PATH: str = os.getenv("RPC_SOCKET_PATH", "")
+    # Calls served at once per connection; further calls wait unread until one finishes
+    RPC_MAX_CONNECTION_CALLS: int = int(os.getenv("RPC_MAX_CONNECTION_CALLS", "16"))
+    
     # Model Settings
     MODEL_PATH: str = os.getenv("MODEL_PATH", "yolo11n-pose.pt")
     MODEL_CONFIDENCE: float = float(os.getenv("MODEL_CONFIDENCE", "0.5"))
+    MODEL_IMAGE_SIZE: int = int(os.getenv("MODEL_IMAGE_SIZE", "640"))
+    
+    # Quantization Settings ("none" or "int8")
+    MODEL_QUANTIZATION: str = os.getenv("MODEL_QUANTIZATION", "none")
+    QUANTIZATION_CALIBRATION_DATA: str = os.getenv("QUANTIZATION_CALIBRATION_DATA", "coco8-pose.yaml")
+    QUANTIZATION_IMAGE_SIZE: int = int(os.getenv("QUANTIZATION_IMAGE_SIZE", "640"))
+    QUANTIZATION_REFERENCE_DIR: str = os.getenv("QUANTIZATION_REFERENCE_DIR", "tests/test_images")
+    
+    # Model Registry Settings
+    # Extra latency tiers as comma-separated tier=model_path pairs,
+    # e.g. "fast=yolo11n-pose.pt,accurate=yolo11m-pose.pt"
+    MODEL_TIERS: str = os.getenv("MODEL_TIERS", "")
+    DEFAULT_MODEL_TIER: str = os.getenv("DEFAULT_MODEL_TIER", "default")
+    MODEL_MEMORY_BUDGET_MB: int = int(os.getenv("MODEL_MEMORY_BUDGET_MB", "1024"))
+    
+    # Inference Pool Settings (model worker processes fed through shared memory; 0 runs
+    # the model in-process). Each worker runs the model on INFERENCE_WORKER_THREADS threads.
+    INFERENCE_WORKERS: int = int(os.getenv("INFERENCE_WORKERS", "0"))
+    INFERENCE_WORKER_THREADS: int = int(os.getenv("INFERENCE_WORKER_THREADS", "1"))
+    # Seconds a call may wait for its worker before failing with 503; the stuck worker is
+    # restarted. A tier's model loads in the worker on first use, within this timeout.
+    INFERENCE_CALL_TIMEOUT: float = float(os.getenv("INFERENCE_CALL_TIMEOUT", "30"))
+    
+    # Admin Settings (admin endpoints are disabled while the token is empty)
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+    
+    # Rendering Settings ("skeleton" draws only the posture joints; "ultralytics" uses result.plot())
+    POSE_RENDERER: str = os.getenv("POSE_RENDERER", "skeleton")
+    RENDER_SCALE: float = float(os.getenv("RENDER_SCALE", "1.0"))
+    
+    # Frame Buffer Settings (idle letterbox and render buffers kept for reuse; 0 disables pooling)
+    BUFFER_POOL_MAX_BYTES: int = int(os.getenv("BUFFER_POOL_MAX_BYTES", str(64 * 1024 * 1024)))
+    
+    # Live Tracking Settings (keyframe inference with optical-flow propagation per session)
+    TRACKING_ENABLED: bool = os.getenv("TRACKING_ENABLED", "True").lower() in ("true", "1", "t")
+    KEYFRAME_INTERVAL: int = int(os.getenv("KEYFRAME_INTERVAL", "5"))
+    KEYFRAME_MIN_CONFIDENCE: float = float(os.getenv("KEYFRAME_MIN_CONFIDENCE", "0.6"))
+    TRACKING_MAX_FB_ERROR: float = float(os.getenv("TRACKING_MAX_FB_ERROR", "2.0"))
+    TRACKING_SESSION_TTL: float = float(os.getenv("TRACKING_SESSION_TTL", "30"))
+    TRACKING_MAX_SESSIONS: int = int(os.getenv("TRACKING_MAX_SESSIONS", "256"))
+    
+    # Posture State Settings (debounced good/bad/away state per live session, pushed over
+    # Server-Sent Events). A state change needs POSTURE_STATE_DWELL seconds of consistent
+    # frames; scores within POSTURE_STATE_HYSTERESIS of the good-posture threshold keep the
+    # current state. Summaries are pushed every POSTURE_SUMMARY_INTERVAL seconds.
+    POSTURE_STATE_DWELL: float = float(os.getenv("POSTURE_STATE_DWELL", "10"))
+    POSTURE_STATE_HYSTERESIS: float = float(os.getenv("POSTURE_STATE_HYSTERESIS", "0.05"))
+    POSTURE_SUMMARY_INTERVAL: float = float(os.getenv("POSTURE_SUMMARY_INTERVAL", "30"))
+    POSTURE_SESSION_TTL: float = float(os.getenv("POSTURE_SESSION_TTL", "300"))
+    POSTURE_MAX_SESSIONS: int = int(os.getenv("POSTURE_MAX_SESSIONS", "256"))
+    # Event stream subscribers allowed per session and in total
+    POSTURE_MAX_SESSION_SUBSCRIBERS: int = int(os.getenv("POSTURE_MAX_SESSION_SUBSCRIBERS", "4"))
+    POSTURE_MAX_SUBSCRIBERS: int = int(os.getenv("POSTURE_MAX_SUBSCRIBERS", "256"))
+    
+    # Profiling Settings (on-demand profiles need the admin token;
+    # PROFILE_SAMPLE_RATE=N also profiles 1 in N requests, 0 disables sampling)
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_SAMPLE_RATE: int = int(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_MAX_FILES: int = int(os.getenv("PROFILE_MAX_FILES", "50"))
+    
+    # Tracing Settings (Chrome trace-event JSON; empty disables export)
+    TRACE_EXPORT_PATH: str = os.getenv("TRACE_EXPORT_PATH", "")
     
     # Posture Analysis Settings
+    # JSON rule file replacing the built-in rules (checked for changes every
+    # POSTURE_RULES_CHECK_INTERVAL seconds); the thresholds below only apply to
+    # the built-in rules
+    POSTURE_RULES_PATH: str = os.getenv("POSTURE_RULES_PATH", "")
+    POSTURE_RULES_CHECK_INTERVAL: float = float(os.getenv("POSTURE_RULES_CHECK_INTERVAL", "5"))
     SHOULDER_BALANCE_THRESHOLD: float = float(os.getenv("SHOULDER_BALANCE_THRESHOLD", "0.05"))
     NECK_TILT_THRESHOLD: float = float(os.getenv("NECK_TILT_THRESHOLD", "0.15"))
     BACK_ANGLE_THRESHOLD: float = float(os.getenv("BACK_ANGLE_THRESHOLD", "15.0"))
@@ -3,8 +3,14 @@ from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 
+from app.core.config import settings
+from app.core.logging import AggregatedLogger
+
 logger = logging.getLogger(__name__)
 
+# Live sessions hit this on every frame while the user is away from the camera
+no_person_detected = AggregatedLogger(logger, settings.LOG_AGGREGATE_INTERVAL)
+
 class ModelError(Exception):
     """Exception raised for errors in the ML model inference."""
     
@@ -21,6 +27,28 @@ class ImageProcessingError(Exception):
         self.status_code = status_code
         super().__init__(self.detail)
 
+class PayloadTooLargeError(ImageProcessingError):
+    """Exception raised when a request or image exceeds the configured limits."""
+    
+    def __init__(self, detail: str, status_code: int = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE):
+        super().__init__(detail, status_code)
+
+class ServiceUnavailableError(Exception):
+    """Exception raised for work arriving while the service is starting or shutting down."""
+    
+    def __init__(self, detail: str, status_code: int = status.HTTP_503_SERVICE_UNAVAILABLE):
+        self.detail = detail
+        self.status_code = status_code
+        super().__init__(self.detail)
+
+class SubscriptionError(Exception):
+    """Exception raised when a posture event subscription is refused."""
+    
+    def __init__(self, detail: str, status_code: int = status.HTTP_404_NOT_FOUND):
+        self.detail = detail
+        self.status_code = status_code
+        super().__init__(self.detail)
+
 class NoPersonDetectedError(Exception):
     """Exception raised when no person is detected in the image."""
     
@@ -35,7 +63,7 @@ def register_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(ModelError)
     async def model_error_handler(request: Request, exc: ModelError):
         """Handle model errors."""
-        logger.error(f"Model Error: {exc.detail}")
+        logger.error("Model Error: %s", exc.detail)
         return JSONResponse(
             status_code=exc.status_code,
             content={"detail": exc.detail}
@@ -44,7 +72,25 @@ def register_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(ImageProcessingError)
     async def image_processing_error_handler(request: Request, exc: ImageProcessingError):
         """Handle image processing errors."""
-        logger.error(f"Image Processing Error: {exc.detail}")
+        logger.error("Image Processing Error: %s", exc.detail)
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.detail}
+        )
+    
+    @app.exception_handler(ServiceUnavailableError)
+    async def service_unavailable_error_handler(request: Request, exc: ServiceUnavailableError):
+        """Handle work rejected while starting or draining."""
+        logger.warning("Rejected request: %s", exc.detail)
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.detail}
+        )
+    
+    @app.exception_handler(SubscriptionError)
+    async def subscription_error_handler(request: Request, exc: SubscriptionError):
+        """Handle refused event subscriptions."""
+        logger.info("Refused subscription: %s", exc.detail)
         return JSONResponse(
             status_code=exc.status_code,
             content={"detail": exc.detail}
@@ -53,7 +99,7 @@ def register_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(NoPersonDetectedError)
     async def no_person_detected_error_handler(request: Request, exc: NoPersonDetectedError):
         """Handle no person detected errors."""
-        logger.warning(f"No Person Detected: {exc.detail}")
+        no_person_detected.log("no_person", "No Person Detected")
         return JSONResponse(
             status_code=exc.status_code,
             content={"detail": exc.detail}
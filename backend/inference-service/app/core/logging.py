@@ -0,0 +1,111 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from app.core.tracing import RequestIdLogFilter
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+class LocalQueueHandler(QueueHandler):
+    """
+    Queue handler that hands records over without formatting them.
+
+    The stock QueueHandler formats each record in the logging thread so it
+    can be pickled; records here never leave the process, so message and
+    traceback formatting is left to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+_listener: Optional[QueueListener] = None
+
+def setup_logging(level: str = "INFO", fmt: str = LOG_FORMAT) -> None:
+    """
+    Route root logging through a queue drained by a background thread.
+
+    Request handlers only enqueue records; formatting and stream I/O happen
+    on the listener thread, so a slow terminal or log collector never
+    blocks the event loop. Safe to call more than once.
+
+    Args:
+        level: Root log level
+        fmt: Log record format
+    """
+    global _listener
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _listener is not None:
+        return
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(fmt))
+
+    queue_handler = LocalQueueHandler(log_queue)
+    # Filters run in the calling thread, where the request ID context variable is set
+    queue_handler.addFilter(RequestIdLogFilter())
+
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+class AggregatedLogger:
+    """
+    Rate-limited logging for conditions that repeat on every frame.
+
+    The first occurrence of each key is logged right away. Later
+    occurrences are only counted, and at most once per `interval` seconds a
+    single summary line reports how many times the key fired, e.g.
+    "Missing hip keypoints (412 times in last 60s)". Counting is a dict
+    update under a lock, so a suppressed call costs well under a microsecond.
+    """
+
+    def __init__(self, logger: logging.Logger, interval: float = 60.0, level: int = logging.WARNING):
+        self.logger = logger
+        self.interval = interval
+        self.level = level
+        self._counts: Dict[str, int] = {}
+        self._last_emit: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def log(self, key: str, message: str) -> None:
+        """
+        Count an occurrence of `key`, logging `message` if it is due.
+
+        Args:
+            key: Identifier of the repeated condition
+            message: Message logged for the condition
+        """
+        if not self.logger.isEnabledFor(self.level):
+            return
+        now = time.monotonic()
+        with self._lock:
+            count = self._counts.get(key, 0) + 1
+            last_emit = self._last_emit.get(key)
+            if last_emit is not None and now - last_emit < self.interval:
+                self._counts[key] = count
+                return
+            self._counts[key] = 0
+            self._last_emit[key] = now
+
+        if last_emit is None:
+            self.logger.log(self.level, message)
+        else:
+            self.logger.log(self.level, "%s (%d times in last %.0fs)", message, count, now - last_emit)
+
@@ -0,0 +1,34 @@
+import hmac
+import logging
+from typing import Optional
+
+from fastapi import Header, HTTPException, status
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Check a token against the configured admin token."""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), settings.ADMIN_TOKEN.encode("utf-8"))
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Dependency guarding admin endpoints with the X-Admin-Token header.
+
+    Raises:
+        HTTPException: 403 if admin access is disabled, 401 if the token is wrong
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints are disabled"
+        )
+    if not is_admin_token(x_admin_token):
+        logger.warning("Rejected admin request with invalid token")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin token"
+        )
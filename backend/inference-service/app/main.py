@@ -1,18 +1,36 @@
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import logging
 
-from app.api.endpoints import inference
+from app.api.endpoints import admin, inference
+from app.api.rpc import get_rpc_server
 from app.core.config import settings
 from app.core.errors import register_exception_handlers
+from app.core.limits import BodySizeLimitMiddleware
+from app.core.logging import setup_logging
+from app.core.tracing import TracingMiddleware
+from app.services.inference_pool import get_inference_pool
+from app.services.lifecycle import get_service_lifecycle
+from app.services.posture_rules import get_rule_engine
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+# Configure logging (records are written by a background thread)
+setup_logging(settings.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
+def load_models() -> None:
+    """Load the default model, or start the worker processes that each load it."""
+    if settings.INFERENCE_WORKERS:
+        # Models load in the worker processes instead of this one
+        logger.info(f"Starting inference pool with {settings.INFERENCE_WORKERS} workers...")
+        get_inference_pool().start()
+    else:
+        logger.info("Initializing YOLO model...")
+        from app.services.pose_detector import get_pose_detector
+        detector = get_pose_detector()
+        logger.info(f"YOLO model initialized: {detector.model_name}")
+
 def create_application() -> FastAPI:
     """Create and configure the FastAPI application."""
     application = FastAPI(
@@ -21,9 +39,20 @@ def create_application() -> FastAPI:
         version=settings.VERSION,
         docs_url="/docs",
         redoc_url="/redoc",
+        default_response_class=ORJSONResponse,
+    )
+
+    # Cap request bodies while they stream in
+    application.add_middleware(BodySizeLimitMiddleware, max_bytes=settings.MAX_REQUEST_BYTES)
+
+    # Trace requests so every response carries X-Request-ID and Server-Timing
+    application.add_middleware(
+        TracingMiddleware,
+        service_name="inference-service",
+        export_path=settings.TRACE_EXPORT_PATH
     )
 
-    # Configure CORS
+    # Configure CORS (added last so it also wraps limit rejections)
     application.add_middleware(
         CORSMiddleware,
         allow_origins=settings.CORS_ORIGINS,
@@ -37,19 +66,47 @@ def create_application() -> FastAPI:
 
     # Include API routes
     application.include_router(inference.router, prefix="/api/inference", tags=["Inference"])
+    application.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
     @application.get("/", tags=["Health"])
     async def health_check():
-        """Root endpoint for health checks."""
+        """Root endpoint for health (liveness) checks."""
         return {"status": "ok", "message": "Inference service is running"}
 
+    @application.get(
+        "/ready",
+        tags=["Health"],
+        responses={503: {"description": "Starting or shutting down"}}
+    )
+    async def readiness_check() -> ORJSONResponse:
+        """Readiness check: 200 once models are loaded, 503 while starting or draining."""
+        lifecycle = get_service_lifecycle()
+        return ORJSONResponse(
+            {"status": lifecycle.state, "in_flight": lifecycle.in_flight},
+            status_code=200 if lifecycle.ready else 503
+        )
+
     @application.on_event("startup")
     async def startup_event():
-        """Initialize services on startup."""
-        logger.info("Initializing YOLO model...")
-        from app.services.pose_detector import get_pose_detector
-        detector = get_pose_detector()
-        logger.info(f"YOLO model initialized: {detector.model_name}")
+        """Start loading models in the background, serve the RPC transport and watch the posture rules."""
+        # The server answers health checks while models load; /ready turns 200 once they have
+        get_service_lifecycle().start(load_models)
+        
+        # Internal binary transport for api-service
+        if settings.RPC_PORT or settings.RPC_SOCKET_PATH:
+            await get_rpc_server().start()
+
+        # Pick up rule file changes in the background rather than per frame
+        get_rule_engine().start()
+    
+    @application.on_event("shutdown")
+    async def shutdown_event():
+        """Stop background servers and workers on shutdown."""
+        await get_service_lifecycle().stop()
+        await get_rpc_server().stop()
+        get_rule_engine().stop()
+        if settings.INFERENCE_WORKERS:
+            await run_in_threadpool(get_inference_pool().stop)
 
     return application
 
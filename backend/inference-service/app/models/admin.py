@@ -0,0 +1,52 @@
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
+
+class ModelLoadRequest(BaseModel):
+    """Model for loading or swapping the model behind a tier."""
+    model_path: Optional[str] = Field(None, description="Model to load; defaults to the tier's configured path")
+
+class ModelTierInfo(BaseModel):
+    """Model describing a registered model tier."""
+    tier: str = Field(..., description="Latency tier name")
+    model_path: str = Field(..., description="Model path for the tier")
+    loaded: bool = Field(..., description="Whether the model is currently loaded")
+    default: bool = Field(..., description="Whether this is the default tier")
+    memory_bytes: int = Field(..., description="Estimated model memory in bytes")
+    last_used: Optional[float] = Field(None, description="Unix time the tier was last used")
+
+class WorkerInfo(BaseModel):
+    """Model describing an inference pool worker."""
+    worker: int = Field(..., description="Worker number")
+    pid: Optional[int] = Field(None, description="Worker process ID")
+    ready: bool = Field(..., description="Whether the worker is accepting calls")
+    in_flight: int = Field(..., description="Calls sent to the worker and not yet answered")
+
+class ProfileInfo(BaseModel):
+    """Model describing a saved request profile."""
+    id: str = Field(..., description="Profile identifier")
+    kind: str = Field(..., description="Profile kind: request (on demand) or sampled")
+    created_at: float = Field(..., description="Unix time the profile was saved")
+    size_bytes: int = Field(..., description="Profile file size in bytes")
+
+class QuantizationCheckRequest(BaseModel):
+    """Model for running a quantization accuracy check."""
+    model_path: Optional[str] = Field(None, description="FP32 model to check; defaults to MODEL_PATH")
+    reference_dir: Optional[str] = Field(None, description="Reference image directory; defaults to QUANTIZATION_REFERENCE_DIR")
+    # Only quantized modes can be compared with FP32; anything else is rejected before a model loads
+    quantization: Literal["int8"] = Field("int8", description="Quantization mode to evaluate")
+
+class QuantizationReport(BaseModel):
+    """Model for the agreement between a quantized model and its FP32 original."""
+    model_path: str = Field(..., description="FP32 model that was checked")
+    quantization: str = Field(..., description="Quantization mode evaluated")
+    images: int = Field(..., description="Number of reference images")
+    detection_agreement: float = Field(..., description="Fraction of images where both models agree a person is present")
+    keypoint_presence_agreement: Optional[float] = Field(None, description="Fraction of keypoints both models agree are visible")
+    mean_keypoint_error: Optional[float] = Field(None, description="Mean keypoint distance, as a fraction of the image diagonal")
+    max_keypoint_error: Optional[float] = Field(None, description="Max keypoint distance, as a fraction of the image diagonal")
+    verdict_agreement: Optional[float] = Field(None, description="Fraction of images with the same is_good_posture verdict")
+    mean_score_delta: Optional[float] = Field(None, description="Mean absolute difference in overall posture score")
+    reference_latency_ms: float = Field(..., description="Mean FP32 inference latency")
+    candidate_latency_ms: float = Field(..., description="Mean quantized inference latency")
+    speedup: Optional[float] = Field(None, description="FP32 latency divided by quantized latency")
+    per_image: List[Dict[str, Any]] = Field(..., description="Per-image comparison details")
@@ -1,6 +1,8 @@
 from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
+from app.core.config import settings
+
 class KeyPoint(BaseModel):
     """Model for a single keypoint with coordinates and confidence."""
     x: float
@@ -9,7 +11,7 @@ class KeyPoint(BaseModel):
 
 class InferenceRequest(BaseModel):
     """Model for inference request with base64 image."""
-    image: str = Field(..., description="Base64 encoded image data")
+    image: str = Field(..., max_length=settings.MAX_REQUEST_BYTES, description="Base64 encoded image data")
 
 class PostureKeypoints(BaseModel):
     """Model for keypoints relevant to posture analysis."""
@@ -22,9 +24,10 @@ class PostureKeypoints(BaseModel):
 
 class PostureAnalysis(BaseModel):
     """Model for posture analysis results."""
-    shoulder_balance: float = Field(..., description="Score for shoulder balance (0-1)")
-    neck_position: float = Field(..., description="Score for neck position (0-1)")
-    back_position: float = Field(..., description="Score for back position (0-1)")
+    shoulder_balance: Optional[float] = Field(None, description="Score for shoulder balance (0-1)")
+    neck_position: Optional[float] = Field(None, description="Score for neck position (0-1)")
+    back_position: Optional[float] = Field(None, description="Score for back position (0-1)")
+    scores: Optional[Dict[str, float]] = Field(None, description="Score of every configured posture rule (0-1)")
     overall_score: float = Field(..., description="Overall posture score (0-1)")
     is_good_posture: bool = Field(..., description="Overall posture assessment")
 
@@ -35,4 +38,5 @@ class InferenceResponse(BaseModel):
     feedback: List[str] = Field(..., description="List of feedback messages")
     keypoints: Optional[Dict[str, KeyPoint]] = Field(None, description="Detected keypoints")
     img_with_pose: Optional[str] = Field(None, description="Base64 encoded image with pose overlay")
-    analysis: Optional[PostureAnalysis] = Field(None, description="Detailed posture analysis")
\ No newline at end of file
+    analysis: Optional[PostureAnalysis] = Field(None, description="Detailed posture analysis")
+    tracked: Optional[bool] = Field(None, description="True when keypoints were propagated by optical flow rather than detected")
\ No newline at end of file
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import os
+import socket
+import stat
+from types import FrameType
+from typing import Optional
+
+import uvicorn
+
+from app.core.config import settings
+from app.services.lifecycle import get_service_lifecycle
+
+# uvicorn configures its own loggers before the app sets up logging
+logger = logging.getLogger("uvicorn.error")
+
+# Start with `python -m app.server`. Serves the API on HOST:PORT and, when
+# UDS_PATH is set, on a Unix domain socket as well, so api-service on the
+# same host can skip loopback TCP while browsers keep using the TCP port.
+# (`uvicorn --uds` alone would drop the TCP listener.) SIGTERM and Ctrl+C drain
+# in-flight work before the server stops; a second signal stops it without draining.
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that drains the service before shutting down."""
+
+    def __init__(self, config: uvicorn.Config):
+        super().__init__(config)
+        self._drain_task: Optional[asyncio.Task] = None
+
+    def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        if self._drain_task is not None or self.should_exit:
+            super().handle_exit(sig, frame)
+            return
+        # Signal handlers run on the event loop's thread
+        self._drain_task = asyncio.get_event_loop().create_task(self._drain(sig, frame))
+
+    async def _drain(self, sig: int, frame: Optional[FrameType]) -> None:
+        if not await get_service_lifecycle().drain():
+            # Don't wait on the calls still running past the grace period
+            self.force_exit = True
+        super().handle_exit(sig, frame)
+
+def bind_unix_socket(path: str) -> socket.socket:
+    """
+    Bind a listening Unix domain socket, replacing a stale socket file.
+
+    Args:
+        path: Filesystem path of the socket
+
+    Returns:
+        Bound socket, readable and writable by any local user like `uvicorn --uds`
+    """
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.remove(path)
+    except FileNotFoundError:
+        pass
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    os.chmod(path, 0o666)
+    return sock
+
+def main() -> None:
+    config = uvicorn.Config("app.main:app", host=settings.HOST, port=settings.PORT)
+    tcp_socket = config.bind_socket()
+    # asyncio only disables Nagle on sockets created with proto=IPPROTO_TCP, which the
+    # pre-bound socket is not; without this, keep-alive responses stall on delayed ACKs
+    tcp_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sockets = [tcp_socket]
+    if settings.UDS_PATH:
+        sockets.append(bind_unix_socket(settings.UDS_PATH))
+        logger.info("Serving on unix socket %s", settings.UDS_PATH)
+    try:
+        DrainingServer(config).run(sockets=sockets)
+    finally:
+        if settings.UDS_PATH and os.path.exists(settings.UDS_PATH):
+            os.remove(settings.UDS_PATH)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+import cv2
+import numpy as np
+
+from app.core.config import settings
+
+# Padding value ultralytics uses for letterboxed model inputs
+LETTERBOX_PAD_VALUE = 114
+
+# Scale ratio, resized (width, height) and (top, bottom, left, right) padding
+LetterboxGeometry = Tuple[float, Tuple[int, int], Tuple[int, int, int, int]]
+
+class BufferPool:
+    """
+    Pool of reusable numpy arrays, keyed by shape and dtype.
+
+    Per-frame scratch arrays (letterboxed model inputs, downscaled render
+    canvases) are taken from the pool and handed back when the request is
+    done with them, instead of being allocated and freed on every frame.
+    Idle buffers are capped at `max_bytes` in total; the least recently
+    used shapes are dropped first. With `max_bytes` 0 nothing is kept and
+    every acquire allocates.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._free: "OrderedDict[Tuple[Tuple[int, ...], str], List[np.ndarray]]" = OrderedDict()
+        self._idle_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @contextmanager
+    def acquire(self, shape: Tuple[int, ...], dtype: Any = np.uint8) -> Iterator[np.ndarray]:
+        """
+        Borrow an uninitialized array for the duration of the block.
+
+        The array must not be referenced after the block exits, since it may
+        be handed to another request.
+
+        Args:
+            shape: Array shape
+            dtype: Array dtype
+        """
+        key = (tuple(shape), np.dtype(dtype).str)
+        buffer = None
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                buffer = free.pop()
+                self._idle_bytes -= buffer.nbytes
+                self.hits += 1
+            else:
+                self.misses += 1
+        if buffer is None:
+            buffer = np.empty(shape, dtype)
+
+        try:
+            yield buffer
+        finally:
+            self._release(key, buffer)
+
+    def _release(self, key: Tuple[Tuple[int, ...], str], buffer: np.ndarray) -> None:
+        """Return a buffer to the pool, evicting least recently used shapes over the cap."""
+        if buffer.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            self._free.setdefault(key, []).append(buffer)
+            self._free.move_to_end(key)
+            self._idle_bytes += buffer.nbytes
+            while self._idle_bytes > self.max_bytes:
+                oldest_key, oldest = next(iter(self._free.items()))
+                self._idle_bytes -= oldest.pop(0).nbytes
+                if not oldest:
+                    del self._free[oldest_key]
+
+    def stats(self) -> Dict[str, int]:
+        """Get pool hit, miss and idle memory counters."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "idle_buffers": sum(len(free) for free in self._free.values()),
+                "idle_bytes": self._idle_bytes,
+            }
+
+def letterbox_geometry(
+    shape: Tuple[int, int],
+    image_size: int,
+    stride: int = 32
+) -> LetterboxGeometry:
+    """
+    Compute the letterbox layout ultralytics uses for rectangular inference.
+
+    The image is scaled so its longer side is `image_size` and the shorter
+    side is padded (centered) up to a multiple of `stride`.
+
+    Args:
+        shape: Source image (height, width)
+        image_size: Model input size
+        stride: Model stride the padded size must be a multiple of
+
+    Returns:
+        Tuple of the scale ratio, the resized (width, height) and the
+        (top, bottom, left, right) padding
+    """
+    height, width = shape
+    ratio = min(image_size / height, image_size / width)
+    new_width, new_height = int(round(width * ratio)), int(round(height * ratio))
+    pad_width = (image_size - new_width) % stride / 2
+    pad_height = (image_size - new_height) % stride / 2
+    top, bottom = int(round(pad_height - 0.1)), int(round(pad_height + 0.1))
+    left, right = int(round(pad_width - 0.1)), int(round(pad_width + 0.1))
+    return ratio, (new_width, new_height), (top, bottom, left, right)
+
+@contextmanager
+def letterbox(
+    image: np.ndarray,
+    image_size: int,
+    pool: BufferPool,
+    stride: int = 32
+) -> Iterator[Tuple[np.ndarray, float, Tuple[int, int]]]:
+    """
+    Letterbox an image into a pooled model input buffer.
+
+    The output matches ultralytics' own letterbox pixel for pixel, so the
+    model's preprocessing finds nothing left to resize.
+
+    Args:
+        image: Source image (BGR)
+        image_size: Model input size
+        pool: Pool the target buffer is borrowed from
+        stride: Model stride
+
+    Yields:
+        Tuple of the letterboxed frame, the scale ratio and the (x, y)
+        offset of the image inside the frame
+    """
+    geometry = letterbox_geometry(image.shape[:2], image_size, stride)
+    with pool.acquire(_letterbox_shape(image, geometry), image.dtype) as frame:
+        yield _fill_letterbox(image, frame, geometry)
+
+def letterbox_into(
+    image: np.ndarray,
+    buffer: np.ndarray,
+    image_size: int,
+    stride: int = 32
+) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Letterbox an image into the start of a flat buffer, such as a shared memory slot.
+
+    Args:
+        image: Source image (BGR)
+        buffer: Flat array of the image dtype, large enough for the frame
+        image_size: Model input size
+        stride: Model stride
+
+    Returns:
+        Tuple of the letterboxed frame (a view of `buffer`), the scale ratio
+        and the (x, y) offset of the image inside the frame
+    """
+    geometry = letterbox_geometry(image.shape[:2], image_size, stride)
+    shape = _letterbox_shape(image, geometry)
+    frame = buffer[:int(np.prod(shape))].reshape(shape)
+    return _fill_letterbox(image, frame, geometry)
+
+def _letterbox_shape(image: np.ndarray, geometry: LetterboxGeometry) -> Tuple[int, ...]:
+    """Get the shape of the letterboxed frame for an image."""
+    _, (new_width, new_height), (top, bottom, left, right) = geometry
+    return (new_height + top + bottom, new_width + left + right) + image.shape[2:]
+
+def _fill_letterbox(
+    image: np.ndarray,
+    frame: np.ndarray,
+    geometry: LetterboxGeometry
+) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """Resize an image into a frame of the letterbox shape and pad around it."""
+    ratio, (new_width, new_height), (top, bottom, left, right) = geometry
+    # Only the padding strips need filling; the resize writes the rest
+    frame[:top] = LETTERBOX_PAD_VALUE
+    frame[top + new_height:] = LETTERBOX_PAD_VALUE
+    frame[top:top + new_height, :left] = LETTERBOX_PAD_VALUE
+    frame[top:top + new_height, left + new_width:] = LETTERBOX_PAD_VALUE
+    cv2.resize(
+        image, (new_width, new_height),
+        dst=frame[top:top + new_height, left:left + new_width],
+        interpolation=cv2.INTER_LINEAR
+    )
+    return frame, ratio, (left, top)
+
+# Singleton instance to share across requests
+_buffer_pool_instance = None
+
+def get_buffer_pool() -> BufferPool:
+    """
+    Get or create singleton instance of BufferPool.
+
+    Returns:
+        BufferPool instance
+    """
+    global _buffer_pool_instance
+    if _buffer_pool_instance is None:
+        _buffer_pool_instance = BufferPool(settings.BUFFER_POOL_MAX_BYTES)
+    return _buffer_pool_instance
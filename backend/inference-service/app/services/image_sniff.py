@@ -0,0 +1,113 @@
+import struct
+import logging
+from typing import Tuple
+
+from app.core.config import settings
+from app.core.errors import ImageProcessingError, PayloadTooLargeError
+
+logger = logging.getLogger(__name__)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SIGNATURE = b"\xff\xd8"
+GIF_SIGNATURES = (b"GIF87a", b"GIF89a")
+BMP_SIGNATURE = b"BM"
+
+# JPEG start-of-frame markers carrying image dimensions (excludes DHT, JPG and DAC)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def sniff_image_header(data: bytes) -> Tuple[str, int, int]:
+    """
+    Identify an image format and its dimensions from the header bytes.
+
+    Only the magic bytes and the header fields holding the dimensions are
+    read; no pixel data is decoded.
+
+    Args:
+        data: Encoded image bytes
+
+    Returns:
+        Tuple of format name, width and height
+
+    Raises:
+        ImageProcessingError: If the format is unsupported or the header is malformed
+    """
+    try:
+        if data.startswith(PNG_SIGNATURE):
+            # IHDR is always the first chunk
+            width, height = struct.unpack(">II", data[16:24])
+            return "png", width, height
+        if data.startswith(JPEG_SIGNATURE):
+            return ("jpeg",) + _jpeg_dimensions(data)
+        if data[:6] in GIF_SIGNATURES:
+            width, height = struct.unpack("<HH", data[6:10])
+            return "gif", width, height
+        if data.startswith(BMP_SIGNATURE):
+            width, height = struct.unpack("<ii", data[18:26])
+            return "bmp", abs(width), abs(height)
+        if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+            return ("webp",) + _webp_dimensions(data)
+    except struct.error:
+        raise ImageProcessingError("Truncated image header")
+    raise ImageProcessingError("Unsupported image format")
+
+def _jpeg_dimensions(data: bytes) -> Tuple[int, int]:
+    """Walk JPEG segments up to the first start-of-frame marker."""
+    offset = 2
+    length = len(data)
+    while offset + 4 <= length:
+        if data[offset] != 0xFF:
+            raise ImageProcessingError("Malformed JPEG header")
+        marker = data[offset + 1]
+        # Fill bytes and standalone markers carry no length
+        if marker == 0xFF:
+            offset += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            offset += 2
+            continue
+        segment_length = struct.unpack(">H", data[offset + 2:offset + 4])[0]
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", data[offset + 5:offset + 9])
+            return width, height
+        offset += 2 + segment_length
+    raise ImageProcessingError("JPEG dimensions not found")
+
+def _webp_dimensions(data: bytes) -> Tuple[int, int]:
+    """Read dimensions from a lossy, lossless or extended WebP header."""
+    chunk = data[12:16]
+    if chunk == b"VP8 ":
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        bits = struct.unpack("<I", data[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return width, height
+    raise ImageProcessingError("Malformed WebP header")
+
+def check_image_header(data: bytes) -> Tuple[str, int, int]:
+    """
+    Reject unsupported or oversized images before they are decoded.
+
+    Args:
+        data: Encoded image bytes
+
+    Returns:
+        Tuple of format name, width and height
+
+    Raises:
+        ImageProcessingError: If the image format is unsupported or malformed
+        PayloadTooLargeError: If the image exceeds the configured dimensions
+    """
+    image_format, width, height = sniff_image_header(data)
+    if width <= 0 or height <= 0:
+        raise ImageProcessingError("Invalid image dimensions")
+    if max(width, height) > settings.MAX_IMAGE_DIMENSION or width * height > settings.MAX_IMAGE_PIXELS:
+        logger.warning(f"Rejected {width}x{height} {image_format} image")
+        raise PayloadTooLargeError(
+            f"Image is {width}x{height}; limit is {settings.MAX_IMAGE_PIXELS} pixels "
+            f"and {settings.MAX_IMAGE_DIMENSION} px per side"
+        )
+    return image_format, width, height
@@ -0,0 +1,435 @@
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import status
+
+from app.core.config import settings
+from app.core.errors import ModelError, NoPersonDetectedError
+from app.services.buffer_pool import letterbox_into
+from app.services.pose_detector import (
+    MODEL_STRIDE, QUANTIZATION_INT8, RENDERER_ULTRALYTICS, PoseDetector, map_from_letterbox
+)
+
+logger = logging.getLogger(__name__)
+
+# Frame slots per worker: one being inferred while the next is letterboxed
+SLOTS_PER_WORKER = 2
+
+# Seconds to wait for workers to exit on shutdown before terminating them
+WORKER_STOP_TIMEOUT = 10.0
+
+# Error kinds reported by workers
+ERROR_NO_PERSON = "no_person"
+ERROR_MODEL = "model"
+
+class _Worker:
+    """Parent-side handle of a worker process."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.conn: Optional[Connection] = None
+        self.ready = False
+        self.in_flight = 0
+        self.pending: Dict[int, Future] = {}
+        self.send_lock = threading.Lock()
+
+class InferencePool:
+    """
+    Pool of model worker processes, each holding its own pose models.
+
+    Running the model in separate processes lets inference use every core
+    from one uvicorn process. Request threads letterbox decoded frames
+    straight into slots of one shared memory block, so only the slot
+    number, frame shape and tier cross the process boundary; workers reply
+    with the (17, 3) keypoint array. Each call goes to the worker with the
+    fewest calls in flight. A worker that dies fails its calls in flight
+    and is restarted, and so is one that leaves a call unanswered for
+    `call_timeout` seconds.
+
+    Only the model runs in the workers: decoding, live tracking, posture
+    analysis and rendering stay in the request threads. The raw model
+    result does not leave the worker, so overlays are always drawn by the
+    skeleton renderer.
+    """
+
+    def __init__(self, workers: int, image_size: int, threads: int = 1, call_timeout: float = 30.0):
+        self.workers = workers
+        self.image_size = image_size
+        self.threads = threads
+        self.call_timeout = call_timeout
+        self.slot_bytes = image_size * image_size * 3
+        self.slot_count = workers * SLOTS_PER_WORKER
+        self._context = multiprocessing.get_context("spawn")
+        self._shm: Optional[SharedMemory] = None
+        # Free slots as (index, flat view of the slot) pairs
+        self._slots: "queue.SimpleQueue[Tuple[int, np.ndarray]]" = queue.SimpleQueue()
+        self._workers: List[_Worker] = []
+        self._detectors: Dict[Optional[str], "PooledPoseDetector"] = {}
+        self._call_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    def start(self) -> None:
+        """
+        Start the workers and wait until each has loaded the default model.
+
+        Raises:
+            ModelError: If a worker fails to start
+        """
+        if settings.POSE_RENDERER == RENDERER_ULTRALYTICS:
+            logger.warning("POSE_RENDERER=ultralytics is not supported by the inference pool; using the skeleton renderer")
+
+        self._shm = SharedMemory(create=True, size=self.slot_bytes * self.slot_count)
+        for slot in range(self.slot_count):
+            self._slots.put((slot, np.ndarray((self.slot_bytes,), np.uint8, self._shm.buf, slot * self.slot_bytes)))
+
+        self._workers = [_Worker(index) for index in range(self.workers)]
+        try:
+            for worker in self._workers:
+                self._spawn(worker)
+            for worker in self._workers:
+                self._wait_ready(worker)
+        except Exception:
+            self.stop()
+            raise
+        for worker in self._workers:
+            threading.Thread(target=self._read_replies, args=(worker,), name=f"inference-pool-{worker.index}", daemon=True).start()
+        logger.info("Inference pool started with %d workers", self.workers)
+
+    def stop(self) -> None:
+        """Stop the workers and release the shared memory."""
+        self._stopping = True
+        for worker in self._workers:
+            worker.ready = False
+            try:
+                with worker.send_lock:
+                    worker.conn.send(None)
+            except (AttributeError, OSError):
+                pass
+        for worker in self._workers:
+            if worker.process is None:
+                continue
+            worker.process.join(WORKER_STOP_TIMEOUT)
+            if worker.process.is_alive():
+                logger.warning("Inference worker %d did not exit; terminating it", worker.index)
+                worker.process.terminate()
+                worker.process.join()
+            worker.conn.close()
+        self._workers = []
+
+        if self._shm is not None:
+            # Drop the slot views so the block can be closed
+            while not self._slots.empty():
+                self._slots.get()
+            try:
+                self._shm.close()
+            except BufferError:
+                logger.warning("Frame slots still in use at shutdown")
+            self._shm.unlink()
+            self._shm = None
+
+    def detector(self, tier: Optional[str] = None) -> "PooledPoseDetector":
+        """
+        Get a detector that runs the model for a tier in the pool.
+
+        Args:
+            tier: Latency tier name (defaults to the default tier)
+
+        Returns:
+            PooledPoseDetector instance
+        """
+        detector = self._detectors.get(tier)
+        if detector is None:
+            detector = self._detectors.setdefault(tier, PooledPoseDetector(self, tier))
+        return detector
+
+    def infer(self, img: np.ndarray, tier: Optional[str] = None) -> np.ndarray:
+        """
+        Run the pose model for a tier on a decoded image in a worker.
+
+        Blocks while every frame slot is in use.
+
+        Args:
+            img: Image as numpy array
+            tier: Latency tier name (defaults to the default tier)
+
+        Returns:
+            (17, 3) array of x, y and confidence for the first person
+
+        Raises:
+            NoPersonDetectedError: If no person is detected
+            ModelError: If the tier is unknown, or the model or worker fails
+        """
+        slot, buffer = self._slots.get()
+        try:
+            frame, ratio, offset = letterbox_into(img, buffer, self.image_size, MODEL_STRIDE)
+            keypoints = self._call(slot, frame.shape, tier)
+        finally:
+            self._slots.put((slot, buffer))
+        return map_from_letterbox(keypoints, ratio, offset, img.shape)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Describe each worker's state and load."""
+        with self._lock:
+            return [
+                {
+                    "worker": worker.index,
+                    "pid": worker.process.pid if worker.process is not None else None,
+                    "ready": worker.ready,
+                    "in_flight": worker.in_flight,
+                }
+                for worker in self._workers
+            ]
+
+    def _call(self, slot: int, shape: Tuple[int, ...], tier: Optional[str]) -> np.ndarray:
+        """Send a frame slot to the least loaded worker and wait for the keypoints."""
+        future: Future = Future()
+        with self._lock:
+            ready = [worker for worker in self._workers if worker.ready]
+            if not ready:
+                raise ModelError("No inference workers available", status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+            worker = min(ready, key=lambda candidate: candidate.in_flight)
+            # A restart replaces the process, and a late timeout must not kill the replacement
+            process = worker.process
+            call_id = next(self._call_ids)
+            worker.pending[call_id] = future
+            worker.in_flight += 1
+
+        try:
+            try:
+                with worker.send_lock:
+                    worker.conn.send((call_id, slot, shape, tier))
+            except OSError as e:
+                raise ModelError(f"Inference worker unavailable: {e}", status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+            try:
+                keypoints, error = future.result(self.call_timeout or None)
+            except TimeoutError:
+                self._kill(worker, process)
+                raise ModelError(
+                    f"Inference worker did not answer within {self.call_timeout:g}s",
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+                )
+        finally:
+            with self._lock:
+                worker.pending.pop(call_id, None)
+                worker.in_flight -= 1
+
+        if error is not None:
+            kind, detail, status_code = error
+            if kind == ERROR_NO_PERSON:
+                raise NoPersonDetectedError(detail)
+            raise ModelError(detail, status_code=status_code)
+        return keypoints
+
+    def _kill(self, worker: _Worker, process: multiprocessing.process.BaseProcess) -> None:
+        """
+        Kill a stuck worker process so that it is restarted.
+
+        Waits for the process to exit, so the caller's frame slot can be
+        reused. The reply reader then fails its other calls in flight and
+        starts a replacement.
+        """
+        logger.error("Inference worker %d did not answer within %.1fs; killing it", worker.index, self.call_timeout)
+        process.kill()
+        # Wait on the sentinel rather than joining, which is left to the reply reader
+        multiprocessing.connection.wait([process.sentinel], WORKER_STOP_TIMEOUT)
+
+    def _spawn(self, worker: _Worker) -> None:
+        """Start the process for a worker."""
+        parent_conn, child_conn = self._context.Pipe()
+        worker.conn = parent_conn
+        worker.process = self._context.Process(
+            target=run_worker,
+            args=(worker.index, self._shm.name, self.slot_bytes, child_conn, self.threads),
+            name=f"inference-worker-{worker.index}",
+            daemon=True
+        )
+        worker.process.start()
+        child_conn.close()
+
+    def _wait_ready(self, worker: _Worker) -> None:
+        """
+        Wait for a worker to report that its default model is loaded.
+
+        Raises:
+            ModelError: If the worker fails to load the model or exits
+        """
+        try:
+            error = worker.conn.recv()
+        except (EOFError, OSError):
+            error = f"exited with code {worker.process.exitcode}"
+        if error is not None:
+            raise ModelError(f"Inference worker {worker.index} failed to start: {error}")
+        worker.ready = True
+
+    def _read_replies(self, worker: _Worker) -> None:
+        """Resolve a worker's calls as replies arrive, restarting the worker if it dies."""
+        while True:
+            try:
+                call_id, keypoints, error = worker.conn.recv()
+            except (EOFError, OSError):
+                if not self._restart(worker):
+                    return
+                continue
+            with self._lock:
+                future = worker.pending.get(call_id)
+            if future is not None:
+                future.set_result((keypoints, error))
+
+    def _restart(self, worker: _Worker) -> bool:
+        """
+        Fail a dead worker's calls in flight and start a replacement.
+
+        Returns:
+            Whether the worker is serving again
+        """
+        with self._lock:
+            worker.ready = False
+            pending = list(worker.pending.values())
+            worker.pending.clear()
+        error = (ERROR_MODEL, "Inference worker exited", status.HTTP_503_SERVICE_UNAVAILABLE)
+        for future in pending:
+            if not future.done():
+                future.set_result((None, error))
+        if self._stopping:
+            return False
+
+        worker.process.join()
+        logger.error("Inference worker %d exited with code %s; restarting it", worker.index, worker.process.exitcode)
+        worker.conn.close()
+        try:
+            self._spawn(worker)
+            self._wait_ready(worker)
+        except Exception as e:
+            logger.error("Failed to restart inference worker %d: %s", worker.index, e)
+            return False
+        return True
+
+class PooledPoseDetector(PoseDetector):
+    """
+    PoseDetector whose model runs in the inference pool.
+
+    Decoding, tracking, analysis, rendering and encoding run in the calling
+    thread as usual; only `infer` is sent to a worker. No model is loaded
+    in this process.
+    """
+
+    def __init__(self, pool: InferencePool, tier: Optional[str] = None):
+        self.pool = pool
+        self.tier = tier
+        self.model = None
+        self.model_name = f"{tier or settings.DEFAULT_MODEL_TIER} (pool)"
+        self.conf = settings.MODEL_CONFIDENCE
+        self.quantization = settings.MODEL_QUANTIZATION
+        self.image_size = pool.image_size
+
+    def infer(self, img: np.ndarray, keep_result: bool = True) -> Tuple[np.ndarray, Any]:
+        """
+        Run the pose model on a decoded image in the pool.
+
+        Args:
+            img: Image as numpy array
+            keep_result: Ignored; the raw model result stays in the worker
+
+        Returns:
+            Tuple of a (17, 3) array of x, y and confidence for the first
+            person, and None in place of the raw model result
+
+        Raises:
+            NoPersonDetectedError: If no person is detected
+        """
+        return self.pool.infer(img, self.tier), None
+
+def run_worker(index: int, shm_name: str, slot_bytes: int, conn: Connection, threads: int) -> None:
+    """
+    Worker process loop: run the model on frame slots until told to stop.
+
+    Args:
+        index: Worker number, for logging
+        shm_name: Name of the shared memory block holding the frame slots
+        slot_bytes: Size of one slot
+        conn: Pipe to the parent; receives (call_id, slot, shape, tier)
+            calls, or None to stop, and sends (call_id, keypoints, error)
+        threads: Threads the model may use
+    """
+    from app.core.logging import setup_logging
+    from app.services.model_registry import get_model_registry
+
+    setup_logging(settings.LOG_LEVEL)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    shm = SharedMemory(name=shm_name)
+    registry = get_model_registry()
+    try:
+        registry.get()
+    except Exception as e:
+        conn.send(str(e))
+        return
+    conn.send(None)
+    logger.info("Inference worker %d ready", index)
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if message is None:
+            break
+        call_id, slot, shape, tier = message
+        try:
+            frame = np.ndarray(shape, np.uint8, shm.buf, slot * slot_bytes)
+            reply = (call_id, registry.get(tier).infer_frame(frame), None)
+        except NoPersonDetectedError as e:
+            reply = (call_id, None, (ERROR_NO_PERSON, e.detail, e.status_code))
+        except ModelError as e:
+            reply = (call_id, None, (ERROR_MODEL, e.detail, e.status_code))
+        except Exception as e:
+            logger.error("Error in pose detection: %s", e, exc_info=True)
+            reply = (call_id, None, (ERROR_MODEL, f"Error in pose detection: {str(e)}", 500))
+        finally:
+            frame = None
+        conn.send(reply)
+
+    try:
+        shm.close()
+    except BufferError:
+        # The model may still reference the last frame
+        pass
+
+# Singleton instance to share across requests
+_inference_pool_instance = None
+
+def get_inference_pool() -> InferencePool:
+    """
+    Get or create singleton instance of InferencePool.
+
+    Returns:
+        InferencePool instance
+    """
+    global _inference_pool_instance
+    if _inference_pool_instance is None:
+        image_size = (
+            settings.QUANTIZATION_IMAGE_SIZE
+            if settings.MODEL_QUANTIZATION == QUANTIZATION_INT8
+            else settings.MODEL_IMAGE_SIZE
+        )
+        _inference_pool_instance = InferencePool(
+            workers=settings.INFERENCE_WORKERS,
+            image_size=image_size,
+            threads=settings.INFERENCE_WORKER_THREADS,
+            call_timeout=settings.INFERENCE_CALL_TIMEOUT
+        )
+    return _inference_pool_instance
@@ -0,0 +1,227 @@
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+import msgpack
+import numpy as np
+import orjson
+
+from app.services.pose_detector import KEYPOINT_DICT
+
+logger = logging.getLogger(__name__)
+
+# Supported response formats
+FORMAT_FULL = "full"
+FORMAT_COMPACT = "compact"
+FORMAT_MSGPACK = "msgpack"
+FORMAT_PATTERN = f"^({FORMAT_FULL}|{FORMAT_COMPACT}|{FORMAT_MSGPACK})$"
+
+# Media types used for content negotiation
+JSON_MEDIA_TYPE = "application/json"
+COMPACT_MEDIA_TYPE = "application/vnd.sitwell.compact+json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+MSGPACK_MEDIA_TYPE = MSGPACK_MEDIA_TYPES[0]
+
+# Formats negotiable through the Accept header, with their media types; when
+# ranges are accepted equally, formats listed first are preferred
+ACCEPT_FORMATS = (
+    (FORMAT_MSGPACK, MSGPACK_MEDIA_TYPES),
+    (FORMAT_COMPACT, (COMPACT_MEDIA_TYPE,)),
+    (FORMAT_FULL, (JSON_MEDIA_TYPE,)),
+)
+# Ranges that also cover JSON
+JSON_WILDCARDS = ("application/*", "*/*")
+
+# Keypoint names in KEYPOINT_DICT order; position i of a compact array holds keypoint i
+KEYPOINT_NAMES = tuple(KEYPOINT_DICT[i] for i in range(len(KEYPOINT_DICT)))
+KEYPOINT_INDEX = {name: i for i, name in enumerate(KEYPOINT_NAMES)}
+KEYPOINT_VALUES = 3
+
+def negotiate_format(requested: Optional[str], accept: Optional[str]) -> str:
+    """
+    Pick the response format for a request.
+
+    An explicit `format` query value wins over the Accept header. Otherwise
+    the supported format with the highest quality in the Accept header is
+    used, with JSON as the fallback; ranges with q=0 are never picked.
+
+    Args:
+        requested: Value of the `format` query parameter
+        accept: Value of the Accept header
+
+    Returns:
+        One of FORMAT_FULL, FORMAT_COMPACT or FORMAT_MSGPACK
+    """
+    if requested:
+        return requested
+    if not accept:
+        return FORMAT_FULL
+
+    qualities = parse_accept(accept)
+    best_format, best_quality = FORMAT_FULL, 0.0
+    for response_format, media_types in ACCEPT_FORMATS:
+        listed = [qualities[media_type] for media_type in media_types if media_type in qualities]
+        if not listed and response_format == FORMAT_FULL:
+            listed = [qualities[media_type] for media_type in JSON_WILDCARDS if media_type in qualities]
+        if listed and max(listed) > best_quality:
+            best_format, best_quality = response_format, max(listed)
+    return best_format
+
+def parse_accept(accept: str) -> Dict[str, float]:
+    """
+    Parse an Accept header into media ranges and their quality values.
+
+    Ranges without a q parameter have quality 1; ranges with an invalid one
+    are skipped. A range listed more than once keeps its highest quality.
+
+    Args:
+        accept: Value of the Accept header
+
+    Returns:
+        Dictionary of lowercased media ranges to qualities (0-1)
+    """
+    qualities: Dict[str, float] = {}
+    for media_range in accept.lower().split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        if not media_type:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    quality = None
+                break
+        if quality is not None:
+            qualities[media_type] = max(quality, qualities.get(media_type, 0.0))
+    return qualities
+
+def keypoints_to_array(keypoints: Dict[str, Dict[str, float]]) -> np.ndarray:
+    """
+    Convert a keypoint dictionary to a (17, 3) array in KEYPOINT_DICT order.
+
+    Keypoints missing from the dictionary are left as zeros.
+
+    Args:
+        keypoints: Dictionary of keypoints with coordinates and confidence
+
+    Returns:
+        Array of x, y and confidence rows
+    """
+    array = np.zeros((len(KEYPOINT_NAMES), KEYPOINT_VALUES), dtype=np.float32)
+    for name, point in keypoints.items():
+        index = KEYPOINT_INDEX.get(name)
+        if index is not None:
+            array[index] = (point["x"], point["y"], point["confidence"])
+    return array
+
+def array_to_keypoints(array: np.ndarray) -> Dict[str, Dict[str, float]]:
+    """
+    Convert a (17, 3) keypoint array back to a keypoint dictionary.
+
+    Rows with zero confidence are treated as missing and skipped.
+
+    Args:
+        array: Array of x, y and confidence rows
+
+    Returns:
+        Dictionary of keypoints with coordinates and confidence
+    """
+    keypoints = {}
+    for i, (x, y, conf) in enumerate(np.asarray(array, dtype=np.float32).reshape(-1, KEYPOINT_VALUES)):
+        if conf > 0:
+            keypoints[KEYPOINT_NAMES[i]] = {"x": float(x), "y": float(y), "confidence": float(conf)}
+    return keypoints
+
+def pack_keypoints(keypoints: Optional[Dict[str, Dict[str, float]]]) -> Optional[List[float]]:
+    """
+    Pack keypoints into a flat list of 51 floats (x, y, confidence per keypoint).
+
+    Coordinates are rounded to 0.1 px and confidences to 3 decimals to keep
+    the JSON text short.
+
+    Args:
+        keypoints: Dictionary of keypoints with coordinates and confidence
+
+    Returns:
+        Flat list of floats, or None if there are no keypoints
+    """
+    if keypoints is None:
+        return None
+    packed = [0.0] * (len(KEYPOINT_NAMES) * KEYPOINT_VALUES)
+    for name, point in keypoints.items():
+        index = KEYPOINT_INDEX.get(name)
+        if index is not None:
+            offset = index * KEYPOINT_VALUES
+            packed[offset] = round(point["x"], 1)
+            packed[offset + 1] = round(point["y"], 1)
+            packed[offset + 2] = round(point["confidence"], 3)
+    return packed
+
+def pack_keypoints_binary(keypoints: Optional[Dict[str, Dict[str, float]]]) -> Optional[bytes]:
+    """
+    Pack keypoints into 204 bytes of little-endian float32 values.
+
+    Args:
+        keypoints: Dictionary of keypoints with coordinates and confidence
+
+    Returns:
+        Packed bytes, or None if there are no keypoints
+    """
+    if keypoints is None:
+        return None
+    return keypoints_to_array(keypoints).astype("<f4").tobytes()
+
+def unpack_keypoints_binary(data: bytes) -> Dict[str, Dict[str, float]]:
+    """
+    Unpack keypoints packed by `pack_keypoints_binary`.
+
+    Args:
+        data: Packed little-endian float32 bytes
+
+    Returns:
+        Dictionary of keypoints with coordinates and confidence
+    """
+    return array_to_keypoints(np.frombuffer(data, dtype="<f4"))
+
+def to_compact(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of a response payload with keypoints in compact array form."""
+    compact = dict(payload)
+    compact["keypoints"] = pack_keypoints(payload.get("keypoints"))
+    return compact
+
+def to_msgpack(payload: Dict[str, Any]) -> bytes:
+    """
+    Encode a response payload as MessagePack.
+
+    Keypoints are packed as float32 bytes. `img_with_pose` is expected to be
+    raw PNG bytes, so the overlay is shipped without base64 encoding.
+
+    Args:
+        payload: Response payload
+
+    Returns:
+        MessagePack encoded payload
+    """
+    packed = dict(payload)
+    packed["keypoints"] = pack_keypoints_binary(payload.get("keypoints"))
+    return msgpack.packb(packed, use_bin_type=True)
+
+def encode_response(payload: Dict[str, Any], response_format: str) -> Tuple[bytes, str]:
+    """
+    Encode a response payload the way the HTTP endpoint sends it.
+
+    Args:
+        payload: Response payload
+        response_format: One of FORMAT_FULL, FORMAT_COMPACT or FORMAT_MSGPACK
+
+    Returns:
+        Tuple of the encoded body and its media type
+    """
+    if response_format == FORMAT_MSGPACK:
+        return to_msgpack(payload), MSGPACK_MEDIA_TYPE
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    if response_format == FORMAT_COMPACT:
+        return orjson.dumps(to_compact(payload), option=options), COMPACT_MEDIA_TYPE
+    return orjson.dumps(payload, option=options), JSON_MEDIA_TYPE
@@ -0,0 +1,215 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.core.config import settings
+from app.services.pose_detector import PoseDetector, KEYPOINT_DICT
+
+logger = logging.getLogger(__name__)
+
+# Joints propagated between keyframes; the others keep their keyframe positions
+TRACKED_JOINTS = ("left_ear", "right_ear", "left_shoulder", "right_shoulder", "left_hip", "right_hip")
+TRACKED_INDICES = np.array(
+    [index for index, name in KEYPOINT_DICT.items() if name in TRACKED_JOINTS],
+    dtype=np.intp
+)
+
+# Confidence above which a joint counts as visible
+VISIBLE_CONFIDENCE = 0.5
+
+# Minimum visible joints needed to track instead of re-detecting
+MIN_TRACKED_JOINTS = 3
+
+LK_PARAMS = dict(
+    winSize=(21, 21),
+    maxLevel=3,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03)
+)
+
+class TrackingSession:
+    """Per-session state carried between frames."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.prev_gray: Optional[np.ndarray] = None
+        self.keypoints: Optional[np.ndarray] = None
+        self.keyframe_confidence = 0.0
+        self.frames_since_keyframe = 0
+        self.last_seen = time.monotonic()
+
+class KeypointTracker:
+    """
+    Keyframe pose inference with sparse optical-flow propagation.
+
+    The full model runs on a keyframe every `keyframe_interval` frames, or
+    sooner when the last keyframe was low confidence. In between, the
+    torso and head joints are carried forward with pyramidal Lucas-Kanade
+    flow, and the remaining joints keep their last detected positions, so
+    every frame has the full skeleton. A forward-backward consistency
+    check detects drift and forces a re-detect on the current frame.
+    """
+
+    def __init__(
+        self,
+        keyframe_interval: int,
+        min_confidence: float,
+        max_fb_error: float,
+        session_ttl: float,
+        max_sessions: int
+    ):
+        self.keyframe_interval = keyframe_interval
+        self.min_confidence = min_confidence
+        self.max_fb_error = max_fb_error
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, TrackingSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def process(
+        self,
+        session_id: str,
+        img: np.ndarray,
+        detector: PoseDetector,
+        keep_result: bool = True
+    ) -> Tuple[np.ndarray, Optional[Any], bool]:
+        """
+        Get keypoints for the next frame of a session.
+
+        Args:
+            session_id: Client session identifier
+            img: Decoded frame
+            detector: Detector used for keyframes
+            keep_result: Whether keyframes need the raw model result
+                (see `PoseDetector.infer`)
+
+        Returns:
+            Tuple of a (17, 3) keypoint array, the raw model result (None on
+            tracked frames, or when not kept) and whether the frame was a
+            keyframe
+
+        Raises:
+            NoPersonDetectedError: If a keyframe finds no person
+        """
+        session = self._get_session(session_id)
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+        with session.lock:
+            tracked = None
+            if not self._needs_keyframe(session, gray):
+                tracked = self._track(session, gray)
+
+            if tracked is not None:
+                session.keypoints = tracked
+                session.frames_since_keyframe += 1
+                session.prev_gray = gray
+                return tracked, None, False
+
+            # Drop stale state first so a failed detect doesn't leave it behind
+            session.prev_gray = None
+            session.keypoints = None
+            keypoints, result = detector.infer(img, keep_result)
+            session.prev_gray = gray
+            session.keypoints = keypoints
+            session.keyframe_confidence = self._keyframe_confidence(keypoints)
+            session.frames_since_keyframe = 0
+            return keypoints, result, True
+
+    def drop_session(self, session_id: str) -> None:
+        """Forget the state of a session."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    @staticmethod
+    def _keyframe_confidence(keypoints: np.ndarray) -> float:
+        """
+        Mean confidence of the visible tracked joints, or 0 if too few are visible.
+
+        Joints out of view, such as the hips of a seated webcam user, are
+        left out so they don't force a keyframe on every frame.
+        """
+        confidences = keypoints[TRACKED_INDICES, 2]
+        visible = confidences[confidences > VISIBLE_CONFIDENCE]
+        if len(visible) < MIN_TRACKED_JOINTS:
+            return 0.0
+        return float(visible.mean())
+
+    def _needs_keyframe(self, session: TrackingSession, gray: np.ndarray) -> bool:
+        """Decide whether the next frame must run the full model."""
+        return (
+            session.keypoints is None
+            or session.prev_gray is None
+            or session.prev_gray.shape != gray.shape
+            or session.frames_since_keyframe + 1 >= self.keyframe_interval
+            or session.keyframe_confidence < self.min_confidence
+        )
+
+    def _track(self, session: TrackingSession, gray: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Propagate the tracked joints into the current frame.
+
+        Returns:
+            Updated keypoint array, with untracked joints as in the previous
+            frame, or None if tracking drifted
+        """
+        previous = session.keypoints
+        visible = TRACKED_INDICES[previous[TRACKED_INDICES, 2] > VISIBLE_CONFIDENCE]
+        if len(visible) < MIN_TRACKED_JOINTS:
+            return None
+
+        prev_points = previous[visible, :2].reshape(-1, 1, 2).astype(np.float32)
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(session.prev_gray, gray, prev_points, None, **LK_PARAMS)
+        back_points, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, session.prev_gray, next_points, None, **LK_PARAMS)
+
+        fb_error = np.linalg.norm((prev_points - back_points).reshape(-1, 2), axis=1)
+        if not (status.all() and back_status.all()) or float(fb_error.max()) > self.max_fb_error:
+            logger.debug("Optical flow drift detected (max forward-backward error %.2f px)", fb_error.max())
+            return None
+
+        tracked = previous.copy()
+        tracked[visible, :2] = next_points.reshape(-1, 2)
+        return tracked
+
+    def _get_session(self, session_id: str) -> TrackingSession:
+        """Get or create a session, expiring idle ones and capping the total."""
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or now - session.last_seen > self.session_ttl:
+                session = TrackingSession()
+                self._sessions[session_id] = session
+            session.last_seen = now
+            self._sessions.move_to_end(session_id)
+
+            # Sessions are in LRU order, so expired and excess ones sit at the front
+            while self._sessions:
+                oldest_id, oldest = next(iter(self._sessions.items()))
+                if len(self._sessions) <= self.max_sessions and now - oldest.last_seen <= self.session_ttl:
+                    break
+                del self._sessions[oldest_id]
+            return session
+
+# Singleton instance to share across requests
+_keypoint_tracker_instance = None
+
+def get_keypoint_tracker() -> KeypointTracker:
+    """
+    Get or create singleton instance of KeypointTracker.
+
+    Returns:
+        KeypointTracker instance
+    """
+    global _keypoint_tracker_instance
+    if _keypoint_tracker_instance is None:
+        _keypoint_tracker_instance = KeypointTracker(
+            keyframe_interval=settings.KEYFRAME_INTERVAL,
+            min_confidence=settings.KEYFRAME_MIN_CONFIDENCE,
+            max_fb_error=settings.TRACKING_MAX_FB_ERROR,
+            session_ttl=settings.TRACKING_SESSION_TTL,
+            max_sessions=settings.TRACKING_MAX_SESSIONS
+        )
+    return _keypoint_tracker_instance
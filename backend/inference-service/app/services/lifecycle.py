@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.errors import ServiceUnavailableError
+from app.services.posture_state import get_posture_state_tracker
+
+logger = logging.getLogger(__name__)
+
+# Lifecycle states reported by the readiness endpoint
+STATE_STARTING = "starting"
+STATE_READY = "ready"
+STATE_DRAINING = "draining"
+
+# Seconds between checks for in-flight calls while draining
+DRAIN_POLL_INTERVAL = 0.05
+
+class ServiceLifecycle:
+    """
+    Readiness and in-flight work tracking for graceful restarts.
+
+    The service starts unready and loads its models in the background, so
+    the server answers liveness checks right away and load balancers only
+    route to it once it is ready. Analysis calls are counted while they
+    run. Draining reports unready at once but keeps accepting work for
+    `drain_delay` seconds, long enough for load balancers to notice, then
+    rejects new work with 503 and waits up to `grace_period` seconds for
+    the calls already accepted, including those queued for a thread or
+    worker, to finish.
+    """
+
+    def __init__(self, drain_delay: float, grace_period: float):
+        self.drain_delay = drain_delay
+        self.grace_period = grace_period
+        self.started = False
+        self.draining = False
+        self.accepting = True
+        self._in_flight = 0
+        self._startup: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether load balancers should route calls here."""
+        return self.started and not self.draining
+
+    @property
+    def state(self) -> str:
+        """Lifecycle state: starting, ready or draining."""
+        if self.draining:
+            return STATE_DRAINING
+        return STATE_READY if self.started else STATE_STARTING
+
+    @property
+    def in_flight(self) -> int:
+        """Number of analysis calls in progress."""
+        return self._in_flight
+
+    def start(self, warm_up: Callable[[], None]) -> None:
+        """
+        Run blocking startup work in a thread and report ready once it finishes.
+
+        Args:
+            warm_up: Startup work, such as loading models
+        """
+        self._startup = asyncio.create_task(self._warm_up(warm_up))
+
+    async def stop(self) -> None:
+        """Stop waiting for startup work that is still running."""
+        if self._startup is not None and not self._startup.done():
+            self._startup.cancel()
+            await asyncio.gather(self._startup, return_exceptions=True)
+
+    @contextmanager
+    def work(self) -> Iterator[None]:
+        """
+        Count an analysis call for the duration of the block.
+
+        Raises:
+            ServiceUnavailableError: If the service is still starting or no longer accepts work
+        """
+        if not self.accepting:
+            raise ServiceUnavailableError("Service is shutting down")
+        if not self.started:
+            raise ServiceUnavailableError("Service is starting")
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+
+    async def drain(self) -> bool:
+        """
+        Stop taking work, waiting for in-flight calls to finish.
+
+        Returns:
+            True if every call finished within the grace period
+        """
+        self.draining = True
+        logger.info("Draining: readiness is false, accepting work for another %.1fs", self.drain_delay)
+        await asyncio.sleep(self.drain_delay)
+
+        self.accepting = False
+        # Event streams would otherwise hold their connections open until the grace period ends
+        get_posture_state_tracker().close()
+        deadline = time.monotonic() + self.grace_period
+        if self._in_flight:
+            logger.info("Waiting up to %.1fs for %d in-flight calls", self.grace_period, self._in_flight)
+        while self._in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(DRAIN_POLL_INTERVAL)
+        if self._in_flight:
+            logger.warning("Grace period ended with %d calls in flight", self._in_flight)
+            return False
+        logger.info("Drained all in-flight calls")
+        return True
+
+    async def _warm_up(self, warm_up: Callable[[], None]) -> None:
+        start = time.perf_counter()
+        try:
+            await run_in_threadpool(warm_up)
+        except Exception as e:
+            logger.error("Startup failed, the service stays unready: %s", e, exc_info=True)
+            return
+        self.started = True
+        logger.info("Service ready after %.1fs", time.perf_counter() - start)
+
+# Singleton instance to share across the application
+_service_lifecycle_instance = None
+
+def get_service_lifecycle() -> ServiceLifecycle:
+    """
+    Get or create singleton instance of ServiceLifecycle.
+
+    Returns:
+        ServiceLifecycle instance
+    """
+    global _service_lifecycle_instance
+    if _service_lifecycle_instance is None:
+        _service_lifecycle_instance = ServiceLifecycle(
+            drain_delay=settings.SHUTDOWN_DRAIN_DELAY,
+            grace_period=settings.SHUTDOWN_GRACE_PERIOD
+        )
+    return _service_lifecycle_instance
+
+async def track_work(lifecycle: ServiceLifecycle = Depends(get_service_lifecycle)) -> AsyncIterator[None]:
+    """Dependency that counts a request as in-flight work, rejecting it with 503 when not accepting."""
+    with lifecycle.work():
+        yield
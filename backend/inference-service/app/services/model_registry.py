@@ -0,0 +1,216 @@
+import os
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+from fastapi import status
+
+from app.core.config import settings
+from app.core.errors import ModelError
+from app.services.pose_detector import PoseDetector
+
+logger = logging.getLogger(__name__)
+
+def parse_model_tiers(spec: str) -> Dict[str, str]:
+    """
+    Parse a tier specification such as "fast=yolo11n-pose.pt,accurate=yolo11s-pose.pt".
+
+    Args:
+        spec: Comma-separated tier=model_path pairs
+
+    Returns:
+        Mapping of tier name to model path
+    """
+    tiers = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if "=" not in entry:
+            raise ValueError(f"Invalid model tier entry: {entry!r} (expected tier=model_path)")
+        tier, model_path = entry.split("=", 1)
+        tiers[tier.strip()] = model_path.strip()
+    return tiers
+
+def estimate_model_bytes(detector: PoseDetector) -> int:
+    """
+    Estimate the memory held by a loaded model.
+
+    Uses the parameter and buffer sizes of the underlying torch module when
+    available, falling back to the size of the weights file.
+
+    Args:
+        detector: Loaded pose detector
+
+    Returns:
+        Estimated size in bytes
+    """
+    module = getattr(detector.model, "model", None)
+    try:
+        tensors = list(module.parameters()) + list(module.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    except Exception:
+        pass
+    try:
+        return os.path.getsize(detector.model_name)
+    except OSError:
+        return 0
+
+class ModelRegistry:
+    """
+    Registry of pose models keyed by latency tier.
+
+    Models are loaded lazily on first use and kept in LRU order. When the
+    estimated memory of loaded models exceeds the budget, the least recently
+    used tiers are unloaded; the default tier is never evicted. Loading a
+    model for a tier that is already serving swaps the reference only once
+    the new model is ready, so in-flight requests finish on the old one.
+    """
+
+    def __init__(self, tiers: Dict[str, str], default_tier: str, memory_budget_bytes: int):
+        self.default_tier = default_tier
+        self.memory_budget_bytes = memory_budget_bytes
+        self._specs: Dict[str, str] = dict(tiers)
+        self._models: "OrderedDict[str, PoseDetector]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._last_used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def is_loaded(self, tier: Optional[str] = None) -> bool:
+        """Check whether the model for a tier is loaded."""
+        return (tier or self.default_tier) in self._models
+
+    def get(self, tier: Optional[str] = None) -> PoseDetector:
+        """
+        Get the pose detector for a tier, loading it if needed.
+
+        Args:
+            tier: Latency tier name (defaults to the default tier)
+
+        Returns:
+            PoseDetector instance
+
+        Raises:
+            ModelError: If the tier is unknown or the model fails to load
+        """
+        tier = tier or self.default_tier
+        with self._lock:
+            detector = self._models.get(tier)
+            if detector is not None:
+                self._models.move_to_end(tier)
+                self._last_used[tier] = time.time()
+                return detector
+            if tier not in self._specs:
+                raise ModelError(f"Unknown model tier: {tier}", status_code=status.HTTP_400_BAD_REQUEST)
+        return self.load(tier)
+
+    def load(self, tier: str, model_path: Optional[str] = None) -> PoseDetector:
+        """
+        Load (or reload) the model for a tier.
+
+        The new model is loaded outside the registry lock and swapped in once
+        ready, so requests keep flowing on the previous model meanwhile.
+
+        Args:
+            tier: Latency tier name
+            model_path: Model to load; defaults to the tier's configured path
+
+        Returns:
+            Newly loaded PoseDetector instance
+
+        Raises:
+            ModelError: If the model fails to load
+        """
+        with self._lock:
+            load_lock = self._load_locks.setdefault(tier, threading.Lock())
+        with load_lock:
+            # Another caller may have loaded the tier while we waited
+            with self._lock:
+                detector = self._models.get(tier)
+                if model_path is None and detector is not None:
+                    return detector
+                model_path = model_path or self._specs.get(tier)
+            if not model_path:
+                raise ModelError(f"Unknown model tier: {tier}", status_code=status.HTTP_400_BAD_REQUEST)
+
+            detector = PoseDetector(model_path=model_path, fallback=tier == self.default_tier)
+            size = estimate_model_bytes(detector)
+
+            with self._lock:
+                self._specs[tier] = model_path
+                self._models[tier] = detector
+                self._models.move_to_end(tier)
+                self._sizes[tier] = size
+                self._last_used[tier] = time.time()
+                self._evict(keep=tier)
+            logger.info(f"Model for tier '{tier}' loaded: {model_path} (~{size / 1e6:.1f} MB)")
+            return detector
+
+    def unload(self, tier: str) -> None:
+        """
+        Unload the model for a tier. The tier stays registered and reloads on next use.
+
+        Raises:
+            ModelError: If the tier is the default tier or is not loaded
+        """
+        if tier == self.default_tier:
+            raise ModelError("The default model tier cannot be unloaded", status_code=status.HTTP_409_CONFLICT)
+        with self._lock:
+            if tier not in self._models:
+                raise ModelError(f"Model tier not loaded: {tier}", status_code=status.HTTP_404_NOT_FOUND)
+            self._drop(tier)
+        logger.info(f"Model for tier '{tier}' unloaded")
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Describe every registered tier."""
+        with self._lock:
+            return [
+                {
+                    "tier": tier,
+                    "model_path": model_path,
+                    "loaded": tier in self._models,
+                    "default": tier == self.default_tier,
+                    "memory_bytes": self._sizes.get(tier, 0),
+                    "last_used": self._last_used.get(tier),
+                }
+                for tier, model_path in self._specs.items()
+            ]
+
+    def _evict(self, keep: str) -> None:
+        """Evict least recently used tiers until loaded models fit the budget. Caller holds the lock."""
+        for tier in list(self._models):
+            if sum(self._sizes.values()) <= self.memory_budget_bytes:
+                return
+            if tier in (keep, self.default_tier):
+                continue
+            logger.info(f"Evicting model tier '{tier}' to stay within memory budget")
+            self._drop(tier)
+
+    def _drop(self, tier: str) -> None:
+        """Remove a loaded tier. Caller holds the lock."""
+        self._models.pop(tier, None)
+        self._sizes.pop(tier, None)
+
+# Singleton instance to share across requests
+_model_registry_instance = None
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Get or create singleton instance of ModelRegistry.
+
+    Returns:
+        ModelRegistry instance
+    """
+    global _model_registry_instance
+    if _model_registry_instance is None:
+        tiers = {settings.DEFAULT_MODEL_TIER: settings.MODEL_PATH}
+        tiers.update(parse_model_tiers(settings.MODEL_TIERS))
+        _model_registry_instance = ModelRegistry(
+            tiers=tiers,
+            default_tier=settings.DEFAULT_MODEL_TIER,
+            memory_budget_bytes=settings.MODEL_MEMORY_BUDGET_MB * 1024 * 1024
+        )
+    return _model_registry_instance
@@ -1,14 +1,21 @@
 import os
 import base64
+import binascii
 import cv2
 import numpy as np
 import logging
-from typing import Dict, Any, List, Optional
+from contextlib import ExitStack
+from typing import Dict, Any, List, Optional, Tuple, Union
 import functools
 
 from ultralytics import YOLO
 from app.core.config import settings
+from app.core.tracing import span
 from app.core.errors import ModelError, ImageProcessingError, NoPersonDetectedError
+from app.services.buffer_pool import get_buffer_pool, letterbox
+from app.services.image_sniff import check_image_header
+from app.services.posture_analyzer import analyze_posture
+from app.services.skeleton_renderer import render_skeleton, scaled_shape
 
 logger = logging.getLogger(__name__)
 
@@ -33,17 +40,42 @@ KEYPOINT_DICT = {
     16: "right_ankle"
 }
 
+# Supported model quantization modes
+QUANTIZATION_NONE = "none"
+QUANTIZATION_INT8 = "int8"
+QUANTIZATION_MODES = (QUANTIZATION_NONE, QUANTIZATION_INT8)
+
+# Supported pose overlay renderers
+RENDERER_SKELETON = "skeleton"
+RENDERER_ULTRALYTICS = "ultralytics"
+
+# Stride the letterboxed model input is padded to a multiple of
+MODEL_STRIDE = 32
+
 class PoseDetector:
     """Service for detecting human pose using YOLOv8."""
     
-    def __init__(self, model_path: str = settings.MODEL_PATH, conf: float = settings.MODEL_CONFIDENCE):
+    def __init__(
+        self,
+        model_path: str = settings.MODEL_PATH,
+        conf: float = settings.MODEL_CONFIDENCE,
+        fallback: bool = True,
+        quantization: str = settings.MODEL_QUANTIZATION
+    ):
         """
         Initialize pose detector with model.
         
         Args:
             model_path: Path to YOLOv8 pose model
             conf: Confidence threshold for detections
+            fallback: Fall back to the standard nano model if loading fails
+            quantization: "none" for the FP32 model, or "int8" to run an
+                INT8 OpenVINO export calibrated on a small dataset
         """
+        if quantization not in QUANTIZATION_MODES:
+            raise ModelError(f"Unsupported quantization mode: {quantization}")
+        self.quantization = quantization
+        
         try:
             # Check if the model file exists
             if not os.path.exists(model_path):
@@ -66,6 +98,8 @@ class PoseDetector:
             logger.info(f"Model loaded successfully: {model_path}")
         except Exception as e:
             logger.error(f"Failed to load model: {str(e)}", exc_info=True)
+            if not fallback:
+                raise ModelError(f"Failed to load model: {str(e)}")
             # Try fallback to standard model name
             try:
                 fallback_model = "yolov8n-pose.pt"
@@ -77,6 +111,45 @@ class PoseDetector:
             except Exception as fallback_error:
                 logger.error(f"Failed to load fallback model: {str(fallback_error)}", exc_info=True)
                 raise ModelError(f"Failed to load model: {str(e)} and fallback also failed: {str(fallback_error)}")
+        
+        if quantization == QUANTIZATION_INT8:
+            self.model = self._load_int8_model(self.model)
+            self.image_size = settings.QUANTIZATION_IMAGE_SIZE
+        else:
+            self.image_size = settings.MODEL_IMAGE_SIZE
+    
+    def _load_int8_model(self, fp32_model: YOLO) -> YOLO:
+        """
+        Export the FP32 model to INT8 OpenVINO and load the export.
+        
+        Static INT8 quantization is calibrated on QUANTIZATION_CALIBRATION_DATA.
+        The export is cached next to the weights and reused on later loads.
+        
+        Args:
+            fp32_model: Loaded FP32 model
+            
+        Returns:
+            INT8 model
+            
+        Raises:
+            ModelError: If export or loading fails
+        """
+        weights = getattr(fp32_model, "ckpt_path", None) or self.model_name
+        export_dir = f"{os.path.splitext(weights)[0]}_int8_openvino_model"
+        try:
+            if not os.path.isdir(export_dir):
+                logger.info(f"Exporting INT8 model for {weights} (calibration data: {settings.QUANTIZATION_CALIBRATION_DATA})")
+                export_dir = fp32_model.export(
+                    format="openvino",
+                    int8=True,
+                    data=settings.QUANTIZATION_CALIBRATION_DATA,
+                    imgsz=settings.QUANTIZATION_IMAGE_SIZE
+                )
+            logger.info(f"Loading INT8 model: {export_dir}")
+            return YOLO(export_dir, task="pose")
+        except Exception as e:
+            logger.error(f"Failed to load INT8 model: {str(e)}", exc_info=True)
+            raise ModelError(f"Failed to load INT8 model for {weights}: {str(e)}")
     
     def decode_base64_image(self, base64_string: str) -> np.ndarray:
         """
@@ -93,11 +166,34 @@ class PoseDetector:
         """
         try:
             # Remove data URL prefix if present
-            if "base64," in base64_string:
-                base64_string = base64_string.split("base64,")[1]
+            prefix_end = base64_string.find("base64,")
+            if prefix_end != -1:
+                base64_string = base64_string[prefix_end + len("base64,"):]
             
-            # Decode base64 to bytes
-            image_bytes = base64.b64decode(base64_string)
+            # Decode base64 to bytes (binascii reads the ASCII string in place,
+            # where b64decode would first copy it to bytes)
+            image_bytes = binascii.a2b_base64(base64_string)
+        except Exception as e:
+            logger.error("Error decoding image: %s", e, exc_info=True)
+            raise ImageProcessingError(f"Error decoding image: {str(e)}")
+        return self.decode_image(image_bytes)
+    
+    def decode_image(self, image_bytes: bytes) -> np.ndarray:
+        """
+        Decode encoded image bytes (e.g. JPEG or PNG) to OpenCV format.
+        
+        Args:
+            image_bytes: Encoded image
+            
+        Returns:
+            Image as numpy array
+            
+        Raises:
+            ImageProcessingError: If image decoding fails
+        """
+        try:
+            # Reject unsupported or oversized images before allocating pixels
+            check_image_header(image_bytes)
             
             # Convert to numpy array
             np_array = np.frombuffer(image_bytes, np.uint8)
@@ -109,10 +205,33 @@ class PoseDetector:
                 raise ImageProcessingError("Failed to decode image")
                 
             return image
+        except ImageProcessingError:
+            raise
         except Exception as e:
-            logger.error(f"Error decoding image: {str(e)}", exc_info=True)
+            logger.error("Error decoding image: %s", e, exc_info=True)
             raise ImageProcessingError(f"Error decoding image: {str(e)}")
     
+    def encode_image(self, image: np.ndarray) -> bytes:
+        """
+        Encode OpenCV image to PNG bytes.
+        
+        Args:
+            image: Image as numpy array
+            
+        Returns:
+            PNG encoded image
+            
+        Raises:
+            ImageProcessingError: If image encoding fails
+        """
+        try:
+            return self._encode_png(image).tobytes()
+        except ImageProcessingError:
+            raise
+        except Exception as e:
+            logger.error("Error encoding image: %s", e, exc_info=True)
+            raise ImageProcessingError(f"Error encoding image: {str(e)}")
+    
     def encode_image_to_base64(self, image: np.ndarray) -> str:
         """
         Encode OpenCV image to base64 string.
@@ -127,24 +246,106 @@ class PoseDetector:
             ImageProcessingError: If image encoding fails
         """
         try:
-            success, encoded_image = cv2.imencode('.png', image)
-            if not success:
-                raise ImageProcessingError("Failed to encode image")
-                
-            return base64.b64encode(encoded_image).decode('utf-8')
+            # Encode straight from the PNG buffer, skipping an intermediate bytes copy
+            return base64.b64encode(self._encode_png(image)).decode('utf-8')
+        except ImageProcessingError:
+            raise
         except Exception as e:
-            logger.error(f"Error encoding image: {str(e)}", exc_info=True)
+            logger.error("Error encoding image: %s", e, exc_info=True)
             raise ImageProcessingError(f"Error encoding image: {str(e)}")
     
-    def detect_pose(self, image_data: str) -> Dict[str, Any]:
+    def _encode_png(self, image: np.ndarray) -> np.ndarray:
+        """Encode an image to a PNG buffer, raising ImageProcessingError on failure."""
+        success, encoded_image = cv2.imencode('.png', image)
+        if not success:
+            raise ImageProcessingError("Failed to encode image")
+        return encoded_image
+    
+    def infer(self, img: np.ndarray, keep_result: bool = True) -> Tuple[np.ndarray, Any]:
+        """
+        Run the pose model on a decoded image.
+        
+        Args:
+            img: Image as numpy array
+            keep_result: Return the raw model result (e.g. for plotting).
+                When False, images that need resizing are letterboxed into
+                a pooled buffer instead of a fresh one, and None is returned
+                in place of the result, which would refer to that buffer
+            
+        Returns:
+            Tuple of a (17, 3) array of x, y and confidence for the first
+            person, and the raw model result
+            
+        Raises:
+            NoPersonDetectedError: If no person is detected
+        """
+        if keep_result or max(img.shape[:2]) == self.image_size:
+            result, keypoints, confidences = self._first_person(self._predict(img))
+            return np.column_stack((keypoints, confidences)).astype(np.float32), result
+        
+        with letterbox(img, self.image_size, get_buffer_pool(), MODEL_STRIDE) as (frame, ratio, offset):
+            keypoints = self.infer_frame(frame)
+        return map_from_letterbox(keypoints, ratio, offset, img.shape), None
+    
+    def infer_frame(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Run the pose model on a frame already letterboxed to the model input size.
+        
+        Args:
+            frame: Letterboxed image as numpy array
+            
+        Returns:
+            (17, 3) array of x, y and confidence for the first person, in
+            frame coordinates
+            
+        Raises:
+            NoPersonDetectedError: If no person is detected
+        """
+        _, keypoints, confidences = self._first_person(self._predict(frame))
+        return np.column_stack((keypoints, confidences)).astype(np.float32)
+    
+    def _predict(self, img: np.ndarray) -> List[Any]:
+        """Run the model on an image."""
+        return self.model(img, verbose=False, conf=self.conf, imgsz=self.image_size)
+    
+    def _first_person(self, results: List[Any]) -> Tuple[Any, np.ndarray, np.ndarray]:
+        """
+        Get the result, keypoint coordinates and confidences of the first person.
+        
+        Raises:
+            NoPersonDetectedError: If no person is detected
+        """
+        # Check if pose was detected
+        if len(results) == 0 or len(results[0].keypoints.xy) == 0:
+            raise NoPersonDetectedError()
+        
+        result = results[0]
+        return result, result.keypoints.xy[0].cpu().numpy(), result.keypoints.conf[0].cpu().numpy()
+    
+    def detect_pose(
+        self,
+        image_data: Union[str, bytes],
+        encode_base64: bool = True,
+        session_id: Optional[str] = None,
+        include_image: bool = True
+    ) -> Dict[str, Any]:
         """
         Detect pose in image and extract keypoints.
         
         Args:
-            image_data: Base64 encoded image
+            image_data: Base64 encoded image, or raw image bytes
+            encode_base64: Return the annotated image as a base64 string
+                rather than raw PNG bytes
+            session_id: Live session identifier; when set (and tracking is
+                enabled), keypoints between keyframes are propagated with
+                optical flow instead of running the model
+            include_image: Render and encode the annotated image; when False
+                `img_with_pose` is None
             
         Returns:
-            Dictionary with keypoints and annotated image
+            Dictionary with keypoints, annotated image, whether the keypoints
+            were tracked rather than detected and, unless ultralytics plotted
+            the overlay, the posture analysis
             
         Raises:
             NoPersonDetectedError: If no person is detected
@@ -153,60 +354,121 @@ class PoseDetector:
         """
         try:
             # Decode image
-            img = self.decode_base64_image(image_data)
-            
-            # Run inference
-            results = self.model(img, verbose=False, conf=self.conf)
+            with span("decode"):
+                if isinstance(image_data, str):
+                    img = self.decode_base64_image(image_data)
+                else:
+                    img = self.decode_image(image_data)
             
-            # Check if pose was detected
-            if len(results) == 0 or len(results[0].keypoints.xy) == 0:
-                raise NoPersonDetectedError()
+            # Run inference, or track from the last keyframe for live sessions.
+            # The model result is only needed when ultralytics plots the overlay.
+            keep_result = include_image and settings.POSE_RENDERER == RENDERER_ULTRALYTICS
+            with span("infer"):
+                if session_id and settings.TRACKING_ENABLED:
+                    from app.services.keypoint_tracker import get_keypoint_tracker
+                    keypoints, result, keyframe = get_keypoint_tracker().process(session_id, img, self, keep_result)
+                else:
+                    keypoints, result = self.infer(img, keep_result)
+                    keyframe = True
             
-            # Get first result
-            result = results[0]
+            # Convert keypoints to dictionary
+            keypoints_dict = keypoints_to_dict(keypoints)
             
-            # Get keypoints for first person
-            keypoints = result.keypoints.xy[0].cpu().numpy()
-            confidences = result.keypoints.conf[0].cpu().numpy()
+            # Analyze the keypoint array directly, unless ultralytics plots the
+            # overlay (tracked frames have no model result to plot)
+            analysis = None
+            plot = keep_result and result is not None
+            if not plot:
+                with span("analyze"):
+                    analysis = analyze_posture(keypoints)
             
-            # Convert keypoints to dictionary
-            keypoints_dict = {}
-            for i, (x, y) in enumerate(keypoints):
-                conf = float(confidences[i])
-                if conf > 0.5:  # Only include keypoints with confidence > 0.5
-                    keypoints_dict[KEYPOINT_DICT[i]] = {
-                        "x": float(x),
-                        "y": float(y),
-                        "confidence": conf
-                    }
-            
-            # Draw pose on image
-            annotated_img = result.plot()
-            
-            # Convert back to base64
-            img_base64 = self.encode_image_to_base64(annotated_img)
+            img_with_pose = None
+            if include_image:
+                # Buffers borrowed for rendering are returned once the overlay is encoded
+                with ExitStack() as buffers:
+                    with span("render"):
+                        if plot:
+                            annotated_img = result.plot()
+                        else:
+                            # Color the skeleton by the posture sub-scores, drawing in place
+                            canvas = None
+                            if settings.RENDER_SCALE < 1.0:
+                                canvas = buffers.enter_context(
+                                    get_buffer_pool().acquire(scaled_shape(img.shape, settings.RENDER_SCALE))
+                                )
+                            annotated_img = render_skeleton(img, keypoints_dict, analysis, settings.RENDER_SCALE, canvas)
+                    
+                    # Convert back to base64, or leave as PNG bytes for binary formats
+                    with span("encode"):
+                        if encode_base64:
+                            img_with_pose = self.encode_image_to_base64(annotated_img)
+                        else:
+                            img_with_pose = self.encode_image(annotated_img)
             
             return {
                 "keypoints": keypoints_dict,
-                "img_with_pose": img_base64
+                "img_with_pose": img_with_pose,
+                "analysis": analysis,
+                "tracked": not keyframe
             }
-        except NoPersonDetectedError:
+        except (NoPersonDetectedError, ImageProcessingError, ModelError):
             raise
         except Exception as e:
-            logger.error(f"Error in pose detection: {str(e)}", exc_info=True)
+            logger.error("Error in pose detection: %s", e, exc_info=True)
             raise ModelError(f"Error in pose detection: {str(e)}")
 
-# Singleton instance to share across requests
-_pose_detector_instance = None
+def map_from_letterbox(
+    keypoints: np.ndarray,
+    ratio: float,
+    offset: Tuple[int, int],
+    shape: Tuple[int, ...]
+) -> np.ndarray:
+    """
+    Map keypoints from a letterboxed frame back to the source image, in place.
+    
+    Coordinates are clipped to the image like ultralytics does.
+    
+    Args:
+        keypoints: (17, 3) array of x, y and confidence in frame coordinates
+        ratio: Letterbox scale ratio
+        offset: (x, y) offset of the image inside the frame
+        shape: Source image shape
+        
+    Returns:
+        The keypoint array
+    """
+    points = (keypoints[:, :2] - np.asarray(offset)) / ratio
+    np.clip(points, 0, (shape[1], shape[0]), out=points)
+    keypoints[:, :2] = points
+    return keypoints
+
+def keypoints_to_dict(keypoints: np.ndarray, min_confidence: float = 0.5) -> Dict[str, Dict[str, float]]:
+    """
+    Convert a (17, 3) keypoint array to a dictionary keyed by keypoint name.
+    
+    Args:
+        keypoints: Array of x, y and confidence rows in KEYPOINT_DICT order
+        min_confidence: Only include keypoints with confidence above this
+        
+    Returns:
+        Dictionary of keypoints with coordinates and confidence
+    """
+    keypoints_dict = {}
+    for i, (x, y, conf) in enumerate(keypoints.tolist()):
+        if conf > min_confidence:
+            keypoints_dict[KEYPOINT_DICT[i]] = {
+                "x": x,
+                "y": y,
+                "confidence": conf
+            }
+    return keypoints_dict
 
 def get_pose_detector() -> PoseDetector:
     """
-    Get or create singleton instance of PoseDetector.
+    Get the PoseDetector for the default model tier.
     
     Returns:
         PoseDetector instance
     """
-    global _pose_detector_instance
-    if _pose_detector_instance is None:
-        _pose_detector_instance = PoseDetector()
-    return _pose_detector_instance
\ No newline at end of file
+    from app.services.model_registry import get_model_registry
+    return get_model_registry().get()
\ No newline at end of file
@@ -0,0 +1,541 @@
+import copy
+import itertools
+import json
+import logging
+import math
+import os
+import threading
+from bisect import bisect_right
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.logging import AggregatedLogger
+
+logger = logging.getLogger(__name__)
+
+# Missing keypoints are expected on most frames when the user is partly out of view
+missing_keypoints = AggregatedLogger(logger, settings.LOG_AGGREGATE_INTERVAL)
+
+NUM_KEYPOINTS = 17
+
+# Metrics are built for one set of points, each given as the index of its x
+# value in the frame values (y follows it), and return a function of the frame
+# values that gives None when the metric is undefined (e.g. a zero
+# denominator). Signs follow the image axes: x grows to the right, y downward.
+Measure = Callable[[List[float]], Optional[float]]
+
+def _vertical_ratio(a: int, b: int) -> Measure:
+    """Height difference of a and b relative to their mean height."""
+    ya, yb = a + 1, b + 1
+    def measure(values: List[float]) -> Optional[float]:
+        mean = (values[ya] + values[yb]) / 2
+        return (values[ya] - values[yb]) / mean if mean > 0 else None
+    return measure
+
+def _offset_ratio(a: int, b: int) -> Measure:
+    """Signed horizontal offset of a from b relative to how far a sits above b."""
+    ya, yb = a + 1, b + 1
+    def measure(values: List[float]) -> Optional[float]:
+        height = values[yb] - values[ya]
+        return (values[a] - values[b]) / height if height > 0 else None
+    return measure
+
+def _height_ratio(a: int, b: int, c: int, d: int) -> Measure:
+    """How far a sits above b, relative to the distance between c and d."""
+    ya, yb, yc, yd = a + 1, b + 1, c + 1, d + 1
+    def measure(values: List[float]) -> Optional[float]:
+        width = math.hypot(values[c] - values[d], values[yc] - values[yd])
+        return (values[yb] - values[ya]) / width if width > 0 else None
+    return measure
+
+def _vertical_angle(a: int, b: int) -> Measure:
+    """Signed angle in degrees of the b->a vector from straight up."""
+    ya, yb = a + 1, b + 1
+    def measure(values: List[float]) -> Optional[float]:
+        return math.degrees(math.atan2(values[a] - values[b], values[yb] - values[ya]))
+    return measure
+
+def _horizontal_angle(a: int, b: int) -> Measure:
+    """Signed angle in degrees of the a-b line from horizontal, folded into [-90, 90)."""
+    ya, yb = a + 1, b + 1
+    def measure(values: List[float]) -> Optional[float]:
+        dx = values[b] - values[a]
+        dy = values[yb] - values[ya]
+        if not (dx or dy):
+            return None
+        return (math.degrees(math.atan2(dy, dx)) + 90.0) % 180.0 - 90.0
+    return measure
+
+def _joint_angle(a: int, b: int, c: int) -> Measure:
+    """Angle in degrees at joint b between the segments to a and c."""
+    ya, yb, yc = a + 1, b + 1, c + 1
+    def measure(values: List[float]) -> Optional[float]:
+        x, y = values[b], values[yb]
+        ux, uy, vx, vy = values[a] - x, values[ya] - y, values[c] - x, values[yc] - y
+        if not ((ux or uy) and (vx or vy)):
+            return None
+        return math.degrees(math.atan2(abs(ux * vy - uy * vx), ux * vx + uy * vy))
+    return measure
+
+def _all_visible(indices: Sequence[int], min_confidence: float) -> Callable[[List[float]], bool]:
+    """Build a check that the confidences at `indices` are all above `min_confidence`."""
+    # Spelled out for the common sizes, which is several times faster than all() or min()
+    if len(indices) == 2:
+        a, b = indices
+        return lambda values: values[a] > min_confidence and values[b] > min_confidence
+    if len(indices) == 3:
+        a, b, c = indices
+        return lambda values: values[a] > min_confidence and values[b] > min_confidence and values[c] > min_confidence
+    if len(indices) == 4:
+        a, b, c, d = indices
+        return lambda values: (values[a] > min_confidence and values[b] > min_confidence
+                               and values[c] > min_confidence and values[d] > min_confidence)
+    return lambda values: all(values[index] > min_confidence for index in indices)
+
+class Metric:
+    """A metric kind: its point count, builder and whether only its magnitude counts."""
+
+    def __init__(self, points: int, build: Callable[..., Measure], absolute: bool = False):
+        self.points = points
+        self.build = build
+        self.absolute = absolute
+
+METRICS = {
+    "vertical_ratio": Metric(2, _vertical_ratio, absolute=True),
+    "offset_ratio": Metric(2, _offset_ratio),
+    "height_ratio": Metric(4, _height_ratio),
+    "vertical_angle": Metric(2, _vertical_angle),
+    "horizontal_angle": Metric(2, _horizontal_angle),
+    "joint_angle": Metric(3, _joint_angle, absolute=True),
+}
+
+def default_rule_config() -> Dict[str, Any]:
+    """
+    Build the built-in rule configuration.
+
+    The original three checks take their thresholds from settings and carry
+    all of the overall score weight. The extra checks have zero weight and
+    only add feedback when they find a problem.
+
+    Returns:
+        Rule configuration dictionary
+    """
+    shoulder = settings.SHOULDER_BALANCE_THRESHOLD
+    neck = settings.NECK_TILT_THRESHOLD
+    back = settings.BACK_ANGLE_THRESHOLD
+    return {
+        "min_confidence": 0.5,
+        "good_posture_threshold": 0.7,
+        "overall": [
+            {"above": 0.8, "feedback": "Overall posture is excellent"},
+            {"above": 0.6, "feedback": "Overall posture is good, with minor adjustments needed"},
+            {"feedback": "Significant posture corrections needed"},
+        ],
+        "rules": [
+            {
+                "name": "shoulder_balance",
+                "weight": 0.3,
+                "metric": "vertical_ratio",
+                "points": ["left_shoulder", "right_shoulder"],
+                "missing": {
+                    "score": 0.5,
+                    "feedback": "Unable to assess shoulder balance",
+                    "log": "Missing shoulder keypoints for balance analysis",
+                },
+                "invalid": {"score": 0.5, "feedback": "Unable to analyze shoulder balance properly"},
+                "bands": [
+                    {"below": shoulder, "score": 1.0, "feedback": "Shoulders are well-balanced"},
+                    {"below": shoulder * 2, "score": 0.7, "feedback": "Shoulders are slightly uneven"},
+                    {"score": 0.3, "feedback": "Shoulders are significantly uneven - try to level them"},
+                ],
+            },
+            {
+                "name": "neck_position",
+                "weight": 0.4,
+                "metric": "offset_ratio",
+                "points": [["left_ear", "right_ear"], ["left_shoulder", "right_shoulder"]],
+                "absolute": True,
+                "missing": {
+                    "score": 0.5,
+                    "feedback": "Unable to assess neck position",
+                    "log": "Missing ear or shoulder keypoints for neck analysis",
+                },
+                # The ear is level with or below the shoulder
+                "invalid": {"score": 0.3, "feedback": "Head position is too low - raise your head"},
+                "bands": [
+                    {"below": neck, "score": 1.0, "feedback": "Neck position is good"},
+                    {"below": neck * 2, "score": 0.7, "feedback": {
+                        "positive": "Neck is slightly forward - try to align ears with shoulders",
+                        "negative": "Neck is slightly backward - try to align ears with shoulders",
+                    }},
+                    {"score": 0.3, "feedback": {
+                        "positive": "Neck is significantly forward - align your head over your shoulders",
+                        "negative": "Neck is significantly backward - align your head over your shoulders",
+                    }},
+                ],
+            },
+            {
+                "name": "back_position",
+                "weight": 0.3,
+                "metric": "vertical_angle",
+                "points": [["left_shoulder", "right_shoulder"], ["left_hip", "right_hip"]],
+                "absolute": True,
+                "missing": {
+                    "score": 0.5,
+                    "feedback": "Unable to assess back position",
+                    "log": "Missing shoulder or hip keypoints for back analysis",
+                },
+                "bands": [
+                    {"below": back, "score": 1.0, "feedback": "Back is upright - good posture"},
+                    {"below": back * 1.5, "score": 0.7, "feedback": {
+                        "positive": "Back is leaning slightly backward - try to sit more upright",
+                        "negative": "Back is leaning slightly forward - try to sit more upright",
+                    }},
+                    {"score": 0.3, "feedback": {
+                        "positive": "Back is leaning too far back - adjust your chair",
+                        "negative": "Back is significantly hunched forward - sit up straighter",
+                    }},
+                ],
+            },
+            {
+                "name": "head_tilt",
+                "weight": 0.0,
+                "metric": "horizontal_angle",
+                "points": ["left_ear", "right_ear"],
+                "absolute": True,
+                "bands": [
+                    {"below": 10.0, "score": 1.0},
+                    {"below": 20.0, "score": 0.7, "feedback": "Head is slightly tilted - keep your ears level"},
+                    {"score": 0.3, "feedback": "Head is tilted to one side - level your head"},
+                ],
+            },
+            {
+                "name": "elbow_angle",
+                "weight": 0.0,
+                "metric": "joint_angle",
+                # Measure on whichever arm is fully visible, never mixing sides
+                "alternatives": [
+                    ["left_shoulder", "left_elbow", "left_wrist"],
+                    ["right_shoulder", "right_elbow", "right_wrist"],
+                ],
+                # Deviation from a relaxed 100 degree typing angle
+                "target": 100.0,
+                "absolute": True,
+                "bands": [
+                    {"below": 25.0, "score": 1.0},
+                    {"below": 45.0, "score": 0.7, "feedback": "Elbows are slightly too open or closed - aim for about 90-110 degrees"},
+                    {"score": 0.3, "feedback": "Adjust your desk or chair height so your elbows rest at about 90-110 degrees"},
+                ],
+            },
+            {
+                "name": "slouch",
+                "weight": 0.0,
+                "metric": "height_ratio",
+                # Nose height above the shoulder line, relative to shoulder width
+                "points": ["nose", {"mid": ["left_shoulder", "right_shoulder"]}, "left_shoulder", "right_shoulder"],
+                "bands": [
+                    {"below": 0.35, "score": 0.3, "feedback": "You are slouching - lift your chest and head"},
+                    {"below": 0.5, "score": 0.7, "feedback": "You are slouching slightly - sit up tall"},
+                    {"score": 1.0},
+                ],
+            },
+        ],
+    }
+
+class RuleConfigError(ValueError):
+    """Raised when a rule configuration is invalid."""
+
+# A compiled rule maps a frame's keypoint values to its score and feedback message
+RuleFunction = Callable[[List[float]], Tuple[float, Optional[str]]]
+
+class CompiledRules:
+    """
+    A rule configuration compiled into one Python closure per rule.
+
+    Frames are evaluated on a flat list of x, y and confidence values, one
+    triple per keypoint, followed by one triple per midpoint used in the
+    configuration. Each closure checks its alternatives' confidences and
+    computes its metric from the values at indices fixed at compile time,
+    so a frame costs a few scalar operations per rule.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        from app.services.pose_detector import KEYPOINT_DICT
+
+        self.config = config
+        self.keypoint_index = {name: index for index, name in KEYPOINT_DICT.items()}
+        self.min_confidence = float(config.get("min_confidence", 0.5))
+        self.good_threshold = float(config.get("good_posture_threshold", 0.7))
+        self._compile_overall(config.get("overall", []))
+
+        rules = config.get("rules")
+        if not rules:
+            raise RuleConfigError("Rule configuration has no rules")
+        self.names = [self._rule_name(rule, i) for i, rule in enumerate(rules)]
+        if len(set(self.names)) != len(self.names):
+            raise RuleConfigError("Rule names must be unique")
+
+        weights = [float(rule.get("weight", 0.0)) for rule in rules]
+        if min(weights) < 0 or sum(weights) <= 0:
+            raise RuleConfigError("Rule weights must be non-negative with a positive total")
+        total = sum(weights)
+
+        # Offsets of the two keypoints averaged into each midpoint, in the order they are appended
+        self.midpoints: List[Tuple[int, int]] = []
+        self.rules: List[Tuple[str, float, RuleFunction]] = [
+            (name, weight / total, self._compile_rule(rule, name))
+            for rule, name, weight in zip(rules, self.names, weights)
+        ]
+
+    def _rule_name(self, rule: Dict[str, Any], index: int) -> str:
+        name = rule.get("name")
+        if not name or not isinstance(name, str):
+            raise RuleConfigError(f"Rule {index} has no name")
+        return name
+
+    def _point(self, spec: Any, name: str) -> int:
+        """
+        Resolve a keypoint name or {"mid": [a, b]} to its index in the frame values.
+
+        Returns:
+            Index of the point's x value; y and confidence follow it
+        """
+        if isinstance(spec, str):
+            if spec not in self.keypoint_index:
+                raise RuleConfigError(f"Rule '{name}' references unknown keypoint '{spec}'")
+            return self.keypoint_index[spec] * 3
+        if isinstance(spec, dict) and len(spec.get("mid", ())) == 2:
+            pair = tuple(self._point(part, name) for part in spec["mid"])
+            if pair not in self.midpoints:
+                self.midpoints.append(pair)
+            return (NUM_KEYPOINTS + self.midpoints.index(pair)) * 3
+        raise RuleConfigError(f"Rule '{name}' has an invalid point {spec!r}")
+
+    def _alternatives(self, rule: Dict[str, Any], name: str, point_count: int) -> List[Tuple[int, ...]]:
+        """
+        Expand a rule's points into alternatives in order of preference.
+
+        A point given as a list is a fallback chain; the product of the
+        chains, in order, picks the first visible candidate for each point.
+        """
+        point_sets = rule.get("alternatives") or [rule.get("points")]
+        alternatives = []
+        for points in point_sets:
+            if not isinstance(points, list) or len(points) != point_count:
+                raise RuleConfigError(f"Rule '{name}' needs {point_count} points for metric '{rule['metric']}'")
+            chains = [
+                [self._point(candidate, name) for candidate in (point if isinstance(point, list) else [point])]
+                for point in points
+            ]
+            alternatives.extend(itertools.product(*chains))
+        return alternatives
+
+    def _compile_overall(self, overall: Sequence[Dict[str, Any]]) -> None:
+        """Compile overall feedback into descending thresholds."""
+        if not overall:
+            self.overall_limits: List[float] = []
+            self.overall_feedback: List[Optional[str]] = [None]
+            return
+        limits = [float(band["above"]) for band in overall[:-1]]
+        if limits != sorted(limits, reverse=True):
+            raise RuleConfigError("Overall feedback thresholds must be descending")
+        # Negated so the band is found with a bisection over an ascending list
+        self.overall_limits = [-limit for limit in limits]
+        self.overall_feedback = [band.get("feedback") for band in overall]
+
+    def _compile_rule(self, rule: Dict[str, Any], name: str) -> RuleFunction:
+        """
+        Compile one rule into a function of the frame values.
+
+        The first alternative whose points are all visible is measured. No
+        visible alternative gives the rule's missing outcome, and an
+        undefined metric its invalid outcome. Otherwise the metric, less the
+        rule's target, picks the first band whose limit it is below; band
+        feedback may differ by the sign of the metric.
+        """
+        metric = METRICS.get(rule.get("metric"))
+        if metric is None:
+            raise RuleConfigError(f"Rule '{name}' has unknown metric '{rule.get('metric')}'")
+        alternatives = [
+            (_all_visible(sorted({point + 2 for point in points}), self.min_confidence), metric.build(*points))
+            for points in self._alternatives(rule, name, metric.points)
+        ]
+
+        bands = rule.get("bands") or []
+        if not bands:
+            raise RuleConfigError(f"Rule '{name}' has no bands")
+        limits = [float(band["below"]) for band in bands[:-1]]
+        if limits != sorted(limits):
+            raise RuleConfigError(f"Rule '{name}' band limits must be ascending")
+        outcomes = [self._outcome(band) for band in bands]
+        missing = rule.get("missing", {"score": 0.5})
+        missing_score, missing_feedback, _ = self._outcome(missing)
+        invalid_score, invalid_feedback, _ = self._outcome(rule.get("invalid", missing))
+        missing_log = missing.get("log")
+
+        target = float(rule.get("target", 0.0))
+        absolute = bool(rule.get("absolute", False)) or metric.absolute
+
+        def evaluate(values: List[float]) -> Tuple[float, Optional[str]]:
+            for visible, measure in alternatives:
+                if visible(values):
+                    break
+            else:
+                if missing_log:
+                    missing_keypoints.log(name, missing_log)
+                return missing_score, missing_feedback
+            value = measure(values)
+            if value is None:
+                return invalid_score, invalid_feedback
+            value -= target
+            score, positive, negative = outcomes[bisect_right(limits, abs(value) if absolute else value)]
+            return score, positive if value > 0 else negative
+
+        return evaluate
+
+    @staticmethod
+    def _outcome(outcome: Dict[str, Any]) -> Tuple[float, Optional[str], Optional[str]]:
+        """Return an outcome's score and its feedback for a positive and a negative metric."""
+        feedback = outcome.get("feedback")
+        if isinstance(feedback, dict):
+            return float(outcome.get("score", 0.0)), feedback.get("positive"), feedback.get("negative")
+        return float(outcome.get("score", 0.0)), feedback, feedback
+
+    def evaluate(self, values: List[float]) -> Dict[str, Any]:
+        """
+        Evaluate all rules on one frame.
+
+        Args:
+            values: x, y and confidence of each of the 17 keypoints, flattened
+
+        Returns:
+            Dictionary with each rule's score (also collected under
+            "scores"), the overall score, the verdict and feedback
+        """
+        if self.midpoints:
+            # A midpoint is as visible as the less visible of its two points
+            values = list(values)
+            for first, second in self.midpoints:
+                values += (
+                    (values[first] + values[second]) / 2,
+                    (values[first + 1] + values[second + 1]) / 2,
+                    min(values[first + 2], values[second + 2])
+                )
+
+        scores = {}
+        feedback = []
+        overall_score = 0.0
+        for name, weight, rule in self.rules:
+            score, message = rule(values)
+            scores[name] = score
+            overall_score += score * weight
+            if message:
+                feedback.append(message)
+
+        overall_message = self.overall_feedback[bisect_right(self.overall_limits, -overall_score)]
+        if overall_message:
+            feedback.append(overall_message)
+        return {
+            **scores,
+            "scores": scores,
+            "overall_score": overall_score,
+            "is_good_posture": overall_score >= self.good_threshold,
+            "feedback": feedback,
+        }
+
+class RuleEngine:
+    """
+    Holds the compiled posture rules and reloads them when their file changes.
+
+    Rules come from the JSON file at `path` when set, otherwise from the
+    built-in configuration. Once started, a background thread checks the
+    file's mtime every `check_interval` seconds, off the analysis path; a
+    configuration that fails to compile is logged and the previous rules
+    stay active.
+    """
+
+    def __init__(self, path: str = "", check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._stopped = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.rules = self._compile()
+
+    def _load_config(self) -> Dict[str, Any]:
+        """Read the rule configuration."""
+        if not self.path:
+            return default_rule_config()
+        self._mtime = os.path.getmtime(self.path)
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def _compile(self) -> CompiledRules:
+        config = self._load_config()
+        rules = CompiledRules(config)
+        logger.info("Compiled %d posture rules from %s", len(rules.names), self.path or "built-in defaults")
+        return rules
+
+    def reload(self) -> CompiledRules:
+        """
+        Recompile the rules now.
+
+        Raises:
+            RuleConfigError: If the configuration is invalid
+            OSError: If the rule file cannot be read
+        """
+        with self._lock:
+            try:
+                self.rules = self._compile()
+            except (KeyError, TypeError, ValueError) as e:
+                raise RuleConfigError(f"Invalid posture rule configuration: {e}")
+            return self.rules
+
+    def maybe_reload(self) -> None:
+        """Reload the rules if the rule file changed since it was last read."""
+        if not self.path:
+            return
+        try:
+            if os.path.getmtime(self.path) != self._mtime:
+                self.reload()
+        except (OSError, RuleConfigError) as e:
+            logger.error("Keeping current posture rules; reload failed: %s", e)
+
+    def start(self) -> None:
+        """Start watching the rule file for changes, if rules come from a file."""
+        if not self.path or self._watcher is not None:
+            return
+        self._stopped.clear()
+        self._watcher = threading.Thread(target=self._watch, name="posture-rules-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        """Stop watching the rule file."""
+        self._stopped.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.check_interval):
+            self.maybe_reload()
+
+    def describe(self) -> Dict[str, Any]:
+        """Return the active configuration."""
+        return copy.deepcopy(self.rules.config)
+
+# Singleton instance to share across requests
+_rule_engine_instance = None
+
+def get_rule_engine() -> RuleEngine:
+    """
+    Get or create singleton instance of RuleEngine.
+
+    Returns:
+        RuleEngine instance
+    """
+    global _rule_engine_instance
+    if _rule_engine_instance is None:
+        _rule_engine_instance = RuleEngine(settings.POSTURE_RULES_PATH, settings.POSTURE_RULES_CHECK_INTERVAL)
+    return _rule_engine_instance
@@ -0,0 +1,297 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fastapi import status
+
+from app.core.config import settings
+from app.core.errors import SubscriptionError
+from app.core.logging import AggregatedLogger
+from app.services.posture_rules import get_rule_engine
+
+logger = logging.getLogger(__name__)
+
+# Session posture states
+STATE_UNKNOWN = "unknown"
+STATE_GOOD = "good"
+STATE_BAD = "bad"
+STATE_AWAY = "away"
+
+# Event types pushed to subscribers
+EVENT_STATE = "state"
+EVENT_SUMMARY = "summary"
+
+# Events queued per subscriber before further events are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# A subscriber that stops reading has every later event dropped
+dropped_events = AggregatedLogger(logger, settings.LOG_AGGREGATE_INTERVAL)
+
+class Subscriber:
+    """Event queue of one listener, fed from request threads. None marks the end of the stream."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: "asyncio.Queue[Optional[Tuple[str, Dict[str, Any]]]]" = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.closed = False
+
+    def offer(self, event: Tuple[str, Dict[str, Any]]) -> None:
+        """Queue an event from any thread."""
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def close(self) -> None:
+        """End the stream from any thread."""
+        self.loop.call_soon_threadsafe(self._close)
+
+    def _close(self) -> None:
+        self.closed = True
+        if not self.queue.full():
+            self.queue.put_nowait(None)
+
+    def _put(self, event: Tuple[str, Dict[str, Any]]) -> None:
+        if self.queue.full():
+            dropped_events.log(event[0], f"Dropping posture {event[0]} event for a subscriber that is not reading")
+            return
+        self.queue.put_nowait(event)
+
+class PostureSession:
+    """Per-session state machine and summary counters."""
+
+    def __init__(self, session_id: str, now: float):
+        self.session_id = session_id
+        self.state = STATE_UNKNOWN
+        self.state_since = now
+        self.candidate: Optional[str] = None
+        self.candidate_since = now
+        self.last_score: Optional[float] = None
+        self.last_seen = now
+        self.subscribers: Set[Subscriber] = set()
+        self.reset_summary(now)
+
+    def reset_summary(self, now: float) -> None:
+        self.summary_since = now
+        self.frames = 0
+        self.good_frames = 0
+        self.away_frames = 0
+        self.score_total = 0.0
+
+class PostureStateTracker:
+    """
+    Debounced posture state per live session, pushed as events.
+
+    Each analyzed frame of a session (or a frame where no person was found)
+    is an observation. The session moves between `good`, `bad` and `away`
+    only after the new state has been observed without interruption for
+    `dwell` seconds. While good, a frame only counts as bad once its score
+    falls `hysteresis` below the good-posture threshold, and while bad it
+    must rise `hysteresis` above it, so scores hovering at the threshold
+    don't flap. Subscribers get the current state on subscribing, an event
+    per transition and a summary of the frames seen every
+    `summary_interval` seconds.
+
+    Only sessions with observed frames can be subscribed to, by at most
+    `max_session_subscribers` listeners each and `max_subscribers` in
+    total. Sessions with subscribers are never evicted, so the total cap
+    also bounds how many sessions outlive `max_sessions`.
+    """
+
+    def __init__(
+        self,
+        dwell: float,
+        hysteresis: float,
+        summary_interval: float,
+        session_ttl: float,
+        max_sessions: int,
+        max_session_subscribers: int,
+        max_subscribers: int
+    ):
+        self.dwell = dwell
+        self.hysteresis = hysteresis
+        self.summary_interval = summary_interval
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        self.max_session_subscribers = max_session_subscribers
+        self.max_subscribers = max_subscribers
+        self._sessions: "OrderedDict[str, PostureSession]" = OrderedDict()
+        self._subscriber_count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, session_id: str, analysis: Optional[Dict[str, Any]], now: Optional[float] = None) -> None:
+        """
+        Record a frame of a session.
+
+        Args:
+            session_id: Client session identifier
+            analysis: Posture analysis of the frame, or None if no person was detected
+            now: Observation time (defaults to the current time)
+        """
+        now = time.time() if now is None else now
+        good_threshold = get_rule_engine().rules.good_threshold
+        events: List[Tuple[str, Dict[str, Any]]] = []
+        with self._lock:
+            session = self._get_session(session_id, now)
+            verdict = self._verdict(session.state, analysis, good_threshold)
+
+            session.frames += 1
+            if analysis is None:
+                session.away_frames += 1
+            else:
+                session.last_score = analysis["overall_score"]
+                session.score_total += session.last_score
+                session.good_frames += analysis["is_good_posture"]
+
+            if verdict == session.state:
+                session.candidate = None
+            elif verdict != session.candidate:
+                session.candidate = verdict
+                session.candidate_since = now
+            if session.candidate is not None and now - session.candidate_since >= self.dwell:
+                events.append((EVENT_STATE, self._transition(session)))
+
+            if now - session.summary_since >= self.summary_interval:
+                events.append((EVENT_SUMMARY, self._summary(session, now)))
+                session.reset_summary(now)
+            subscribers = list(session.subscribers)
+
+        for event in events:
+            for subscriber in subscribers:
+                subscriber.offer(event)
+
+    def subscribe(self, session_id: str) -> Subscriber:
+        """
+        Subscribe to a session's events from the running event loop.
+
+        The subscriber's queue starts with the current state.
+
+        Args:
+            session_id: Client session identifier
+
+        Returns:
+            Subscriber whose queue receives (event type, data) pairs
+
+        Raises:
+            SubscriptionError: 404 if no frames of the session were observed
+                recently, 429 if the session or service has too many subscribers
+        """
+        subscriber = Subscriber(asyncio.get_running_loop())
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or self._expired(session, now):
+                raise SubscriptionError(f"No recent frames for session {session_id}")
+            if len(session.subscribers) >= self.max_session_subscribers:
+                raise SubscriptionError("Too many subscribers for this session", status.HTTP_429_TOO_MANY_REQUESTS)
+            if self._subscriber_count >= self.max_subscribers:
+                raise SubscriptionError("Too many event subscribers", status.HTTP_429_TOO_MANY_REQUESTS)
+            session.subscribers.add(subscriber)
+            self._subscriber_count += 1
+            subscriber.queue.put_nowait((EVENT_STATE, self._state_event(session)))
+        return subscriber
+
+    def unsubscribe(self, session_id: str, subscriber: Subscriber) -> None:
+        """Stop delivering a session's events to a subscriber."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None and subscriber in session.subscribers:
+                session.subscribers.remove(subscriber)
+                self._subscriber_count -= 1
+                session.last_seen = time.time()
+
+    def close(self) -> None:
+        """End every subscriber's stream, e.g. when the service shuts down."""
+        with self._lock:
+            subscribers = [subscriber for session in self._sessions.values() for subscriber in session.subscribers]
+        for subscriber in subscribers:
+            subscriber.close()
+
+    def _verdict(self, state: str, analysis: Optional[Dict[str, Any]], good_threshold: float) -> str:
+        """Classify a frame, applying hysteresis around the threshold for the current state."""
+        if analysis is None:
+            return STATE_AWAY
+        score = analysis["overall_score"]
+        if state == STATE_GOOD:
+            return STATE_BAD if score < good_threshold - self.hysteresis else STATE_GOOD
+        if state == STATE_BAD:
+            return STATE_GOOD if score >= good_threshold + self.hysteresis else STATE_BAD
+        return STATE_GOOD if analysis["is_good_posture"] else STATE_BAD
+
+    def _transition(self, session: PostureSession) -> Dict[str, Any]:
+        """Move a session to its candidate state. Caller holds the lock."""
+        previous, previous_since = session.state, session.state_since
+        session.state, session.state_since = session.candidate, session.candidate_since
+        session.candidate = None
+        logger.debug("Posture session %s: %s -> %s", session.session_id, previous, session.state)
+
+        event = self._state_event(session)
+        event["previous"] = previous
+        event["previous_duration"] = session.state_since - previous_since
+        return event
+
+    def _state_event(self, session: PostureSession) -> Dict[str, Any]:
+        return {
+            "session_id": session.session_id,
+            "state": session.state,
+            "since": session.state_since,
+            "score": session.last_score,
+        }
+
+    def _summary(self, session: PostureSession, now: float) -> Dict[str, Any]:
+        scored_frames = session.frames - session.away_frames
+        return {
+            "session_id": session.session_id,
+            "state": session.state,
+            "state_duration": now - session.state_since,
+            "interval": now - session.summary_since,
+            "frames": session.frames,
+            "good_fraction": session.good_frames / scored_frames if scored_frames else None,
+            "away_fraction": session.away_frames / session.frames,
+            "mean_score": session.score_total / scored_frames if scored_frames else None,
+        }
+
+    def _get_session(self, session_id: str, now: float) -> PostureSession:
+        """Get or create a session, expiring idle unsubscribed ones and capping the total. Caller holds the lock."""
+        session = self._sessions.get(session_id)
+        if session is None or self._expired(session, now):
+            session = PostureSession(session_id, now)
+            self._sessions[session_id] = session
+        session.last_seen = now
+        self._sessions.move_to_end(session_id)
+
+        # Sessions are in LRU order, so expired and excess ones sit at the front
+        for oldest_id, oldest in list(self._sessions.items()):
+            if len(self._sessions) <= self.max_sessions and now - oldest.last_seen <= self.session_ttl:
+                break
+            if oldest.subscribers or oldest is session:
+                continue
+            del self._sessions[oldest_id]
+        return session
+
+    def _expired(self, session: PostureSession, now: float) -> bool:
+        """Whether a session has been idle without subscribers for longer than the TTL."""
+        return not session.subscribers and now - session.last_seen > self.session_ttl
+
+# Singleton instance to share across requests
+_posture_state_tracker_instance = None
+
+def get_posture_state_tracker() -> PostureStateTracker:
+    """
+    Get or create singleton instance of PostureStateTracker.
+
+    Returns:
+        PostureStateTracker instance
+    """
+    global _posture_state_tracker_instance
+    if _posture_state_tracker_instance is None:
+        _posture_state_tracker_instance = PostureStateTracker(
+            dwell=settings.POSTURE_STATE_DWELL,
+            hysteresis=settings.POSTURE_STATE_HYSTERESIS,
+            summary_interval=settings.POSTURE_SUMMARY_INTERVAL,
+            session_ttl=settings.POSTURE_SESSION_TTL,
+            max_sessions=settings.POSTURE_MAX_SESSIONS,
+            max_session_subscribers=settings.POSTURE_MAX_SESSION_SUBSCRIBERS,
+            max_subscribers=settings.POSTURE_MAX_SUBSCRIBERS
+        )
+    return _posture_state_tracker_instance
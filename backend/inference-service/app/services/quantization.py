@@ -0,0 +1,193 @@
+import os
+import json
+import logging
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.core.config import settings
+from app.core.errors import NoPersonDetectedError, ImageProcessingError
+from app.services.pose_detector import (
+    PoseDetector, keypoints_to_dict, QUANTIZATION_NONE, QUANTIZATION_INT8
+)
+from app.services.posture_analyzer import analyze_posture
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+def load_reference_images(directory: str) -> List[Tuple[str, np.ndarray]]:
+    """
+    Load every image in a reference directory.
+
+    Args:
+        directory: Directory with reference images
+
+    Returns:
+        List of (file name, image) pairs sorted by file name
+
+    Raises:
+        ImageProcessingError: If the directory has no readable images
+    """
+    if not os.path.isdir(directory):
+        raise ImageProcessingError(f"Reference directory not found: {directory}")
+    images = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        image = cv2.imread(os.path.join(directory, name), cv2.IMREAD_COLOR)
+        if image is not None:
+            images.append((name, image))
+    if not images:
+        raise ImageProcessingError(f"No reference images found in {directory}")
+    return images
+
+def _run(detector: PoseDetector, image: np.ndarray) -> Tuple[Optional[np.ndarray], float]:
+    """Run a detector on an image, returning keypoints (or None) and latency in ms."""
+    start = time.perf_counter()
+    try:
+        keypoints, _ = detector.infer(image)
+    except NoPersonDetectedError:
+        keypoints = None
+    return keypoints, (time.perf_counter() - start) * 1000
+
+def compare_detectors(
+    reference: PoseDetector,
+    candidate: PoseDetector,
+    images: List[Tuple[str, np.ndarray]],
+    min_confidence: float = 0.5
+) -> Dict[str, Any]:
+    """
+    Compare a candidate detector against a reference on a set of images.
+
+    Keypoint errors are measured only on keypoints both detectors report
+    above `min_confidence`, and are normalized by the image diagonal.
+    Posture verdicts come from running `analyze_posture` on each side's
+    keypoints.
+
+    Args:
+        reference: Reference (FP32) detector
+        candidate: Candidate (e.g. INT8) detector
+        images: List of (name, image) pairs
+        min_confidence: Keypoint confidence threshold
+
+    Returns:
+        Agreement report with aggregate metrics and per-image details
+    """
+    per_image = []
+    errors = []
+    presence_matches = 0
+    presence_total = 0
+    verdict_matches = 0
+    verdicts_compared = 0
+    score_deltas = []
+    reference_latency = []
+    candidate_latency = []
+    detection_matches = 0
+
+    # Warm both models up so the first image doesn't skew latency
+    _run(reference, images[0][1])
+    _run(candidate, images[0][1])
+
+    for name, image in images:
+        ref_keypoints, ref_ms = _run(reference, image)
+        cand_keypoints, cand_ms = _run(candidate, image)
+        reference_latency.append(ref_ms)
+        candidate_latency.append(cand_ms)
+
+        entry = {
+            "image": name,
+            "reference_detected": ref_keypoints is not None,
+            "candidate_detected": cand_keypoints is not None,
+        }
+        if (ref_keypoints is None) == (cand_keypoints is None):
+            detection_matches += 1
+        if ref_keypoints is None or cand_keypoints is None:
+            per_image.append(entry)
+            continue
+
+        # Keypoint agreement
+        diagonal = float(np.hypot(image.shape[0], image.shape[1]))
+        ref_present = ref_keypoints[:, 2] > min_confidence
+        cand_present = cand_keypoints[:, 2] > min_confidence
+        both = ref_present & cand_present
+        presence_matches += int(np.sum(ref_present == cand_present))
+        presence_total += len(ref_present)
+        distances = np.linalg.norm(ref_keypoints[both, :2] - cand_keypoints[both, :2], axis=1) / diagonal
+        errors.extend(distances.tolist())
+
+        # Posture verdict agreement
+        ref_analysis = analyze_posture(keypoints_to_dict(ref_keypoints, min_confidence))
+        cand_analysis = analyze_posture(keypoints_to_dict(cand_keypoints, min_confidence))
+        verdicts_compared += 1
+        verdict_match = ref_analysis["is_good_posture"] == cand_analysis["is_good_posture"]
+        verdict_matches += int(verdict_match)
+        score_delta = abs(ref_analysis["overall_score"] - cand_analysis["overall_score"])
+        score_deltas.append(score_delta)
+
+        entry.update({
+            "mean_keypoint_error": float(np.mean(distances)) if len(distances) else None,
+            "verdict_match": verdict_match,
+            "reference_score": ref_analysis["overall_score"],
+            "candidate_score": cand_analysis["overall_score"],
+        })
+        per_image.append(entry)
+
+    reference_ms = float(np.mean(reference_latency))
+    candidate_ms = float(np.mean(candidate_latency))
+    return {
+        "images": len(images),
+        "detection_agreement": detection_matches / len(images),
+        "keypoint_presence_agreement": presence_matches / presence_total if presence_total else None,
+        "mean_keypoint_error": float(np.mean(errors)) if errors else None,
+        "max_keypoint_error": float(np.max(errors)) if errors else None,
+        "verdict_agreement": verdict_matches / verdicts_compared if verdicts_compared else None,
+        "mean_score_delta": float(np.mean(score_deltas)) if score_deltas else None,
+        "reference_latency_ms": reference_ms,
+        "candidate_latency_ms": candidate_ms,
+        "speedup": reference_ms / candidate_ms if candidate_ms else None,
+        "per_image": per_image,
+    }
+
+def run_accuracy_check(
+    model_path: str = settings.MODEL_PATH,
+    reference_dir: str = settings.QUANTIZATION_REFERENCE_DIR,
+    quantization: str = QUANTIZATION_INT8
+) -> Dict[str, Any]:
+    """
+    Compare a quantized model against its FP32 original on a reference set.
+
+    Args:
+        model_path: FP32 model weights
+        reference_dir: Directory with reference images
+        quantization: Quantization mode to evaluate
+
+    Returns:
+        Agreement report (see `compare_detectors`)
+    """
+    images = load_reference_images(reference_dir)
+    reference = PoseDetector(model_path=model_path, fallback=False, quantization=QUANTIZATION_NONE)
+    candidate = PoseDetector(model_path=model_path, fallback=False, quantization=quantization)
+    report = compare_detectors(reference, candidate, images)
+    report.update({"model_path": model_path, "quantization": quantization})
+    logger.info(
+        f"Quantization check for {model_path} ({quantization}): "
+        f"verdict agreement {report['verdict_agreement']}, "
+        f"mean keypoint error {report['mean_keypoint_error']}, "
+        f"speedup {report['speedup']}"
+    )
+    return report
+
+if __name__ == "__main__":
+    # Usage: python -m app.services.quantization [model_path] [reference_dir]
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    args = sys.argv[1:]
+    result = run_accuracy_check(
+        model_path=args[0] if len(args) > 0 else settings.MODEL_PATH,
+        reference_dir=args[1] if len(args) > 1 else settings.QUANTIZATION_REFERENCE_DIR
+    )
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,160 @@
+import cProfile
+import io
+import itertools
+import logging
+import os
+import pstats
+import re
+import threading
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Profile kinds, used as file name prefixes and rotated independently
+PROFILE_ON_DEMAND = "request"
+PROFILE_SAMPLED = "sampled"
+PROFILE_KINDS = (PROFILE_ON_DEMAND, PROFILE_SAMPLED)
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+T = TypeVar("T")
+
+class ProfileCapture:
+    """A profile being captured for a single request."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.profile_id = uuid.uuid4().hex
+        self.profiler = cProfile.Profile()
+
+class RequestProfiler:
+    """
+    Per-request cProfile capture with on-demand and sampled modes.
+
+    On-demand profiles are taken when an admin asks for them; sampled
+    profiles are taken for 1 in every `sample_rate` requests. Profiles are
+    written to `profile_dir` as pstats files and each kind keeps only its
+    `max_files` most recent files.
+    """
+
+    def __init__(self, profile_dir: str, sample_rate: int, max_files: int):
+        self.profile_dir = profile_dir
+        self.sample_rate = sample_rate
+        self.max_files = max_files
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def should_sample(self) -> bool:
+        """Decide whether the next request is profiled by the sampled mode."""
+        if self.sample_rate <= 0:
+            return False
+        return next(self._counter) % self.sample_rate == 0
+
+    def run(self, capture: ProfileCapture, function: Callable[..., T], *args: Any) -> T:
+        """
+        Call `function` under the profiler and save the result.
+
+        cProfile only follows the thread that enables it, so this is meant
+        to run in a worker thread (e.g. through `run_in_threadpool`): the
+        profile then holds just this call, and the event loop keeps serving
+        other requests meanwhile.
+
+        Args:
+            capture: Capture to record into; its `profile_id` identifies the saved file
+            function: Function to profile
+            *args: Arguments for the function
+
+        Returns:
+            The function's result
+        """
+        capture.profiler.enable()
+        try:
+            return function(*args)
+        finally:
+            capture.profiler.disable()
+            # Failed requests are saved too; slow failures are worth a look
+            try:
+                self._save(capture)
+            except OSError as e:
+                logger.error(f"Failed to save profile {capture.profile_id}: {e}")
+
+    def get_path(self, profile_id: str) -> Optional[str]:
+        """Get the file path of a saved profile, or None if it doesn't exist."""
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        for kind in PROFILE_KINDS:
+            path = os.path.join(self.profile_dir, f"{kind}-{profile_id}.prof")
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """List saved profiles, newest first."""
+        profiles = []
+        for kind in PROFILE_KINDS:
+            for name, path, mtime in self._files(kind):
+                profiles.append({
+                    "id": name[len(kind) + 1:-len(".prof")],
+                    "kind": kind,
+                    "created_at": mtime,
+                    "size_bytes": os.path.getsize(path),
+                })
+        return sorted(profiles, key=lambda profile: profile["created_at"], reverse=True)
+
+    def render_text(self, path: str, limit: int = 40) -> str:
+        """Render a saved profile as a text report sorted by cumulative time."""
+        stream = io.StringIO()
+        stats = pstats.Stats(path, stream=stream)
+        stats.strip_dirs().sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
+
+    def _save(self, capture: ProfileCapture) -> None:
+        """Write a capture to disk and rotate old files of the same kind."""
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"{capture.kind}-{capture.profile_id}.prof")
+        capture.profiler.dump_stats(path)
+        logger.info(f"Saved {capture.kind} profile {capture.profile_id}")
+
+        with self._lock:
+            files = self._files(capture.kind)
+            for _, stale_path, _ in files[self.max_files:]:
+                try:
+                    os.remove(stale_path)
+                except OSError:
+                    pass
+
+    def _files(self, kind: str) -> List[Tuple[str, str, float]]:
+        """List (name, path, mtime) for saved profiles of a kind, newest first."""
+        if not os.path.isdir(self.profile_dir):
+            return []
+        files = []
+        for name in os.listdir(self.profile_dir):
+            if name.startswith(f"{kind}-") and name.endswith(".prof"):
+                path = os.path.join(self.profile_dir, name)
+                try:
+                    files.append((name, path, os.path.getmtime(path)))
+                except OSError:
+                    continue
+        return sorted(files, key=lambda item: item[2], reverse=True)
+
+# Singleton instance to share across requests
+_request_profiler_instance = None
+
+def get_request_profiler() -> RequestProfiler:
+    """
+    Get or create singleton instance of RequestProfiler.
+
+    Returns:
+        RequestProfiler instance
+    """
+    global _request_profiler_instance
+    if _request_profiler_instance is None:
+        _request_profiler_instance = RequestProfiler(
+            profile_dir=settings.PROFILE_DIR,
+            sample_rate=settings.PROFILE_SAMPLE_RATE,
+            max_files=settings.PROFILE_MAX_FILES
+        )
+    return _request_profiler_instance
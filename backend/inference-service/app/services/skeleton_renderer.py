@@ -0,0 +1,104 @@
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Segments drawn by the renderer, with the analysis sub-score that colors them
+SEGMENTS = (
+    ("left_ear", "left_shoulder", "neck_position"),
+    ("right_ear", "right_shoulder", "neck_position"),
+    ("left_shoulder", "right_shoulder", "shoulder_balance"),
+    ("left_shoulder", "left_hip", "back_position"),
+    ("right_shoulder", "right_hip", "back_position"),
+    ("left_hip", "right_hip", "back_position"),
+)
+
+# Posture-relevant joints, each colored by the worst sub-score of its segments
+JOINT_SCORES = {}
+for _start, _end, _score in SEGMENTS:
+    JOINT_SCORES.setdefault(_start, set()).add(_score)
+    JOINT_SCORES.setdefault(_end, set()).add(_score)
+
+# BGR colors for score bands
+COLOR_GOOD = (80, 200, 60)
+COLOR_FAIR = (0, 190, 255)
+COLOR_POOR = (60, 60, 230)
+COLOR_UNKNOWN = (200, 200, 200)
+
+def score_color(score: Optional[float]) -> Tuple[int, int, int]:
+    """
+    Map a sub-score (0-1) to a BGR color.
+
+    Args:
+        score: Sub-score from `analyze_posture`, or None if unavailable
+
+    Returns:
+        BGR color tuple
+    """
+    if score is None:
+        return COLOR_UNKNOWN
+    if score >= 0.9:
+        return COLOR_GOOD
+    if score >= 0.6:
+        return COLOR_FAIR
+    return COLOR_POOR
+
+def scaled_shape(shape: Tuple[int, ...], scale: float) -> Tuple[int, ...]:
+    """Get the shape of an image downscaled by `scale`, as drawn by `render_skeleton`."""
+    return (max(1, int(round(shape[0] * scale))), max(1, int(round(shape[1] * scale)))) + tuple(shape[2:])
+
+def render_skeleton(
+    image: np.ndarray,
+    keypoints: Dict[str, Dict[str, float]],
+    analysis: Optional[Dict[str, Any]] = None,
+    scale: float = 1.0,
+    canvas: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Draw the posture skeleton (ears, shoulders, hips) on an image.
+
+    At full scale the image is drawn on in place and returned; with
+    `scale` < 1 a downscaled copy is drawn on instead, written into
+    `canvas` when given (e.g. a pooled buffer of `scaled_shape`) or
+    allocated otherwise.
+
+    Args:
+        image: Image as numpy array (BGR)
+        keypoints: Dictionary of keypoints with coordinates and confidence
+        analysis: Results from `analyze_posture` used to color segments
+        scale: Output scale relative to the input image
+        canvas: Optional preallocated target for the downscaled image
+
+    Returns:
+        Annotated image
+    """
+    if scale < 1.0:
+        height, width = scaled_shape(image.shape, scale)[:2]
+        canvas = cv2.resize(image, (width, height), dst=canvas, interpolation=cv2.INTER_AREA)
+    else:
+        canvas = image
+        scale = 1.0
+
+    analysis = analysis or {}
+    thickness = max(2, int(round(min(canvas.shape[:2]) / 240)))
+    radius = thickness + 2
+
+    points = {
+        name: (int(round(keypoints[name]["x"] * scale)), int(round(keypoints[name]["y"] * scale)))
+        for name in JOINT_SCORES
+        if name in keypoints
+    }
+
+    for start, end, score_name in SEGMENTS:
+        if start in points and end in points:
+            cv2.line(canvas, points[start], points[end], score_color(analysis.get(score_name)), thickness, cv2.LINE_AA)
+
+    for name, point in points.items():
+        scores = [analysis[score_name] for score_name in JOINT_SCORES[name] if score_name in analysis]
+        color = score_color(min(scores) if scores else None)
+        cv2.circle(canvas, point, radius, color, -1, cv2.LINE_AA)
+
+    return canvas
@@ -0,0 +1,60 @@
+import base64
+import os
+import sys
+import time
+import numpy as np
+import orjson
+
+# Run from the inference-service directory: python tests/benchmark_events.py
+# Compares what an alert-only live client costs when it stops downloading the
+# overlay image (include_image=false) and follows posture state events instead.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.api.endpoints.inference import build_payload, render_response
+from app.services.keypoint_codec import FORMAT_FULL, FORMAT_COMPACT, FORMAT_MSGPACK
+from app.services.pose_detector import PoseDetector
+from app.services.posture_state import PostureStateTracker
+
+test_images_dir = os.path.join(os.path.dirname(__file__), "test_images")
+iterations = 30
+observations = 100000
+
+# Full-format payloads are serialized by the app's default ORJSONResponse
+def response_size(response):
+    return len(orjson.dumps(response)) if isinstance(response, dict) else len(response.body)
+
+def time_frame(detector, image, response_format, include_image):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        payload = build_payload(detector, image, response_format, None, include_image)
+        response = render_response(payload, response_format)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings)), response_size(response)
+
+def time_observe():
+    tracker = PostureStateTracker(
+        dwell=10, hysteresis=0.05, summary_interval=30, session_ttl=300, max_sessions=256,
+        max_session_subscribers=4, max_subscribers=256
+    )
+    analysis = {"overall_score": 0.8, "is_good_posture": True}
+    start = time.perf_counter()
+    for i in range(observations):
+        tracker.observe("benchmark", analysis, now=i * 0.1)
+    return (time.perf_counter() - start) / observations * 1e6
+
+if __name__ == "__main__":
+    detector = PoseDetector()
+    for name in sorted(os.listdir(test_images_dir)):
+        if not name.endswith(".jpg"):
+            continue
+        with open(os.path.join(test_images_dir, name), "rb") as f:
+            image = base64.b64encode(f.read()).decode("utf-8")
+        print(name)
+        for response_format in (FORMAT_FULL, FORMAT_COMPACT, FORMAT_MSGPACK):
+            with_image, with_bytes = time_frame(detector, image, response_format, True)
+            without_image, without_bytes = time_frame(detector, image, response_format, False)
+            print(f"  {response_format:8s} with image: {with_image:7.2f} ms {with_bytes:8d} B   "
+                  f"without: {without_image:7.2f} ms {without_bytes:8d} B")
+
+    print(f"\nposture state observe: {time_observe():.2f} us per frame")
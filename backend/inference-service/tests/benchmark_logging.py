@@ -0,0 +1,116 @@
+import logging
+import os
+import queue
+import sys
+import tempfile
+import time
+from logging.handlers import QueueListener
+import numpy as np
+
+# Run from the inference-service directory: python tests/benchmark_logging.py
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.logging import AggregatedLogger, LocalQueueHandler, LOG_FORMAT
+from app.core.tracing import RequestIdLogFilter
+from app.services import posture_analyzer, posture_rules
+
+iterations = 20000
+
+# A partly out-of-view frame: ears and shoulders visible, hips missing
+keypoints = {
+    "left_ear": {"x": 310.0, "y": 140.0, "confidence": 0.9},
+    "right_ear": {"x": 370.0, "y": 142.0, "confidence": 0.9},
+    "left_shoulder": {"x": 270.0, "y": 260.0, "confidence": 0.9},
+    "right_shoulder": {"x": 410.0, "y": 262.0, "confidence": 0.9},
+}
+
+class SlowHandler(logging.FileHandler):
+    """File handler with extra per-record latency, like a busy terminal or log shipper."""
+
+    def emit(self, record):
+        time.sleep(0.0001)
+        super().emit(record)
+
+class DirectWarnings:
+    """Stand-in for the old behavior: one logger.warning per occurrence."""
+
+    def __init__(self, logger):
+        self.logger = logger
+
+    def log(self, key, message):
+        self.logger.warning(message)
+
+def configure(handler, use_queue):
+    """Route the root logger to a handler, directly or through a queue."""
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.setLevel(logging.INFO)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    if not use_queue:
+        handler.addFilter(RequestIdLogFilter())
+        root.addHandler(handler)
+        return None
+    log_queue = queue.SimpleQueue()
+    queue_handler = LocalQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdLogFilter())
+    root.addHandler(queue_handler)
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
+def time_frames(warnings):
+    """Median microseconds per analyze_posture call."""
+    posture_rules.missing_keypoints = warnings
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        posture_analyzer.analyze_posture(keypoints)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return float(np.median(timings)), float(np.mean(timings))
+
+def time_disabled_debug():
+    """Cost of a disabled debug call with an eager f-string vs lazy %-args."""
+    logger = logging.getLogger("benchmark.debug")
+    error = np.random.rand(6)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        logger.debug(f"Optical flow drift detected (max forward-backward error {float(error.max()):.2f} px)")
+    eager_us = (time.perf_counter() - start) * 1e6 / iterations
+    start = time.perf_counter()
+    for _ in range(iterations):
+        logger.debug("Optical flow drift detected (max forward-backward error %.2f px)", error.max())
+    lazy_us = (time.perf_counter() - start) * 1e6 / iterations
+    return eager_us, lazy_us
+
+if __name__ == "__main__":
+    logger = posture_rules.logger
+    original = posture_rules.missing_keypoints
+    print(f"analyze_posture with missing hip keypoints, {iterations} frames (median / mean per frame)\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "bench.log")
+        cases = [
+            ("warning per frame, file handler", DirectWarnings(logger), logging.FileHandler(log_path), False),
+            ("warning per frame, slow handler", DirectWarnings(logger), SlowHandler(log_path), False),
+            ("warning per frame, queue + slow handler", DirectWarnings(logger), SlowHandler(log_path), True),
+            ("aggregated, queue + slow handler", AggregatedLogger(logger, 60.0), SlowHandler(log_path), True),
+        ]
+        for label, warnings, handler, use_queue in cases:
+            listener = configure(handler, use_queue)
+            median_us, mean_us = time_frames(warnings)
+            if listener is not None:
+                drain_start = time.perf_counter()
+                listener.stop()
+                drain_ms = (time.perf_counter() - drain_start) * 1000
+                print(f"{label:42s} {median_us:7.2f} / {mean_us:7.2f} us   (listener drained in {drain_ms:.0f} ms)")
+            else:
+                print(f"{label:42s} {median_us:7.2f} / {mean_us:7.2f} us")
+            handler.close()
+
+        lines = sum(1 for _ in open(log_path))
+        print(f"\nLines written: {lines} (the aggregated run adds 1)")
+
+    posture_rules.missing_keypoints = original
+    eager_us, lazy_us = time_disabled_debug()
+    print(f"Disabled debug call: f-string {eager_us:.2f} us, %-args {lazy_us:.2f} us")
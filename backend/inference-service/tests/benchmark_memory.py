@@ -0,0 +1,84 @@
+import base64
+import gc
+import os
+import resource
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+# Run from the inference-service directory: python tests/benchmark_memory.py
+# Set RENDER_SCALE (e.g. 0.5) to include pooled render canvases.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services import buffer_pool
+from app.services.pose_detector import PoseDetector
+
+test_images_dir = os.path.join(os.path.dirname(__file__), "test_images")
+warmup = 10
+iterations = 200
+
+def current_rss_mb():
+    # Resident set size from /proc (Linux); falls back to the peak elsewhere
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return peak_rss_mb()
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+def load_images():
+    images = []
+    for name in sorted(os.listdir(test_images_dir)):
+        if name.endswith(".jpg"):
+            with open(os.path.join(test_images_dir, name), "rb") as f:
+                images.append(base64.b64encode(f.read()).decode("utf-8"))
+    return images
+
+def run(detector, images, label):
+    for i in range(warmup):
+        detector.detect_pose(images[i % len(images)])
+    gc.collect()
+
+    # Steady-state RSS and latency without tracing overhead
+    rss = []
+    timings = []
+    start_rss = current_rss_mb()
+    for i in range(iterations):
+        start = time.perf_counter()
+        detector.detect_pose(images[i % len(images)])
+        timings.append((time.perf_counter() - start) * 1000)
+        rss.append(current_rss_mb())
+
+    # Transient Python/numpy allocation peak of each request
+    tracemalloc.start()
+    peaks = []
+    for i in range(len(images) * 5):
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        detector.detect_pose(images[i % len(images)])
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    print(f"{label:12s} latency: {np.median(timings):7.2f} ms   "
+          f"alloc peak/request: {np.mean(peaks) / 2**20:6.2f} MiB   "
+          f"RSS start/end: {start_rss:7.1f}/{rss[-1]:7.1f} MiB   "
+          f"RSS swing: {max(rss) - min(rss):6.1f} MiB   peak RSS: {peak_rss_mb():7.1f} MiB")
+
+if __name__ == "__main__":
+    images = load_images()
+    detector = PoseDetector()
+    print(f"detect_pose over {len(images)} test images, {iterations} requests per run ({detector.model_name})\n")
+
+    # Pooling off first, so the process peak RSS reflects the unpooled run
+    pool = buffer_pool.get_buffer_pool()
+    max_bytes = pool.max_bytes
+    pool.max_bytes = 0
+    run(detector, images, "unpooled")
+    pool.max_bytes = max_bytes
+    run(detector, images, "pooled")
+    print(f"\nBuffer pool: {pool.stats()}")
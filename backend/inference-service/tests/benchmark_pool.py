@@ -0,0 +1,63 @@
+import base64
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Run from the inference-service directory: python tests/benchmark_pool.py [max_workers]
+# Compares in-process inference (request threads sharing one model) with the
+# process pool at increasing worker counts, up to the number of cores.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.inference_pool import InferencePool
+from app.services.pose_detector import PoseDetector
+
+test_images_dir = os.path.join(os.path.dirname(__file__), "test_images")
+requests_per_run = 200
+threads_per_worker = 2
+
+def load_images():
+    images = []
+    for name in sorted(os.listdir(test_images_dir)):
+        if name.endswith(".jpg"):
+            with open(os.path.join(test_images_dir, name), "rb") as f:
+                images.append(base64.b64encode(f.read()).decode("utf-8"))
+    return images
+
+def run(detector, images, concurrency):
+    def call(i):
+        start = time.perf_counter()
+        detector.detect_pose(images[i % len(images)])
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(call, range(concurrency * 2)))
+        start = time.perf_counter()
+        timings = list(executor.map(call, range(requests_per_run)))
+        elapsed = time.perf_counter() - start
+    return np.median(timings), requests_per_run / elapsed
+
+if __name__ == "__main__":
+    images = load_images()
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    worker_counts = [count for count in (1, 2, 4, 8, 16, 32) if count <= max_workers]
+    print(f"detect_pose over {len(images)} test images, {requests_per_run} requests per run, "
+          f"{threads_per_worker} request threads per worker, {os.cpu_count()} cores\n")
+
+    detector = PoseDetector()
+    baseline = None
+    for workers in worker_counts:
+        concurrency = workers * threads_per_worker
+        p50, throughput = run(detector, images, concurrency)
+        print(f"in-process  threads {concurrency:3d}             p50: {p50:8.2f} ms   {throughput:7.1f} req/s")
+
+        pool = InferencePool(workers, detector.image_size)
+        pool.start()
+        try:
+            p50, throughput = run(pool.detector(), images, concurrency)
+        finally:
+            pool.stop()
+        baseline = baseline or throughput
+        print(f"pool        threads {concurrency:3d} workers {workers:3d}  p50: {p50:8.2f} ms   {throughput:7.1f} req/s"
+              f"   ({throughput / baseline:.2f}x of 1 worker)")
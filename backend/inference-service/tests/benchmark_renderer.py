@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+# Run from the inference-service directory: python tests/benchmark_renderer.py
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.pose_detector import PoseDetector, keypoints_to_dict
+from app.services.posture_analyzer import analyze_posture
+from app.services.skeleton_renderer import render_skeleton
+
+test_images_dir = os.path.join(os.path.dirname(__file__), "test_images")
+iterations = 50
+
+# Time a function over a fresh copy of the image on every iteration
+def time_render(render, image):
+    timings = []
+    for _ in range(iterations):
+        frame = image.copy()
+        start = time.perf_counter()
+        output = render(frame)
+        cv2.imencode('.png', output)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+def benchmark_image(detector, image_path):
+    image = cv2.imread(image_path)
+    keypoints, result = detector.infer(image)
+    keypoints_dict = keypoints_to_dict(keypoints)
+    analysis = analyze_posture(keypoints_dict)
+
+    plot_ms = time_render(lambda frame: result.plot(), image)
+    skeleton_ms = time_render(lambda frame: render_skeleton(frame, keypoints_dict, analysis), image)
+    half_ms = time_render(lambda frame: render_skeleton(frame, keypoints_dict, analysis, scale=0.5), image)
+
+    print(f"{os.path.basename(image_path):32s} {image.shape[1]}x{image.shape[0]:<6d} "
+          f"plot: {plot_ms:7.2f} ms   skeleton: {skeleton_ms:7.2f} ms   skeleton@0.5: {half_ms:7.2f} ms")
+    return plot_ms, skeleton_ms, half_ms
+
+if __name__ == "__main__":
+    detector = PoseDetector()
+    print(f"Median render + PNG encode time over {iterations} runs ({detector.model_name})\n")
+
+    totals = []
+    for name in sorted(os.listdir(test_images_dir)):
+        if name.endswith(".jpg"):
+            try:
+                totals.append(benchmark_image(detector, os.path.join(test_images_dir, name)))
+            except Exception as e:
+                print(f"{name}: skipped ({e})")
+
+    if totals:
+        plot_ms, skeleton_ms, half_ms = np.mean(totals, axis=0)
+        print(f"\nMean plot: {plot_ms:.2f} ms, skeleton: {skeleton_ms:.2f} ms "
+              f"({plot_ms / skeleton_ms:.1f}x), skeleton@0.5: {half_ms:.2f} ms ({plot_ms / half_ms:.1f}x)")
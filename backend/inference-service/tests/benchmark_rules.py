@@ -0,0 +1,84 @@
+import copy
+import os
+import sys
+import time
+import numpy as np
+
+# Run from the inference-service directory: python tests/benchmark_rules.py
+# Compares the built-in rules against the hand-written checks they replaced,
+# on keypoint dictionaries and on the detector's (17, 3) arrays, then shows
+# how evaluation scales with the number of rules.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.posture_analyzer import analyze_posture
+from app.services.posture_rules import CompiledRules, default_rule_config
+from app.services.quantization import keypoints_to_dict
+from test_posture_rules import analyze_back_position, analyze_neck_position, analyze_shoulder_balance
+
+iterations = 20000
+repeats = 5
+
+# Build a configuration with every built-in rule repeated `copies` times
+def scaled_config(copies):
+    config = default_rule_config()
+    rules = []
+    for copy_index in range(copies):
+        for rule in default_rule_config()["rules"]:
+            rule = copy.deepcopy(rule)
+            rule["name"] = f"{rule['name']}_{copy_index}"
+            rules.append(rule)
+    config["rules"] = rules
+    return config
+
+# The three original checks, combined the way the old analyze_posture did
+def original_analyze_posture(keypoints):
+    get = keypoints.get
+    scores = {}
+    feedback = []
+    for name, (score, message) in (
+        ("shoulder_balance", analyze_shoulder_balance(get("left_shoulder"), get("right_shoulder"))),
+        ("neck_position", analyze_neck_position(get("left_ear"), get("right_ear"), get("left_shoulder"), get("right_shoulder"))),
+        ("back_position", analyze_back_position(get("left_shoulder"), get("right_shoulder"), get("left_hip"), get("right_hip"))),
+    ):
+        scores[name] = score
+        if message:
+            feedback.append(message)
+    weights = {"shoulder_balance": 0.3, "neck_position": 0.4, "back_position": 0.3}
+    overall_score = sum(scores[key] * weights[key] for key in scores) / sum(weights.values())
+    if overall_score > 0.8:
+        feedback.append("Overall posture is excellent")
+    elif overall_score > 0.6:
+        feedback.append("Overall posture is good, with minor adjustments needed")
+    else:
+        feedback.append("Significant posture corrections needed")
+    return {**scores, "overall_score": overall_score, "is_good_posture": overall_score >= 0.7, "feedback": feedback}
+
+def time_call(function, argument):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function(argument)
+        best = min(best, (time.perf_counter() - start) / iterations)
+    return best * 1e6
+
+if __name__ == "__main__":
+    # A seated person facing the camera, all keypoints visible
+    keypoints = np.array([[300.0 + i, 100.0 + 10 * i, 0.9] for i in range(17)], dtype=np.float32)
+    keypoints_dict = keypoints_to_dict(keypoints)
+    values = keypoints.ravel().tolist()
+    print(f"Best of {repeats} x {iterations} calls\n")
+
+    print(f"original 3 checks (dict):        {time_call(original_analyze_posture, keypoints_dict):6.2f} us/frame")
+    print(f"analyze_posture, 6 rules (dict):  {time_call(analyze_posture, keypoints_dict):6.2f} us/frame")
+    print(f"analyze_posture, 6 rules (array): {time_call(analyze_posture, keypoints):6.2f} us/frame\n")
+
+    # The three weighted checks alone, then every built-in rule repeated
+    original = default_rule_config()
+    original["rules"] = original["rules"][:3]
+    for config in (original, scaled_config(1), scaled_config(4), scaled_config(16)):
+        start = time.perf_counter()
+        rules = CompiledRules(config)
+        compile_ms = (time.perf_counter() - start) * 1000
+        print(f"{len(rules.names):4d} rules   compile: {compile_ms:6.2f} ms   "
+              f"evaluate: {time_call(rules.evaluate, values):6.2f} us/frame")
@@ -0,0 +1,138 @@
+import asyncio
+import base64
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+
+# Run from the inference-service directory: python tests/test_graceful_restart.py [rounds]
+# Starts one instance of `python -m app.server` and the api-service in front
+# of it, as in compose.yaml, keeps the api-service under steady load and
+# restarts the inference instance with SIGTERM. Calls already accepted must
+# finish, and the api-service holds calls turned away while the instance
+# drains, is down or reloads its models until the replacement is ready.
+# Exits non-zero if any call failed.
+
+service_dir = os.path.join(os.path.dirname(__file__), "..")
+api_service_dir = os.path.join(service_dir, "..", "api-service")
+test_images_dir = os.path.join(os.path.dirname(__file__), "test_images")
+inference_port = 18101
+api_port = 18100
+concurrency = 8
+drain_delay = 1.0
+retry_delay = 0.2
+startup_timeout = 120.0
+
+def load_images():
+    images = []
+    for name in sorted(os.listdir(test_images_dir)):
+        if name.endswith(".jpg"):
+            with open(os.path.join(test_images_dir, name), "rb") as f:
+                images.append(base64.b64encode(f.read()).decode("utf-8"))
+    return images
+
+def start_inference():
+    env = dict(
+        os.environ,
+        PORT=str(inference_port),
+        RPC_PORT="0",
+        UDS_PATH="",
+        RPC_SOCKET_PATH="",
+        SHUTDOWN_DRAIN_DELAY=str(drain_delay)
+    )
+    # Keep the access log out of the report; server logs still go to stderr
+    return subprocess.Popen([sys.executable, "-m", "app.server"], cwd=service_dir, env=env, stdout=subprocess.DEVNULL)
+
+def start_api_service(job_store_path):
+    env = dict(
+        os.environ,
+        INFERENCE_SERVICE_URL=f"http://127.0.0.1:{inference_port}",
+        INFERENCE_TRANSPORT="http",
+        INFERENCE_RETRY_DELAY=str(retry_delay),
+        INFERENCE_RESTART_TIMEOUT=str(startup_timeout),
+        INFERENCE_CONCURRENCY=str(concurrency),
+        RATE_LIMIT_RATE="0",
+        JOB_STORE_PATH=job_store_path
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(api_port), "--log-level", "warning"],
+        cwd=api_service_dir, env=env
+    )
+
+async def wait_ready(client, url):
+    deadline = time.monotonic() + startup_timeout
+    while True:
+        try:
+            if (await client.get(url, timeout=1.0)).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"{url} did not become ready")
+        await asyncio.sleep(0.1)
+
+async def generate_load(client, images, results, stop):
+    i = 0
+    while not stop.is_set():
+        i += 1
+        sent = time.monotonic()
+        try:
+            response = await client.post(
+                f"http://127.0.0.1:{api_port}/api/posture/analyze",
+                json={"image": images[i % len(images)]},
+                params={"include_image": "false"}
+            )
+            results.append((time.monotonic() - sent, response.status_code, None if response.status_code == 200 else response.text))
+        except httpx.HTTPError as e:
+            results.append((time.monotonic() - sent, None, repr(e)))
+
+async def main(rounds):
+    images = load_images()
+    job_store = tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False)
+    job_store.close()
+    inference = start_inference()
+    api_service = start_api_service(job_store.name)
+    results = []
+    stop = asyncio.Event()
+    async with httpx.AsyncClient(timeout=startup_timeout * 2, limits=httpx.Limits(max_connections=concurrency * 2)) as client:
+        try:
+            await wait_ready(client, f"http://127.0.0.1:{inference_port}/ready")
+            await wait_ready(client, f"http://127.0.0.1:{api_port}/")
+            load = [asyncio.create_task(generate_load(client, images, results, stop)) for _ in range(concurrency)]
+            await asyncio.sleep(2)
+
+            for round_number in range(rounds):
+                sent = len(results)
+                start = time.monotonic()
+                inference.send_signal(signal.SIGTERM)
+                code = await asyncio.get_running_loop().run_in_executor(None, inference.wait)
+                print(f"round {round_number + 1}: inference exited with {code} after "
+                      f"{time.monotonic() - start:.1f}s, {len(results) - sent} calls answered meanwhile")
+                inference = start_inference()
+                await wait_ready(client, f"http://127.0.0.1:{inference_port}/ready")
+                print(f"round {round_number + 1}: inference ready again {time.monotonic() - start:.1f}s after SIGTERM")
+                await asyncio.sleep(2)
+
+            stop.set()
+            await asyncio.gather(*load)
+        finally:
+            for process in (inference, api_service):
+                if process.poll() is None:
+                    process.send_signal(signal.SIGTERM)
+            for process in (inference, api_service):
+                process.wait()
+            os.remove(job_store.name)
+
+    failures = [result for result in results if result[1] != 200]
+    slowest = max(elapsed for elapsed, _, _ in results)
+    print(f"\n{len(results)} calls, {len(failures)} failed, slowest answered after {slowest:.1f}s")
+    for _, status_code, detail in failures[:10]:
+        print(f"  {status_code} {detail}")
+    return not failures
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    sys.exit(0 if asyncio.run(main(rounds)) else 1)
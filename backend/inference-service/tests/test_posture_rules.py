@@ -0,0 +1,181 @@
+import json
+import math
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+# Run from the inference-service directory: python -m pytest tests/test_posture_rules.py
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings
+from app.services.posture_analyzer import analyze_posture
+from app.services.posture_rules import CompiledRules, RuleConfigError, RuleEngine, default_rule_config
+
+frames = 5000
+confidence = 0.9
+
+# The hand-written checks the built-in rules replaced, as they were before the
+# rule engine (minus their missing-keypoint logging)
+
+def analyze_shoulder_balance(left_shoulder, right_shoulder):
+    if not (left_shoulder and right_shoulder):
+        return 0.5, "Unable to assess shoulder balance"
+    try:
+        shoulder_height_diff = abs(left_shoulder["y"] - right_shoulder["y"])
+        shoulder_height_ratio = shoulder_height_diff / ((left_shoulder["y"] + right_shoulder["y"]) / 2)
+        threshold = settings.SHOULDER_BALANCE_THRESHOLD
+        if shoulder_height_ratio < threshold:
+            return 1.0, "Shoulders are well-balanced"
+        elif shoulder_height_ratio < threshold * 2:
+            return 0.7, "Shoulders are slightly uneven"
+        else:
+            return 0.3, "Shoulders are significantly uneven - try to level them"
+    except Exception:
+        return 0.5, "Unable to analyze shoulder balance properly"
+
+def analyze_neck_position(left_ear, right_ear, left_shoulder, right_shoulder):
+    ear = left_ear if left_ear else right_ear
+    shoulder = left_shoulder if left_shoulder else right_shoulder
+    if not (ear and shoulder):
+        return 0.5, "Unable to assess neck position"
+    try:
+        neck_tilt = ear["x"] - shoulder["x"]
+        vertical_distance = shoulder["y"] - ear["y"]
+        if vertical_distance <= 0:
+            return 0.3, "Head position is too low - raise your head"
+        neck_distance_ratio = abs(neck_tilt) / vertical_distance
+        threshold = settings.NECK_TILT_THRESHOLD
+        if neck_distance_ratio < threshold:
+            return 1.0, "Neck position is good"
+        elif neck_distance_ratio < threshold * 2:
+            if neck_tilt > 0:
+                return 0.7, "Neck is slightly forward - try to align ears with shoulders"
+            else:
+                return 0.7, "Neck is slightly backward - try to align ears with shoulders"
+        else:
+            if neck_tilt > 0:
+                return 0.3, "Neck is significantly forward - align your head over your shoulders"
+            else:
+                return 0.3, "Neck is significantly backward - align your head over your shoulders"
+    except Exception:
+        return 0.5, "Unable to analyze neck position properly"
+
+def analyze_back_position(left_shoulder, right_shoulder, left_hip, right_hip):
+    shoulder = left_shoulder if left_shoulder else right_shoulder
+    hip = left_hip if left_hip else right_hip
+    if not (shoulder and hip):
+        return 0.5, "Unable to assess back position"
+    try:
+        dx = shoulder["x"] - hip["x"]
+        dy = shoulder["y"] - hip["y"]
+        back_angle = math.degrees(math.atan2(dx, -dy))
+        threshold = settings.BACK_ANGLE_THRESHOLD
+        if abs(back_angle) < threshold:
+            return 1.0, "Back is upright - good posture"
+        elif abs(back_angle) < threshold * 1.5:
+            if back_angle > 0:
+                return 0.7, "Back is leaning slightly backward - try to sit more upright"
+            else:
+                return 0.7, "Back is leaning slightly forward - try to sit more upright"
+        else:
+            if back_angle > 0:
+                return 0.3, "Back is leaning too far back - adjust your chair"
+            else:
+                return 0.3, "Back is significantly hunched forward - sit up straighter"
+    except Exception:
+        return 0.5, "Unable to analyze back position properly"
+
+KEYPOINTS = ("left_ear", "right_ear", "left_shoulder", "right_shoulder", "left_hip", "right_hip")
+
+def random_frame(rng):
+    """A seated pose with random offsets, each keypoint dropped now and then."""
+    base = {
+        "left_ear": (330, 120), "right_ear": (290, 120),
+        "left_shoulder": (360, 200), "right_shoulder": (260, 200),
+        "left_hip": (350, 400), "right_hip": (270, 400),
+    }
+    frame = {}
+    for name in KEYPOINTS:
+        if rng.random() < 0.15:
+            continue
+        x, y = base[name]
+        frame[name] = {"x": x + rng.uniform(-90, 90), "y": y + rng.uniform(-90, 90), "confidence": confidence}
+    return frame
+
+@pytest.fixture(scope="module")
+def rng():
+    return random.Random(37)
+
+def test_builtin_rules_match_original_checks(rng):
+    for _ in range(frames):
+        frame = random_frame(rng)
+        get = frame.get
+        expected = {
+            "shoulder_balance": analyze_shoulder_balance(get("left_shoulder"), get("right_shoulder")),
+            "neck_position": analyze_neck_position(get("left_ear"), get("right_ear"), get("left_shoulder"), get("right_shoulder")),
+            "back_position": analyze_back_position(get("left_shoulder"), get("right_shoulder"), get("left_hip"), get("right_hip")),
+        }
+        overall_score = sum(expected[name][0] * weight for name, weight in
+                            (("shoulder_balance", 0.3), ("neck_position", 0.4), ("back_position", 0.3)))
+
+        analysis = analyze_posture(frame)
+        for name, (score, message) in expected.items():
+            assert analysis[name] == score, (name, frame)
+            assert message in analysis["feedback"], (name, frame)
+        assert analysis["overall_score"] == pytest.approx(overall_score)
+        assert analysis["is_good_posture"] == (overall_score >= 0.7)
+
+def test_array_and_dict_frames_agree(rng):
+    names = ["nose", "left_eye", "right_eye", "left_ear", "right_ear", "left_shoulder", "right_shoulder",
+             "left_elbow", "right_elbow", "left_wrist", "right_wrist", "left_hip", "right_hip",
+             "left_knee", "right_knee", "left_ankle", "right_ankle"]
+    for _ in range(200):
+        keypoints = np.array([[rng.uniform(0, 640), rng.uniform(0, 480), rng.random()] for _ in names], dtype=np.float32)
+        frame = {
+            name: {"x": float(x), "y": float(y), "confidence": float(c)}
+            for name, (x, y, c) in zip(names, keypoints)
+        }
+        assert analyze_posture(keypoints) == analyze_posture(frame)
+
+def test_midpoint_needs_both_points():
+    config = default_rule_config()
+    config["rules"] = [rule for rule in config["rules"] if rule["name"] == "slouch"]
+    config["rules"][0]["weight"] = 1.0
+    config["rules"][0]["missing"] = {"score": 0.5, "feedback": "missing"}
+    rules = CompiledRules(config)
+
+    values = [0.0] * 51
+    for index, (x, y) in ((0, (300, 100)), (5, (360, 200)), (6, (260, 200))):
+        values[index * 3:index * 3 + 3] = (x, y, confidence)
+    # Nose 100 px above a 100 px wide shoulder line
+    assert rules.evaluate(values)["slouch"] == 1.0
+    values[6 * 3 + 2] = 0.0
+    assert rules.evaluate(values)["feedback"][0] == "missing"
+
+def test_invalid_config_is_rejected():
+    config = default_rule_config()
+    config["rules"][0]["metric"] = "unknown"
+    with pytest.raises(RuleConfigError):
+        CompiledRules(config)
+
+def test_rule_file_changes_are_picked_up(tmp_path):
+    path = tmp_path / "rules.json"
+    config = default_rule_config()
+    path.write_text(json.dumps(config))
+    engine = RuleEngine(str(path))
+    assert engine.rules.good_threshold == 0.7
+
+    config["good_posture_threshold"] = 0.9
+    path.write_text(json.dumps(config))
+    os.utime(path, (0, 0))
+    engine.maybe_reload()
+    assert engine.rules.good_threshold == 0.9
+
+    # A broken file keeps the previous rules
+    path.write_text("{")
+    os.utime(path, (1, 1))
+    engine.maybe_reload()
+    assert engine.rules.good_threshold == 0.9
@@ -2,7 +2,18 @@
 import React, { useState, useRef, useEffect } from 'react';
 import './MediaViewer.css';
 import PostureService from '../services/PostureService';
-import throttle from 'lodash.throttle';
+
+// Segments of the posture skeleton, as drawn on analyzed images by the backend
+const SKELETON_SEGMENTS = [
+  ['left_ear', 'left_shoulder'],
+  ['right_ear', 'right_shoulder'],
+  ['left_shoulder', 'right_shoulder'],
+  ['left_shoulder', 'left_hip'],
+  ['right_shoulder', 'right_hip'],
+  ['left_hip', 'right_hip']
+];
+const SKELETON_COLOR = 'rgba(60, 200, 80, 0.8)';
+const MIN_JOINT_CONFIDENCE = 0.5;
 
 const MediaViewer = ({ 
   mode, 
@@ -15,10 +26,17 @@ const MediaViewer = ({
   selectedCamera,
   resetAnalysis,
   isRecording,
+  videoRef: parentVideoRef,
+  canvasRef: parentCanvasRef,
+  poseKeypoints,
   onAnalysisResult
 }) => {
-  const videoRef = useRef(null);
-  const canvasRef = useRef(null);
+  // Share the video and canvas with the parent, which captures recorded frames
+  const ownVideoRef = useRef(null);
+  const ownCanvasRef = useRef(null);
+  const videoRef = parentVideoRef || ownVideoRef;
+  const canvasRef = parentCanvasRef || ownCanvasRef;
+  const overlayRef = useRef(null);
   const [stream, setStream] = useState(null);
   const [cameraError, setCameraError] = useState(null);
   const [isLoading, setIsLoading] = useState(false);
@@ -46,35 +64,40 @@ const MediaViewer = ({
     }
   }, [selectedCamera]);
 
+  // Draw the skeleton of the latest recorded frame over the video
   useEffect(() => {
-  let analysisInterval;
-  
-  if (mode === 'live' && liveMode === 'record' && isRecording && isLiveActive) {
-    // Start continuous analysis
-    analysisInterval = setInterval(() => {
-      if (videoRef.current) {
-        captureAndAnalyzeFrame();
-      }
-    }, 2000); // Analyze every second
-  } else {
-    // Remove skeleton overlay if not in recording mode
-    const overlay = document.getElementById('skeleton-overlay');
-    if (overlay) {
-      overlay.remove();
-    }
-  }
-  
-  return () => {
-    if (analysisInterval) {
-      clearInterval(analysisInterval);
-    }
-    // Cleanup skeleton overlay on unmount
-    const overlay = document.getElementById('skeleton-overlay');
-    if (overlay) {
-      overlay.remove();
+    const overlay = overlayRef.current;
+    const video = videoRef.current;
+    if (!overlay) return;
+    
+    const context = overlay.getContext('2d');
+    if (!poseKeypoints || !video || !video.videoWidth) {
+      context.clearRect(0, 0, overlay.width, overlay.height);
+      return;
     }
-  };
-}, [mode, liveMode, isRecording, isLiveActive]);
+    
+    // Keypoints are in video pixels, and the overlay is scaled like the video
+    overlay.width = video.videoWidth;
+    overlay.height = video.videoHeight;
+    context.lineWidth = Math.max(2, overlay.width / 320);
+    context.strokeStyle = SKELETON_COLOR;
+    context.fillStyle = SKELETON_COLOR;
+    
+    const visible = (name) => poseKeypoints[name] && poseKeypoints[name].confidence >= MIN_JOINT_CONFIDENCE;
+    SKELETON_SEGMENTS.forEach(([start, end]) => {
+      if (!visible(start) || !visible(end)) return;
+      context.beginPath();
+      context.moveTo(poseKeypoints[start].x, poseKeypoints[start].y);
+      context.lineTo(poseKeypoints[end].x, poseKeypoints[end].y);
+      context.stroke();
+    });
+    new Set(SKELETON_SEGMENTS.flat()).forEach((name) => {
+      if (!visible(name)) return;
+      context.beginPath();
+      context.arc(poseKeypoints[name].x, poseKeypoints[name].y, context.lineWidth * 2, 0, 2 * Math.PI);
+      context.fill();
+    });
+  }, [poseKeypoints]);
   
   // Start live camera stream
   const startLiveStream = async () => {
@@ -154,9 +177,6 @@ const MediaViewer = ({
           
           // Pass analysis results to parent
           onAnalysisResult(result);
-        } else if (liveMode === 'record' && isRecording) {
-          // Handle recording/continuous analysis
-          analyzeContinuously(imageData);
         }
       } catch (error) {
         console.error('Error analyzing image:', error);
@@ -171,90 +191,6 @@ const MediaViewer = ({
     }
   };
 
-  const captureAndAnalyzeFrame = async () => {
-    if (canvasRef.current && videoRef.current) {
-      const canvas = canvasRef.current;
-      const video = videoRef.current;
-      
-      canvas.width = video.videoWidth;
-      canvas.height = video.videoHeight;
-      
-      const context = canvas.getContext('2d');
-      context.drawImage(video, 0, 0, canvas.width, canvas.height);
-      
-      const imageData = canvas.toDataURL('image/png');
-      
-      try {
-        // Send to backend API for analysis
-        const result = await PostureService.analyzeImageData(imageData);
-        
-        // Pass analysis results to parent
-        onAnalysisResult(result);
-        
-        // Add this block to display the skeleton in record mode
-        if (liveMode === 'record' && result.img_with_pose) {
-          // Create an image element to display the skeleton
-          const skeletonImg = new Image();
-          skeletonImg.onload = () => {
-            // Clear the canvas and draw the new image with skeleton
-            context.clearRect(0, 0, canvas.width, canvas.height);
-            context.drawImage(skeletonImg, 0, 0, canvas.width, canvas.height);
-            
-            // Draw the skeleton overlay on the video
-            const overlayCanvas = document.createElement('canvas');
-            overlayCanvas.width = canvas.width;
-            overlayCanvas.height = canvas.height;
-            const overlayContext = overlayCanvas.getContext('2d');
-            
-            // Draw the original video frame
-            const videoFrame = document.createElement('canvas');
-            videoFrame.width = canvas.width;
-            videoFrame.height = canvas.height;
-            const videoContext = videoFrame.getContext('2d');
-            videoContext.drawImage(video, 0, 0, canvas.width, canvas.height);
-            
-            // Draw skeleton on top with transparency
-            overlayContext.drawImage(videoFrame, 0, 0);
-            overlayContext.globalAlpha = 0.6; // Adjust transparency
-            overlayContext.drawImage(skeletonImg, 0, 0);
-            
-            // Create a separate overlay div to display the skeleton
-            if (!document.getElementById('skeleton-overlay')) {
-              const overlayDiv = document.createElement('div');
-              overlayDiv.id = 'skeleton-overlay';
-              overlayDiv.className = 'skeleton-overlay';
-              overlayDiv.style.position = 'absolute';
-              overlayDiv.style.top = '0';
-              overlayDiv.style.left = '0';
-              overlayDiv.style.width = '100%';
-              overlayDiv.style.height = '100%';
-              overlayDiv.style.pointerEvents = 'none';
-              document.querySelector('.viewer-content').appendChild(overlayDiv);
-            }
-            
-            document.getElementById('skeleton-overlay').style.backgroundImage = `url(${overlayCanvas.toDataURL('image/png')})`;
-            document.getElementById('skeleton-overlay').style.backgroundSize = 'contain';
-            document.getElementById('skeleton-overlay').style.backgroundPosition = 'center';
-            document.getElementById('skeleton-overlay').style.backgroundRepeat = 'no-repeat';
-          };
-          skeletonImg.src = `data:image/png;base64,${result.img_with_pose}`;
-        }
-      } catch (error) {
-        console.error('Error in continuous analysis:', error);
-      }
-    }
-  };
-
-  // Add a throttled function for continuous analysis
-  const analyzeContinuously = throttle(async (imageData) => {
-    try {
-      const result = await PostureService.analyzeImageData(imageData);
-      onAnalysisResult(result);
-    } catch (error) {
-      console.error('Error in continuous analysis:', error);
-    }
-  }, 2000); // Throttle to once per second
-  
   return (
     <div className="media-viewer">
       <div className="viewer-header">
@@ -284,6 +220,9 @@ const MediaViewer = ({
                   muted 
                   className={`display-video ${!isLiveActive || (liveMode === 'capture' && imageSource) ? 'hidden' : ''}`}
                 />
+                {liveMode === 'record' && isRecording && (
+                  <canvas ref={overlayRef} className="skeleton-overlay" />
+                )}
                 {liveMode === 'capture' && imageSource && (
                   <img src={imageSource} alt="Captured" className="display-image" />
                 )}
@@ -25,6 +25,10 @@ const SitWellApp = () => {
   const isMobile = useMediaQuery('(max-width: 768px)');
   const videoRef = useRef(null);
   const canvasRef = useRef(null);
+  const sessionIdRef = useRef(null);
+  // Debounced posture state of the recording ('good', 'bad', 'away' or 'unknown')
+  const postureStateRef = useRef(null);
+  const unsubscribeRef = useRef(null);
 
   const toggleRecording = () => {
     setIsRecording(prev => !prev);
@@ -107,6 +111,9 @@ const SitWellApp = () => {
   const handleStartRecording = () => {
     setIsRecording(true);
     
+    // Identify this recording so the backend can track keypoints across frames
+    sessionIdRef.current = `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+    
     // Set up interval for continuous analysis
     const interval = setInterval(() => {
       if (videoRef.current && canvasRef.current) {
@@ -120,6 +127,13 @@ const SitWellApp = () => {
   // Stop recording
   const handleStopRecording = () => {
     setIsRecording(false);
+    sessionIdRef.current = null;
+    postureStateRef.current = null;
+    
+    if (unsubscribeRef.current) {
+      unsubscribeRef.current();
+      unsubscribeRef.current = null;
+    }
     
     if (analysisInterval) {
       clearInterval(analysisInterval);
@@ -144,21 +158,52 @@ const SitWellApp = () => {
     analyzePosture(imageData, true); // true means don't show loading
   };
   
-  // Analyze posture (mock function - would connect to backend)
+  // Follow the debounced posture state, so single odd frames don't flip the verdict
+  const handlePostureEvent = (type, data) => {
+    if (type !== 'state' || data.session_id !== sessionIdRef.current) return;
+    
+    postureStateRef.current = data.state;
+    if (data.state === 'good' || data.state === 'bad') {
+      setAnalysisResult(prev => prev && {
+        ...prev,
+        isGoodPosture: data.state === 'good'
+      });
+    }
+  };
+  
+  // Subscribe to the recording's posture state once the backend has seen a frame of it
+  const subscribeToSession = (sessionId) => {
+    if (unsubscribeRef.current || sessionId !== sessionIdRef.current) return;
+    unsubscribeRef.current = PostureService.subscribePostureEvents(sessionId, handlePostureEvent);
+  };
+  
+  // Analyze posture
   const analyzePosture = async (imageData, isBackground = false) => {
     if (!isBackground) {
       setIsProcessing(true);
     }
     
     try {
-      // Send to backend API for analysis
-      const result = await PostureService.analyzeImageData(imageData);
+      // Recorded frames get their skeleton drawn from the keypoints, so skip the overlay image
+      const sessionId = isBackground ? sessionIdRef.current : null;
+      const result = await PostureService.analyzeImageData(
+        imageData,
+        sessionId,
+        { includeImage: !isBackground }
+      );
+      if (sessionId) {
+        subscribeToSession(sessionId);
+      }
       
-      // Update analysis results
+      // Update analysis results, keeping the debounced verdict while recording
+      const postureState = isBackground ? postureStateRef.current : null;
       setAnalysisResult({
-        isGoodPosture: result.isGoodPosture,
+        isGoodPosture: postureState === 'good' || postureState === 'bad'
+          ? postureState === 'good'
+          : result.isGoodPosture,
         confidence: result.confidence,
         feedback: result.feedback,
+        keypoints: isBackground ? result.keypoints : null,
         timestamp: new Date().toLocaleTimeString()
       });
       
@@ -196,6 +241,14 @@ const SitWellApp = () => {
     };
   }, [analysisInterval]);
   
+  useEffect(() => {
+    return () => {
+      if (unsubscribeRef.current) {
+        unsubscribeRef.current();
+      }
+    };
+  }, []);
+  
   return (
     <div className="sit-well-app">
       <Header />
@@ -230,6 +283,7 @@ const SitWellApp = () => {
             isRecording={isRecording}
             videoRef={videoRef}
             canvasRef={canvasRef}
+            poseKeypoints={isRecording && analysisResult ? analysisResult.keypoints : null}
             onAnalysisResult={handleAnalysisResult}
           />
           
@@ -4,14 +4,24 @@ const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
 
 /**
  * Analyze an image using base64 encoding
+ *
+ * Pass a sessionId for consecutive live frames so the backend can track
+ * keypoints between full model passes, and includeImage: false when the
+ * pose overlay image is not shown.
  */
-export const analyzeImageData = async (imageData) => {
+export const analyzeImageData = async (imageData, sessionId = null, { includeImage = true } = {}) => {
   try {
-    const response = await fetch(`${API_URL}/api/posture/analyze`, {
+    const headers = {
+      'Content-Type': 'application/json',
+    };
+    if (sessionId) {
+      headers['X-Session-ID'] = sessionId;
+    }
+    const query = includeImage ? '' : '?include_image=false';
+
+    const response = await fetch(`${API_URL}/api/posture/analyze${query}`, {
       method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
+      headers,
       body: JSON.stringify({ image: imageData }),
     });
 
@@ -26,6 +36,28 @@ export const analyzeImageData = async (imageData) => {
   }
 };
 
+/**
+ * Subscribe to a live session's debounced posture state events
+ *
+ * `onEvent` is called with the event type ('state' or 'summary') and its
+ * data. Frames analyzed with the same sessionId drive the state, so clients
+ * that only need alerts can stop requesting overlay images. The session must
+ * have sent a frame before subscribing. Returns a function that closes the
+ * subscription.
+ */
+export const subscribePostureEvents = (sessionId, onEvent) => {
+  const source = new EventSource(
+    `${API_URL}/api/posture/sessions/${encodeURIComponent(sessionId)}/events`
+  );
+  const listener = (event) => onEvent(event.type, JSON.parse(event.data));
+  source.addEventListener('state', listener);
+  source.addEventListener('summary', listener);
+  source.onerror = (error) => {
+    console.error('Posture event stream error:', error);
+  };
+  return () => source.close();
+};
+
 /**
  * Upload and analyze an image file
  */
@@ -53,4 +85,5 @@ export const analyzeImageFile = async (file) => {
 export default {
   analyzeImageData,
   analyzeImageFile,
+  subscribePostureEvents,
 };
\ No newline at end of file